@@ -19,12 +19,21 @@ import json
 import time
 from datetime import datetime
 from flask import Flask, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import HTTPException
 import traceback
 
+# orjson escapes and encodes in C, which matters for responses carrying whole
+# documents; the stdlib encoder is used when it isn't installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables early
 load_dotenv()
 
@@ -67,6 +76,25 @@ class Config:
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson, straight to bytes for responses."""
+    
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
 def setup_logging(config):
     """Configure application logging."""
     handlers = [logging.StreamHandler()]
@@ -125,6 +153,8 @@ def create_app(config_class=Config):
     """Create and configure the Flask application."""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
     
     # Setup logging
     setup_logging(config_class)
@@ -144,6 +174,8 @@ def create_app(config_class=Config):
     
     # Register blueprints
     app.register_blueprint(document_bp, url_prefix='/api/documents')
+    # Thin shim over the FastAPI analysis router's services, until the
+    # frontend calls FastAPI for analysis
     app.register_blueprint(analysis_bp, url_prefix='/api/analysis')
     app.register_blueprint(chat_bp, url_prefix='/api/chat')
     app.register_blueprint(plotting_bp, url_prefix='/api/plotting')
@@ -207,7 +239,7 @@ def create_app(config_class=Config):
             'endpoints': {
                 'health': '/api/health',
                 'documents': '/api/documents',
-                'analysis': '/api/analysis', 
+                'analysis': '/api/analysis',
                 'chat': '/api/chat',
                 'plotting': '/api/plotting'
             },
@@ -0,0 +1,18 @@
+"""
+Deed Reader Pro - Combined Server
+---------------------------------
+Serves the FastAPI app and the legacy Flask app from one process during the
+migration period.
+
+FastAPI handles /api/... as usual; the Flask app is mounted under /legacy,
+so its endpoints are reachable at /legacy/api/... on the same port.
+
+Run with: uvicorn combined:app --workers 4
+"""
+
+from fastapi.middleware.wsgi import WSGIMiddleware
+
+from app import app as flask_app
+from main import app
+
+app.mount('/legacy', WSGIMiddleware(flask_app))
@@ -7,6 +7,9 @@ class Config:
     # API Timeout Settings
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 300))  # 5 minutes default
     CLAUDE_API_TIMEOUT = int(os.getenv('CLAUDE_API_TIMEOUT', 180))  # 3 minutes for Claude
+    CLAUDE_TOKENS_PER_MINUTE = int(os.getenv('CLAUDE_TOKENS_PER_MINUTE', 40000))  # Client-side TPM budget
+    CLAUDE_REQUESTS_PER_MINUTE = int(os.getenv('CLAUDE_REQUESTS_PER_MINUTE', 50))  # Client-side RPM budget
+    CLAUDE_MAX_CONCURRENCY = int(os.getenv('CLAUDE_MAX_CONCURRENCY', 16))  # In-flight async Claude requests
     
     # Gunicorn/Production Settings
     WORKER_TIMEOUT = int(os.getenv('WORKER_TIMEOUT', 300))  # 5 minutes
@@ -22,4 +25,5 @@ class Config:
     
     # Performance
     ENABLE_RESPONSE_COMPRESSION = os.getenv('ENABLE_COMPRESSION', 'true').lower() == 'true'
-    ENABLE_REQUEST_LOGGING = os.getenv('ENABLE_REQUEST_LOGGING', 'true').lower() == 'true'
\ No newline at end of file
+    ENABLE_REQUEST_LOGGING = os.getenv('ENABLE_REQUEST_LOGGING', 'true').lower() == 'true'
+    PLOT_DATA_CACHE_ENABLED = os.getenv('PLOT_DATA_CACHE', 'true').lower() == 'true'  # Reuse Claude plotting extractions
\ No newline at end of file
@@ -8,32 +8,45 @@ Migration from Flask to FastAPI for better async support and performance.
 """
 
 import os
+import json
+import queue
+import atexit
+import asyncio
 import logging
+import logging.handlers
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import URL
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import uvicorn
+from uvicorn.logging import AccessFormatter
 
 # Load environment variables
 load_dotenv()
 
 # Import routers
 from routers.documents import router as documents_router
-from routers.analysis import router as analysis_router
+from routers.analysis import router as analysis_router, warm_legacy_parser
 # from routers.chat import router as chat_router
 # from routers.plotting import router as plotting_router
 
-# Import services
+# Import services (also loads the anthropic SDK and httpx up front, so a
+# preloading server imports them once before forking workers)
 from services.claude_service import ClaudeService
+from services.pdf_service import shutdown_pdf_pool
+from services.ocr_service import shutdown_ocr_pool
 
 
 class Settings(BaseSettings):
@@ -81,29 +94,124 @@ class Settings(BaseSettings):
 # Initialize settings
 settings = Settings()
 
+# Encoded once for the X-API-Version response header
+_API_VERSION = settings.app_version.encode()
+
 # Configure logging
-def setup_logging():
-    """Configure application logging."""
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Configure application logging.
+    
+    Loggers only enqueue records; a QueueListener thread does the stream and
+    file writes, so request handling never blocks on log I/O.
+    """
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
+    )
     handlers = [logging.StreamHandler()]
     
     if settings.log_file:
-        handlers.append(logging.FileHandler(settings.log_file))
+        handlers.append(logging.handlers.RotatingFileHandler(
+            settings.log_file, maxBytes=10 * 1024 * 1024, backupCount=5
+        ))
     
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
-        handlers=handlers
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, settings.log_level.upper()))
+    root_logger.handlers = [queue_handler]
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # Send uvicorn's own loggers through the same queue
+    logging.getLogger('uvicorn').handlers = [queue_handler]
+    access_handler = logging.handlers.QueueHandler(log_queue)
+    access_handler.setFormatter(
+        AccessFormatter('%(client_addr)s - "%(request_line)s" %(status_code)s', use_colors=False)
     )
+    logging.getLogger('uvicorn.access').handlers = [access_handler]
     
     # Reduce noise from external libraries
     logging.getLogger('uvicorn').setLevel(logging.WARNING)
     logging.getLogger('httpx').setLevel(logging.WARNING)
+    
+    return listener
 
 
 # Setup logging
-setup_logging()
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
+# How often the background task re-checks the upload folder
+STORAGE_CHECK_INTERVAL = 30  # seconds
+
+# Claude status bound at startup so hot endpoints read a module global instead
+# of walking app.state. set_claude_enabled() bumps the generation and
+# re-renders the cached response bodies that depend on it.
+CLAUDE_ENABLED = False
+STATE_GENERATION = 0
+_info_body: Optional[bytes] = None
+
+
+def check_upload_folder() -> Tuple[bool, bool]:
+    """Return whether the upload folder exists and is writable."""
+    return os.path.isdir(settings.upload_folder), os.access(settings.upload_folder, os.W_OK)
+
+
+def get_parser_mp_context():
+    """
+    Use forkserver for parser workers where the platform supports it.
+    
+    The forkserver preloads the analysis router (and with it the legacy
+    parser), so each worker forks with those imports already done.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["routers.analysis"])
+        return context
+    return None
+
+
+def set_claude_enabled(app: FastAPI, enabled: bool):
+    """Record Claude availability and invalidate the bodies derived from it."""
+    global CLAUDE_ENABLED, STATE_GENERATION, _info_body
+    CLAUDE_ENABLED = enabled
+    app.state.claude_enabled = enabled
+    STATE_GENERATION += 1
+    
+    _info_body = json.dumps(build_info_data()).encode()
+    if hasattr(app.state, "health_body"):
+        cache_health_body(app)
+
+
+def cache_health_body(app: FastAPI):
+    """Pre-render the liveness body served by HealthProbeMiddleware."""
+    liveness = build_health_data()
+    app.state.health_status = 200 if liveness["status"] == "healthy" else 503
+    app.state.health_body = json.dumps(liveness).encode()
+
+
+async def refresh_storage_status(app: FastAPI):
+    """Periodically re-check the upload folder off the event loop."""
+    while True:
+        await asyncio.sleep(STORAGE_CHECK_INTERVAL)
+        try:
+            status = await anyio.to_thread.run_sync(check_upload_folder)
+        except Exception as e:
+            logger.error(f"Upload folder check failed: {e}")
+            status = (False, False)
+        
+        if status != (app.state.upload_folder_exists, app.state.upload_folder_writable):
+            logger.warning(f"Upload folder status changed: exists={status[0]}, writable={status[1]}")
+            app.state.upload_folder_exists, app.state.upload_folder_writable = status
+            cache_health_body(app)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -126,21 +234,109 @@ async def lifespan(app: FastAPI):
     # Initialize Claude service
     if settings.anthropic_api_key:
         if ClaudeService.initialize(settings.anthropic_api_key):
-            app.state.claude_enabled = True
+            set_claude_enabled(app, True)
             logger.info("Claude service initialized successfully")
         else:
-            app.state.claude_enabled = False
+            set_claude_enabled(app, False)
             logger.warning("Claude service initialization failed")
     else:
-        app.state.claude_enabled = False
+        set_claude_enabled(app, False)
         logger.warning("No Anthropic API key provided")
     
+    # Cache storage status so health checks never touch the filesystem
+    app.state.upload_folder_exists, app.state.upload_folder_writable = check_upload_folder()
+    cache_health_body(app)
+    storage_task = asyncio.create_task(refresh_storage_status(app))
+    
+    # Legacy deed parsing is CPU-bound; keep it off the event loop process
+    app.state.parser_pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=get_parser_mp_context(),
+        initializer=warm_legacy_parser
+    )
+    
     logger.info("=" * 50)
     
     yield
     
     # Shutdown
     logger.info("Shutting down Deed Reader Pro Backend")
+    storage_task.cancel()
+    app.state.parser_pool.shutdown(wait=False)
+    shutdown_pdf_pool()
+    shutdown_ocr_pool()
+    await ClaudeService.close()
+
+
+class HealthProbeMiddleware:
+    """
+    Answer ``GET /api/health`` before the rest of the middleware stack runs.
+
+    Load-balancer probes get the body pre-rendered at startup without going
+    through CORS, logging or security headers. ``/api/health/deep`` still runs
+    the full check on the normal stack.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET" and scope["path"] == "/api/health":
+            state = scope["app"].state
+            body = getattr(state, "health_body", None)
+            if body is not None:
+                await send({
+                    "type": "http.response.start",
+                    "status": state.health_status,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"cache-control", b"no-cache, no-store, must-revalidate"),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        
+        await self.app(scope, receive, send)
+
+
+class RequestLoggingMiddleware:
+    """
+    Log all requests and responses.
+    
+    Adds ``X-Process-Time`` (integer microseconds) and ``X-API-Version`` as
+    raw header tuples on the response start message, avoiding per-response
+    header-dict mutation.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_ns = time.perf_counter_ns()
+        
+        # Log request
+        client = scope.get("client")
+        logger.info(f"Request: {scope['method']} {URL(scope=scope)} - IP: {client[0] if client else None}")
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                process_time_us = (time.perf_counter_ns() - start_ns) // 1000
+                
+                # Log response
+                logger.info(f"Response: {message['status']} - {process_time_us / 1e6:.3f}s")
+                
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-process-time", str(process_time_us).encode()),
+                    (b"x-api-version", _API_VERSION),
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_timing)
 
 
 # Create FastAPI app
@@ -172,28 +368,7 @@ if settings.environment == "production":
 
 
 # Custom middleware for request logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all requests and responses."""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"Request: {request.method} {request.url} - IP: {request.client.host}")
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Log response
-    process_time = time.time() - start_time
-    logger.info(
-        f"Response: {response.status_code} - {process_time:.3f}s"
-    )
-    
-    # Add custom headers
-    response.headers["X-Process-Time"] = str(process_time)
-    response.headers["X-API-Version"] = settings.app_version
-    
-    return response
+app.add_middleware(RequestLoggingMiddleware)
 
 
 # Security headers middleware
@@ -217,37 +392,40 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+# Health probes bypass everything above; added last so it runs first
+app.add_middleware(HealthProbeMiddleware)
+
+
+# Root endpoint body never changes, so render it once
+_ROOT_BODY = json.dumps({
+    "message": "Welcome to Deed Reader Pro API",
+    "documentation": "/api/docs",
+    "health": "/api/health",
+    "version": settings.app_version
+}).encode()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
     """Root endpoint - redirects to API documentation."""
-    return {
-        "message": "Welcome to Deed Reader Pro API",
-        "documentation": "/api/docs",
-        "health": "/api/health",
-        "version": settings.app_version
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
-# Health check endpoint
-@app.get("/api/health")
-async def health_check():
-    """Comprehensive health check endpoint."""
-    start_time = time.time()
-    
+def build_health_data() -> Dict[str, Any]:
+    """Collect service status for the health endpoints from cached state."""
     health_data = {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat() + "Z",
         "version": settings.app_version,
         "environment": settings.environment,
         "services": {
             "api": "healthy",
-            "claude": "healthy" if app.state.claude_enabled else "disabled",
-            "storage": "healthy" if os.path.exists(settings.upload_folder) else "error"
+            "claude": "healthy" if CLAUDE_ENABLED else "disabled",
+            "storage": "healthy" if getattr(app.state, "upload_folder_writable", False) else "error"
         },
         "system": {
-            "upload_folder_exists": os.path.exists(settings.upload_folder),
-            "upload_folder_writable": os.access(settings.upload_folder, os.W_OK),
+            "upload_folder_exists": getattr(app.state, "upload_folder_exists", False),
+            "upload_folder_writable": getattr(app.state, "upload_folder_writable", False),
             "python_version": os.sys.version.split()[0],
             "max_content_length_mb": settings.max_content_length // (1024 * 1024)
         }
@@ -261,6 +439,22 @@ async def health_check():
     
     if not all_services_healthy:
         health_data["status"] = "degraded"
+    
+    return health_data
+
+
+# Health check endpoints. Plain GET /api/health is normally answered by
+# HealthProbeMiddleware; this handler covers it until startup completes.
+@app.get("/api/health")
+@app.get("/api/health/deep")
+async def health_check():
+    """Comprehensive health check endpoint."""
+    start_time = time.time()
+    
+    health_data = build_health_data()
+    health_data["timestamp"] = datetime.utcnow().isoformat() + "Z"
+    
+    if health_data["status"] != "healthy":
         raise HTTPException(status_code=503, detail=health_data)
     
     # Add response time
@@ -269,10 +463,8 @@ async def health_check():
     return health_data
 
 
-# API info endpoint
-@app.get("/api/info")
-async def api_info():
-    """API information and available endpoints."""
+def build_info_data() -> Dict[str, Any]:
+    """Collect API information and available endpoints."""
     return {
         "name": settings.app_name,
         "version": settings.app_version,
@@ -286,11 +478,11 @@ async def api_info():
         },
         "features": {
             "file_upload": True,
-            "ai_analysis": app.state.claude_enabled,
-            "interactive_chat": app.state.claude_enabled,
-            "coordinate_extraction": app.state.claude_enabled,
+            "ai_analysis": CLAUDE_ENABLED,
+            "interactive_chat": CLAUDE_ENABLED,
+            "coordinate_extraction": CLAUDE_ENABLED,
             "plotting": True,
-            "ocr_vision": app.state.claude_enabled
+            "ocr_vision": CLAUDE_ENABLED
         },
         "limits": {
             "max_file_size_mb": settings.max_content_length // (1024 * 1024),
@@ -299,6 +491,17 @@ async def api_info():
     }
 
 
+# API info endpoint
+@app.get("/api/info")
+async def api_info():
+    """API information and available endpoints."""
+    body = _info_body
+    if body is None:
+        # Lifespan has not run yet (e.g. a bare test client)
+        body = json.dumps(build_info_data()).encode()
+    return Response(content=body, media_type="application/json")
+
+
 # Include routers
 app.include_router(documents_router, prefix="/api/documents", tags=["documents"])
 app.include_router(analysis_router, prefix="/api/analysis", tags=["analysis"])
@@ -4,20 +4,117 @@ Analysis Router for Deed Reader Pro - FastAPI Implementation
 Handles AI-powered document analysis using Claude with async support.
 """
 
+import os
+import sys
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from fastapi import APIRouter, HTTPException, Depends
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 from services.claude_service import ClaudeService
+from services.cache_service import ContentCache, fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Mounted at /api/analysis by main.py
 router = APIRouter(
-    prefix="/api/analysis",
-    tags=["analysis"],
     responses={404: {"description": "Not found"}},
 )
 
+# Responses keyed by endpoint and SHA-256 of the input, so re-submitting the
+# same text doesn't spend Claude tokens again
+result_cache = ContentCache(max_entries=1024, ttl=3600)
+
+
+def _cache_key(endpoint: str, text: str) -> str:
+    """Cache key for an endpoint's result on the given input text."""
+    return f"{endpoint}:{fingerprint(text)}"
+
+
+# Location of the original deed_reader package used by the legacy parser
+LEGACY_PARSER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+    'deed_reader'
+)
+
+# Import the legacy parser at module load, so a preloading server (gunicorn
+# --preload, or the parser pool's forkserver) pays for it once before forking
+if LEGACY_PARSER_PATH not in sys.path:
+    sys.path.insert(0, LEGACY_PARSER_PATH)
+
+try:
+    from deed_reader.core.deed_parser import AdvancedDeedParser
+except ImportError as ie:
+    AdvancedDeedParser = None
+    logger.warning(f"Legacy parser not available: {ie}")
+
+# Legacy parser instances, created on first use in each thread. The parser
+# keeps the last parse's calls for get_call_summary(), so the Flask shim's
+# request threads can't share one; each parser pool process has one thread
+_legacy_parser_local = threading.local()
+
+
+def _get_legacy_parser():
+    """Construct the legacy parser once per thread."""
+    parser = getattr(_legacy_parser_local, 'parser', None)
+    if parser is None:
+        if AdvancedDeedParser is None:
+            raise ImportError("deed_reader.core.deed_parser could not be imported")
+        
+        parser = AdvancedDeedParser(enable_filtering=True, filter_mode='hybrid')
+        _legacy_parser_local.parser = parser
+    return parser
+
+
+def warm_legacy_parser():
+    """
+    Parser pool initializer: build the parser and run it once.
+    
+    Moves the first-parse cost to worker startup instead of the first user
+    request. Errors are swallowed; an initializer failure would break the pool.
+    """
+    try:
+        _get_legacy_parser().parse_deed_text("Thence North 45 degrees East 100 feet")
+    except Exception as e:
+        logger.debug(f"Legacy parser warmup skipped: {e}")
+
+
+def parse_with_legacy_parser(text: str, include_extras: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse deed text with the legacy parser.
+    
+    Runs inside the parser process pool (or a Flask shim request thread),
+    so it returns plain dicts rather than DeedCall objects. Raises
+    ImportError if the parser is missing.
+    """
+    parser = _get_legacy_parser()
+    calls = parser.parse_deed_text(text)
+    
+    # Convert to serializable format
+    parsed_calls = []
+    for call in calls:
+        call_dict = {
+            'call_type': call.call_type,
+            'bearing': call.bearing,
+            'distance': call.distance,
+            'units': call.units,
+            'monument': call.monument,
+            'description': call.description,
+            'raw_text': call.raw_text,
+            'confidence': call.confidence
+        }
+        
+        if include_extras:
+            if call.curve_data:
+                call_dict['curve_data'] = call.curve_data
+            if call.passing_monuments:
+                call_dict['passing_monuments'] = call.passing_monuments
+        
+        parsed_calls.append(call_dict)
+    
+    return parsed_calls, parser.get_call_summary()
+
 # Pydantic models for request/response validation
 class AnalyzeRequest(BaseModel):
     text: str = Field(..., min_length=10, description="Text to analyze")
@@ -50,7 +147,7 @@ class SummaryResponse(BaseModel):
 
 class CoordinatesResponse(BaseModel):
     success: bool
-    coordinates: Optional[List[Dict[str, Any]]] = None
+    coordinates: Optional[Dict[str, Any]] = None
     metadata: Optional[Dict[str, Any]] = None
     message: str
 
@@ -70,6 +167,11 @@ class CompareResponse(BaseModel):
     comparison: Optional[Dict[str, Any]] = None
     message: str
 
+class BudgetResponse(BaseModel):
+    success: bool
+    budget: Dict[str, Any]
+    message: str
+
 
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_deed(request: AnalyzeRequest):
@@ -93,8 +195,13 @@ async def analyze_deed(request: AnalyzeRequest):
                 }
             )
         
+        cache_key = _cache_key("analyze", request.text)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Perform AI analysis
-        analysis_result = ClaudeService.analyze_deed_document(request.text)
+        analysis_result = await ClaudeService.analyze_deed_document_async(request.text)
         
         # Add metadata
         analysis_result['analysis_metadata'] = {
@@ -104,11 +211,14 @@ async def analyze_deed(request: AnalyzeRequest):
             'model_used': ClaudeService._model
         }
         
-        return AnalysisResponse(
+        response = AnalysisResponse(
             success=True,
             analysis=analysis_result,
             message='Deed analysis completed successfully'
         )
+        if 'error' not in analysis_result:
+            result_cache.set(cache_key, response)
+        return response
         
     except Exception as e:
         logger.error(f"Error in deed analysis: {e}")
@@ -142,10 +252,15 @@ async def generate_summary(request: SummaryRequest):
                 }
             )
         
+        cache_key = _cache_key("summary", request.text)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Generate summary
-        summary = ClaudeService.generate_summary(request.text)
+        summary = await ClaudeService.generate_summary_async(request.text)
         
-        return SummaryResponse(
+        response = SummaryResponse(
             success=True,
             summary=summary,
             metadata={
@@ -155,6 +270,8 @@ async def generate_summary(request: SummaryRequest):
             },
             message='Summary generated successfully'
         )
+        result_cache.set(cache_key, response)
+        return response
         
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
@@ -189,10 +306,15 @@ async def extract_coordinates(request: CoordinatesRequest):
                 }
             )
         
+        cache_key = _cache_key("coordinates", request.text)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Extract coordinates
-        coordinates = ClaudeService.extract_coordinates(request.text)
+        coordinates = await ClaudeService.extract_coordinates_async(request.text)
         
-        return CoordinatesResponse(
+        response = CoordinatesResponse(
             success=True,
             coordinates=coordinates,
             metadata={
@@ -201,6 +323,9 @@ async def extract_coordinates(request: CoordinatesRequest):
             },
             message='Coordinate extraction completed successfully'
         )
+        if 'error' not in coordinates:
+            result_cache.set(cache_key, response)
+        return response
         
     except Exception as e:
         logger.error(f"Error extracting coordinates: {e}")
@@ -236,7 +361,7 @@ async def validate_analysis(request: ValidateRequest):
             )
         
         # Validate data
-        validation_result = ClaudeService.validate_deed_data(request.extracted_data)
+        validation_result = await ClaudeService.validate_deed_data_async(request.extracted_data)
         
         return ValidationResponse(
             success=True,
@@ -256,7 +381,7 @@ async def validate_analysis(request: ValidateRequest):
 
 
 @router.post("/parse", response_model=ParseResponse)
-async def parse_deed_legacy(request: ParseRequest):
+async def parse_deed_legacy(request: ParseRequest, http_request: Request):
     """
     Parse deed using legacy parser for comparison.
     
@@ -266,47 +391,14 @@ async def parse_deed_legacy(request: ParseRequest):
     - Validation against AI results
     """
     try:
-        # Try to import and use the original deed parser
+        # Parse using original logic in the parser process pool
         try:
-            import sys
-            import os
-            
-            # Add the original deed_reader path
-            original_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                'deed_reader'
+            loop = asyncio.get_running_loop()
+            parsed_calls, summary = await loop.run_in_executor(
+                http_request.app.state.parser_pool,
+                parse_with_legacy_parser,
+                request.text
             )
-            sys.path.insert(0, original_path)
-            
-            from deed_reader.core.deed_parser import AdvancedDeedParser
-            
-            # Parse using original logic
-            parser = AdvancedDeedParser(enable_filtering=True, filter_mode='hybrid')
-            calls = parser.parse_deed_text(request.text)
-            
-            # Convert to serializable format
-            parsed_calls = []
-            for call in calls:
-                call_dict = {
-                    'call_type': call.call_type,
-                    'bearing': call.bearing,
-                    'distance': call.distance,
-                    'units': call.units,
-                    'monument': call.monument,
-                    'description': call.description,
-                    'raw_text': call.raw_text,
-                    'confidence': call.confidence
-                }
-                
-                if call.curve_data:
-                    call_dict['curve_data'] = call.curve_data
-                if call.passing_monuments:
-                    call_dict['passing_monuments'] = call.passing_monuments
-                    
-                parsed_calls.append(call_dict)
-            
-            # Get summary
-            summary = parser.get_call_summary()
             
             return ParseResponse(
                 success=True,
@@ -339,7 +431,7 @@ async def parse_deed_legacy(request: ParseRequest):
 
 
 @router.post("/compare", response_model=CompareResponse)
-async def compare_analysis(request: CompareRequest):
+async def compare_analysis(request: CompareRequest, http_request: Request):
     """
     Compare AI analysis with legacy parsing results.
     
@@ -351,60 +443,46 @@ async def compare_analysis(request: CompareRequest):
     """
     try:
         results = {}
+        ai_available = ClaudeService.is_available()
         
-        # Try AI analysis
-        if ClaudeService.is_available():
-            try:
-                ai_analysis = ClaudeService.analyze_deed_document(request.text)
-                results['ai_analysis'] = ai_analysis
-                results['ai_status'] = 'success'
-            except Exception as e:
-                results['ai_status'] = 'failed'
-                results['ai_error'] = str(e)
+        # Run AI analysis (network) and legacy parsing (CPU) concurrently
+        loop = asyncio.get_running_loop()
+        legacy_task = loop.run_in_executor(
+            http_request.app.state.parser_pool,
+            parse_with_legacy_parser,
+            request.text,
+            False
+        )
+        if ai_available:
+            ai_result, legacy_result = await asyncio.gather(
+                ClaudeService.analyze_deed_document_async(request.text),
+                legacy_task,
+                return_exceptions=True
+            )
         else:
+            (legacy_result,) = await asyncio.gather(legacy_task, return_exceptions=True)
+        
+        # AI analysis result
+        if not ai_available:
             results['ai_status'] = 'unavailable'
+        elif isinstance(ai_result, Exception):
+            results['ai_status'] = 'failed'
+            results['ai_error'] = str(ai_result)
+        else:
+            results['ai_analysis'] = ai_result
+            results['ai_status'] = 'success'
         
-        # Try legacy parsing
-        try:
-            import sys
-            import os
-            
-            # Add the original deed_reader path
-            original_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                'deed_reader'
-            )
-            sys.path.insert(0, original_path)
-            
-            from deed_reader.core.deed_parser import AdvancedDeedParser
-            
-            parser = AdvancedDeedParser(enable_filtering=True, filter_mode='hybrid')
-            calls = parser.parse_deed_text(request.text)
-            
-            # Convert to serializable format
-            parsed_calls = []
-            for call in calls:
-                call_dict = {
-                    'call_type': call.call_type,
-                    'bearing': call.bearing,
-                    'distance': call.distance,
-                    'units': call.units,
-                    'monument': call.monument,
-                    'description': call.description,
-                    'raw_text': call.raw_text,
-                    'confidence': call.confidence
-                }
-                parsed_calls.append(call_dict)
-            
+        # Legacy parsing result
+        if isinstance(legacy_result, Exception):
+            results['legacy_status'] = 'failed'
+            results['legacy_error'] = str(legacy_result)
+        else:
+            parsed_calls, summary = legacy_result
             results['legacy_analysis'] = {
                 'parsed_calls': parsed_calls,
-                'summary': parser.get_call_summary()
+                'summary': summary
             }
             results['legacy_status'] = 'success'
-            
-        except Exception as e:
-            results['legacy_status'] = 'failed'
-            results['legacy_error'] = str(e)
         
         # Add comparison metadata
         results['comparison_metadata'] = {
@@ -429,4 +507,19 @@ async def compare_analysis(request: CompareRequest):
                 'error': 'Comparison failed',
                 'message': str(e)
             }
-        ) 
\ No newline at end of file
+        )
+
+
+@router.get("/budget", response_model=BudgetResponse)
+async def get_token_budget():
+    """
+    Report Claude token budget usage.
+    
+    Shows tokens reserved in the current rolling window, overall and
+    per endpoint, against the configured tokens-per-minute budget.
+    """
+    return BudgetResponse(
+        success=True,
+        budget=ClaudeService.token_budget_status(),
+        message='Token budget retrieved successfully'
+    )
\ No newline at end of file
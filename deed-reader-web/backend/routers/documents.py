@@ -5,20 +5,26 @@ Handles file upload, OCR, and document processing with async support.
 """
 
 import os
+import re
+import json
+import uuid
+import hashlib
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
+import threading
+from typing import Optional, Dict, Any, List, BinaryIO, Set, Tuple
 from pathlib import Path
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse
 from pydantic import BaseModel, Field, validator
-import aiofiles
-import PyPDF2
 from PIL import Image
+import numpy as np
 
-from services.ocr_service import OCRService
-from services.claude_service import ClaudeService
+from services.ocr_service import OCRService, TESSERACT_AVAILABLE, get_ocr_pool
+from services.claude_service import ClaudeService, LoopSemaphore
+from services.cache_service import ContentCache, fingerprint
+from services.pdf_service import count_pages, extract_pages, get_pdf_pool, page_blocks, PDF_PAGE_BLOCK
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +32,44 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Constants
-ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp'}
+ALLOWED_EXTENSIONS = frozenset({'txt', 'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp'})
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+OCR_PAGE_MIN_CHARS = 50  # Pages with less extracted text than this are OCR'd
+ENHANCE_PAGE_BATCH = 10  # Pages per Claude enhancement call
+ENHANCE_CONCURRENCY = 5  # Enhancement batches in flight per document
+TEXT_DIR = Path("uploads") / ".text"  # Extracted text, served by GET /{upload_id}/text
+UPLOAD_INDEX_PATH = Path("uploads") / ".index.json"
+UPLOAD_ID_LENGTH = 16  # Hex digits of the content SHA-256 used as the upload id
+
+# Caps OCR jobs (an image, or a batch of PDF pages) in flight across
+# concurrent uploads at one per core
+_ocr_slots = LoopSemaphore(os.cpu_count() or 1)
+
+# Extracted text keyed by SHA-256 of the uploaded bytes (memory + disk)
+extraction_cache = ContentCache(max_entries=128, disk_dir=os.path.join("uploads", ".cache"))
+# /validate responses keyed by SHA-256 of the submitted text
+validation_cache = ContentCache(max_entries=1024, ttl=3600)
+
+# Keyword scans for document validation, compiled once at import
+DEED_KEYWORDS = [
+    'deed', 'grantor', 'grantee', 'bearing', 'feet', 
+    'thence', 'metes', 'bounds', 'parcel', 'tract'
+]
+COORDINATE_PATTERNS = ['°', 'degrees', 'north', 'south', 'east', 'west', "n", "s", "e", "w"]
+# Matched against lowercased text: case-insensitive alternations are several
+# times slower in the regex engine
+_DEED_RE = re.compile('|'.join(map(re.escape, DEED_KEYWORDS)))
+_COORDINATE_RE = re.compile('|'.join(map(re.escape, COORDINATE_PATTERNS)))
+
+# Anything but alphanumeric, dash, underscore and dot, including path separators
+_UNSAFE_FILENAME_RE = re.compile(r'[^a-zA-Z0-9._-]')
+_UPLOAD_ID_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+# upload_id -> stored filename (<upload_id>.<ext> under uploads/), persisted
+# so ids survive restarts
+UPLOAD_INDEX: Dict[str, str] = {}
+_upload_index_lock = threading.Lock()
 
 # Pydantic models for request/response
 class TextProcessRequest(BaseModel):
@@ -55,86 +97,283 @@ class DocumentValidationResponse(BaseModel):
     score: float
 
 class DocumentUploadResponse(BaseModel):
-    """Model for document upload responses."""
+    """Model for document upload responses. The text itself is at text_url."""
     success: bool
     filename: str
     file_type: str
     text_length: int
-    extracted_text: str
     upload_id: str
+    text_url: str
     message: str
 
 
-def allowed_file(filename: str) -> bool:
-    """Check if file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def allowed_extension(filename: str) -> Optional[str]:
+    """Return the lowercased file extension if it is allowed, otherwise None."""
+    dot = filename.rfind('.')
+    if dot < 0:
+        return None
+    extension = filename[dot + 1:].lower()
+    return extension if extension in ALLOWED_EXTENSIONS else None
 
 
 def secure_filename(filename: str) -> str:
     """Secure a filename by removing potentially dangerous characters."""
-    # Remove any path separators
-    filename = filename.replace('/', '_').replace('\\', '_')
-    # Keep only alphanumeric, dash, underscore, and dot
-    import re
-    filename = re.sub(r'[^a-zA-Z0-9._-]', '_', filename)
+    # Keep only alphanumeric, dash, underscore, and dot; this also
+    # replaces any path separators
+    filename = _UNSAFE_FILENAME_RE.sub('_', filename)
     # Ensure it has an extension
     if '.' not in filename:
         filename = filename + '.txt'
     return filename
 
 
+def _scan_validation_keywords(text: str) -> Tuple[bool, bool]:
+    """
+    Return (contains deed keyword, contains coordinate pattern).
+    
+    Two compiled searches over the lowercased text, each stopping at its
+    first match. The single letters in COORDINATE_PATTERNS match almost
+    anywhere, so a combined scan would walk nearly every position of
+    non-deed text in Python.
+    """
+    text = text.lower()
+    return bool(_DEED_RE.search(text)), bool(_COORDINATE_RE.search(text))
+
+
+def _load_upload_index():
+    """Merge the persisted upload index into memory."""
+    try:
+        with open(UPLOAD_INDEX_PATH, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.warning(f"Failed to read upload index: {e}")
+        return
+    with _upload_index_lock:
+        UPLOAD_INDEX.update(entries)
+
+
+def _update_upload_index(upload_id: str, filename: Optional[str]):
+    """
+    Record (or, with filename None, remove) an upload and persist the index.
+    
+    Entries other workers wrote since the last load are merged in first.
+    """
+    _load_upload_index()
+    with _upload_index_lock:
+        if filename is None:
+            UPLOAD_INDEX.pop(upload_id, None)
+        else:
+            UPLOAD_INDEX[upload_id] = filename
+        try:
+            UPLOAD_INDEX_PATH.parent.mkdir(exist_ok=True)
+            tmp_path = UPLOAD_INDEX_PATH.with_name(f"{UPLOAD_INDEX_PATH.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(UPLOAD_INDEX), encoding='utf-8')
+            os.replace(tmp_path, UPLOAD_INDEX_PATH)
+        except Exception as e:
+            logger.warning(f"Failed to write upload index: {e}")
+
+
+def _text_path(upload_id: str) -> Path:
+    """Path of the stored extracted text for an upload."""
+    return TEXT_DIR / f"{upload_id}.txt"
+
+
+def _store_text(upload_id: str, text: str):
+    """Write an upload's extracted text where GET /{upload_id}/text serves it from."""
+    TEXT_DIR.mkdir(parents=True, exist_ok=True)
+    _text_path(upload_id).write_text(text, encoding='utf-8')
+
+
+async def _upload_response(filename: str, file_extension: str, content_key: str,
+                           text: str, file_path: Path) -> DocumentUploadResponse:
+    """
+    Index the upload, store its extracted text and build the response pointing at it.
+    
+    The uploaded file is moved from file_path to a name derived from the
+    upload id, so each id owns exactly one stored file.
+    """
+    upload_id = content_key[:UPLOAD_ID_LENGTH]
+    stored_filename = f"{upload_id}.{file_extension}"
+    await asyncio.to_thread(os.replace, file_path, file_path.parent / stored_filename)
+    await asyncio.to_thread(_store_text, upload_id, text)
+    await asyncio.to_thread(_update_upload_index, upload_id, stored_filename)
+    return DocumentUploadResponse(
+        success=True,
+        filename=filename,
+        file_type=file_extension,
+        text_length=len(text),
+        upload_id=upload_id,
+        text_url=f"/api/documents/{upload_id}/text",
+        message="Document uploaded and processed successfully"
+    )
+
+
+def _save_upload(source: BinaryIO, file_path: Path, max_size: int,
+                 keep_contents: bool = False) -> Tuple[int, str, Optional[bytes]]:
+    """
+    Copy an upload to disk in chunks, hashing it along the way.
+    
+    Stops as soon as more than max_size bytes have been read. Returns the
+    number of bytes read, the SHA-256 hex digest of the content and, with
+    keep_contents, the content itself so callers need not read it back.
+    """
+    size = 0
+    hasher = hashlib.sha256()
+    chunks = [] if keep_contents else None
+    with open(file_path, 'wb') as out:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                break
+            hasher.update(chunk)
+            out.write(chunk)
+            if keep_contents:
+                chunks.append(chunk)
+    return size, hasher.hexdigest(), b"".join(chunks) if keep_contents else None
+
+
+async def _run_ocr(func, *args):
+    """Run an OCR function on the OCR pool, holding one of the per-core slots."""
+    loop = asyncio.get_event_loop()
+    async with _ocr_slots:
+        return await loop.run_in_executor(get_ocr_pool(), func, *args)
+
+
+async def ocr_pdf_pages_async(file_path: str, page_numbers: List[int]) -> Tuple[List[Tuple[int, str]], Optional[float]]:
+    """
+    OCR the given pages of a PDF, fanning them out to the OCR pool.
+    
+    Pages are rendered once in the parent and sent to workers as pixel arrays,
+    split into one batch per core, each OCR'd by a single Tesseract run.
+    Without Tesseract, OCR goes through Claude Vision, awaited here on this
+    loop's client.
+    Returns (page_num, text) pairs and the mean Tesseract confidence.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        pages = await loop.run_in_executor(None, OCRService.render_pdf_pages, file_path, page_numbers)
+    except Exception as e:
+        logger.error(f"Error rendering PDF for OCR: {e}")
+        return [], None
+    
+    if not TESSERACT_AVAILABLE:
+        return await vision_pdf_pages_async(pages), None
+    
+    scanned = [(page_num, pixels) for page_num, text, pixels in pages if text is None]
+    ocr_texts = {}
+    confidences = []
+    
+    async def ocr_batch(batch: List[Tuple[int, np.ndarray]]):
+        try:
+            results = await _run_ocr(OCRService.ocr_pages_batch, [pixels for _, pixels in batch])
+        except Exception as e:
+            logger.error(f"OCR failed on pages {batch[0][0] + 1}-{batch[-1][0] + 1}: {e}")
+            results = [("", None)] * len(batch)
+        for (page_num, _), (text, confidence) in zip(batch, results):
+            ocr_texts[page_num] = text
+            if confidence is not None:
+                confidences.append(confidence)
+    
+    await asyncio.gather(*[ocr_batch(batch) for batch in OCRService.page_batches(scanned)])
+    page_texts = [
+        (page_num, OCRService.clean_ocr_text(ocr_texts[page_num] if text is None else text))
+        for page_num, text, _ in pages
+    ]
+    mean_confidence = sum(confidences) / len(confidences) if confidences else None
+    return page_texts, mean_confidence
+
+
+async def vision_pdf_pages_async(pages: List[Tuple[int, Optional[str], Optional[np.ndarray]]]) -> List[Tuple[int, str]]:
+    """
+    OCR rendered PDF pages (from OCRService.render_pdf_pages) with Claude Vision.
+    
+    Returns (page_num, text) pairs; pages with embedded text keep it.
+    """
+    scanned = [pixels for _, text, pixels in pages if text is None]
+    vision_texts = []
+    if scanned and ClaudeService.is_available():
+        pngs = await asyncio.to_thread(lambda: [OCRService.encode_page_png(pixels) for pixels in scanned])
+        vision_texts = await ClaudeService.extract_text_from_images_async(pngs)
+    elif scanned:
+        logger.error("Neither Tesseract nor Claude is available for OCR")
+    
+    vision_results = iter(vision_texts)
+    page_texts = []
+    for page_num, text, _ in pages:
+        if text is None:
+            text = next(vision_results, None) or ""
+        page_texts.append((page_num, OCRService.clean_ocr_text(text)))
+    return page_texts
+
+
+async def enhance_ocr_pages(page_texts: List[str], ocr_pages: Set[int]) -> List[str]:
+    """
+    Enhance OCR'd PDF pages with Claude in concurrent batches.
+    
+    Pages are grouped into batches of ENHANCE_PAGE_BATCH, and up to
+    ENHANCE_CONCURRENCY batches are enhanced at once; batches with no OCR'd
+    page are left as extracted. Returns each batch's text in page order.
+    """
+    slots = asyncio.Semaphore(ENHANCE_CONCURRENCY)
+    
+    async def enhance_batch(pages: range) -> str:
+        batch_text = "\n".join(page_texts[i] for i in pages if page_texts[i].strip())
+        if not batch_text or not any(i in ocr_pages for i in pages):
+            return batch_text
+        async with slots:
+            enhanced_text = await ClaudeService.enhance_ocr_text_async(batch_text)
+        return enhanced_text or batch_text
+    
+    batches = [
+        range(start, min(start + ENHANCE_PAGE_BATCH, len(page_texts)))
+        for start in range(0, len(page_texts), ENHANCE_PAGE_BATCH)
+    ]
+    return await asyncio.gather(*[enhance_batch(pages) for pages in batches])
+
+
 async def extract_text_from_pdf_async(file_path: str) -> str:
     """Extract text from PDF file asynchronously."""
     try:
-        # Run CPU-intensive PDF extraction in thread pool
         loop = asyncio.get_event_loop()
         
-        def sync_extract():
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                if not pdf_reader.pages:
-                    logger.warning(f"PDF file has no pages: {file_path}")
-                    return ""
-                    
-                for i, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                        else:
-                            logger.warning(f"No text extracted from page {i+1}")
-                    except Exception as page_e:
-                        logger.error(f"Error extracting text from page {i+1}: {page_e}")
-                
-                return text.strip()
+        n_pages = await loop.run_in_executor(None, count_pages, file_path)
+        if not n_pages:
+            logger.warning(f"PDF file has no pages: {file_path}")
         
-        # Extract text in thread pool
-        text = await loop.run_in_executor(None, sync_extract)
+        if n_pages <= PDF_PAGE_BLOCK:
+            # A single block isn't worth a process hop
+            page_texts = await loop.run_in_executor(None, extract_pages, file_path, 0, n_pages)
+        else:
+            # Extract blocks of pages in parallel and stitch them back in page order
+            pool = get_pdf_pool()
+            blocks = await asyncio.gather(*[
+                loop.run_in_executor(pool, extract_pages, file_path, start, end)
+                for start, end in page_blocks(n_pages)
+            ])
+            page_texts = [page_text for block in blocks for page_text in block]
         
-        # If no text found or very little text, try OCR
-        if len(text.strip()) < 100:
-            logger.info(f"PDF appears to be scanned. Using OCR...")
-            ocr_text = await loop.run_in_executor(
-                None, 
-                OCRService.extract_text_from_pdf, 
-                file_path
-            )
+        # OCR only the pages that came back empty or nearly so
+        short_pages = [i for i, page_text in enumerate(page_texts) if len(page_text.strip()) < OCR_PAGE_MIN_CHARS]
+        ocr_page_nums = set()
+        confidence = None
+        if short_pages:
+            logger.info(f"{len(short_pages)} of {n_pages} PDF pages have little or no text. Using OCR...")
+            ocr_pages, confidence = await ocr_pdf_pages_async(file_path, short_pages)
             
-            if ocr_text and len(ocr_text) > len(text):
-                text = ocr_text
-                
-                # Use Claude to enhance the OCR text if available
-                if ClaudeService.is_available():
-                    logger.info("Using Claude to enhance OCR text...")
-                    enhanced_text = await loop.run_in_executor(
-                        None,
-                        ClaudeService.enhance_ocr_text,
-                        text
-                    )
-                    if enhanced_text:
-                        text = enhanced_text
+            for page_num, ocr_text in ocr_pages:
+                if len(ocr_text.strip()) > len(page_texts[page_num].strip()):
+                    page_texts[page_num] = ocr_text
+                    ocr_page_nums.add(page_num)
+        
+        text = "\n".join(page_text for page_text in page_texts if page_text.strip()).strip()
+        
+        # Use Claude to enhance the OCR text if available and needed
+        if ocr_page_nums and ClaudeService.is_available() and OCRService.needs_enhancement(text, confidence):
+            logger.info("Using Claude to enhance OCR text...")
+            batch_texts = await enhance_ocr_pages(page_texts, ocr_page_nums)
+            text = "\n".join(batch_text for batch_text in batch_texts if batch_text.strip()).strip()
         
         return text
         
@@ -150,26 +389,22 @@ async def extract_text_from_image_async(file_path: str) -> str:
     """Extract text from image using OCR asynchronously."""
     logger.info(f"Attempting to extract text from image: {file_path}")
     try:
-        # Run OCR in thread pool
-        loop = asyncio.get_event_loop()
-        text = await loop.run_in_executor(
-            None,
-            OCRService.extract_text_from_image,
-            file_path
-        )
+        # Run Tesseract OCR on the OCR pool; the Claude Vision fallback is
+        # awaited on this loop's client
+        if TESSERACT_AVAILABLE:
+            text, confidence = await _run_ocr(OCRService.extract_text_with_confidence, file_path)
+        else:
+            text = await OCRService.extract_text_with_vision_async(file_path)
+            confidence = None
         
         if not text:
             logger.warning(f"No text extracted from image: {file_path}")
             return ""
             
-        # Use Claude to enhance the OCR text if available
-        if ClaudeService.is_available():
+        # Use Claude to enhance the OCR text if available and needed
+        if ClaudeService.is_available() and OCRService.needs_enhancement(text, confidence):
             logger.info("Using Claude to enhance OCR text from image...")
-            enhanced_text = await loop.run_in_executor(
-                None,
-                ClaudeService.enhance_ocr_text,
-                text
-            )
+            enhanced_text = await ClaudeService.enhance_ocr_text_async(text)
             if enhanced_text:
                 text = enhanced_text
                 
@@ -198,43 +433,51 @@ async def upload_document(
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file selected")
     
-    if not allowed_file(file.filename):
+    file_extension = allowed_extension(file.filename)
+    if file_extension is None:
         raise HTTPException(
             status_code=400, 
             detail=f"File type not allowed. Supported types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Check file size
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
+    # Secure filename and prepare path; the upload is written under a
+    # temporary name until its content hash (the upload id) is known
+    filename = secure_filename(file.filename)
+    upload_dir = Path("uploads")
+    upload_dir.mkdir(exist_ok=True)
+    file_path = upload_dir / f".incoming-{uuid.uuid4().hex}.{file_extension}"
+    
+    # Stream to disk in chunks, checking size and hashing as we go; text
+    # uploads are kept in memory too since they are the extracted text
+    size, content_key, contents = await asyncio.to_thread(
+        _save_upload, file.file, file_path, MAX_FILE_SIZE, file_extension == 'txt'
+    )
+    if size > MAX_FILE_SIZE:
+        file_path.unlink(missing_ok=True)
         raise HTTPException(
             status_code=413,
             detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"
         )
     
-    # Reset file pointer
-    await file.seek(0)
+    logger.info(f"File '{filename}' saved successfully")
     
-    # Secure filename and prepare path
-    filename = secure_filename(file.filename)
-    upload_dir = Path("uploads")
-    upload_dir.mkdir(exist_ok=True)
-    file_path = upload_dir / filename
+    # Skip extraction entirely if these exact bytes were processed before
+    cached_text = extraction_cache.get(content_key, use_disk=False)
+    if cached_text is None:
+        loop = asyncio.get_event_loop()
+        cached_text = await loop.run_in_executor(None, extraction_cache.get, content_key)
+    
+    if cached_text is not None:
+        logger.info(f"Extraction cache hit for '{filename}' ({content_key[:12]})")
+        return await _upload_response(filename, file_extension, content_key, cached_text, file_path)
     
     try:
-        # Save file asynchronously
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(contents)
-        
-        logger.info(f"File '{filename}' saved successfully")
-        
         # Extract text based on file type
-        file_extension = filename.rsplit('.', 1)[1].lower()
         extracted_text = ""
         
         if file_extension == 'txt':
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                extracted_text = await f.read()
+            # Decode as read_text() would, including newline translation
+            extracted_text = contents.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
                 
         elif file_extension == 'pdf':
             extracted_text = await extract_text_from_pdf_async(str(file_path))
@@ -255,19 +498,15 @@ async def upload_document(
                 detail="No readable text found in document"
             )
         
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, extraction_cache.set, content_key, extracted_text)
+        
         # Return successful response
-        return DocumentUploadResponse(
-            success=True,
-            filename=filename,
-            file_type=file_extension,
-            text_length=len(extracted_text),
-            extracted_text=extracted_text,
-            upload_id=filename.replace('.', '_'),
-            message="Document uploaded and processed successfully"
-        )
+        return await _upload_response(filename, file_extension, content_key, extracted_text, file_path)
         
     except HTTPException:
-        # Re-raise HTTP exceptions
+        # Re-raise HTTP exceptions, dropping the never-stored upload
+        file_path.unlink(missing_ok=True)
         raise
     except Exception as e:
         logger.error(f"Unexpected error processing document: {e}", exc_info=True)
@@ -310,21 +549,18 @@ async def validate_document(request: DocumentValidationRequest) -> DocumentValid
     - Deed-related keywords
     - Coordinate information
     """
-    text = request.text.lower()
-    
-    # Define deed keywords
-    deed_keywords = [
-        'deed', 'grantor', 'grantee', 'bearing', 'feet', 
-        'thence', 'metes', 'bounds', 'parcel', 'tract'
-    ]
-    
-    coordinate_patterns = ['°', 'degrees', 'north', 'south', 'east', 'west', "n", "s", "e", "w"]
+    text = request.text
+    cache_key = fingerprint(text)
+    cached = validation_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     # Validation checks
+    contains_deed_keywords, has_coordinates = _scan_validation_keywords(text)
     checks = {
         'length': len(text) >= 50,
-        'contains_deed_keywords': any(keyword in text for keyword in deed_keywords),
-        'has_coordinates': any(pattern in text for pattern in coordinate_patterns),
+        'contains_deed_keywords': contains_deed_keywords,
+        'has_coordinates': has_coordinates,
         'readable_format': True
     }
     
@@ -348,13 +584,15 @@ async def validate_document(request: DocumentValidationRequest) -> DocumentValid
     score = sum(checks.values()) / len(checks)
     is_valid = len(issues) == 0
     
-    return DocumentValidationResponse(
+    response = DocumentValidationResponse(
         is_valid=is_valid,
         checks=checks,
         issues=issues,
         suggestions=suggestions,
         score=score
     )
+    validation_cache.set(cache_key, response)
+    return response
 
 
 # Additional utility endpoints
@@ -369,18 +607,33 @@ async def get_supported_formats():
     }
 
 
+@router.get("/{upload_id}/text")
+async def get_document_text(upload_id: str):
+    """Stream the extracted text of an uploaded document as plain text."""
+    text_path = _text_path(upload_id)
+    if not _UPLOAD_ID_RE.match(upload_id) or not text_path.exists():
+        raise HTTPException(status_code=404, detail="Document text not found")
+    
+    return FileResponse(text_path, media_type="text/plain; charset=utf-8")
+
+
 @router.delete("/{upload_id}")
 async def delete_document(upload_id: str):
     """Delete an uploaded document."""
-    # Convert upload_id back to filename
-    filename = upload_id.replace('_', '.')
-    file_path = Path("uploads") / filename
+    # Look up the stored filename; another worker may have made the upload
+    filename = UPLOAD_INDEX.get(upload_id)
+    if filename is None:
+        await asyncio.to_thread(_load_upload_index)
+        filename = UPLOAD_INDEX.get(upload_id)
     
-    if not file_path.exists():
+    if filename is None or not (Path("uploads") / filename).exists():
         raise HTTPException(status_code=404, detail="Document not found")
+    file_path = Path("uploads") / filename
     
     try:
         file_path.unlink()
+        _text_path(upload_id).unlink(missing_ok=True)
+        await asyncio.to_thread(_update_upload_index, upload_id, None)
         return {"message": f"Document {filename} deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting document {filename}: {e}")
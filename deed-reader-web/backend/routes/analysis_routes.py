@@ -1,46 +1,53 @@
 """
 Analysis Routes for Deed Reader Pro
 ----------------------------------
-Handles AI-powered document analysis using Claude.
+Thin Flask shim for /api/analysis, kept while the frontend still calls the
+Flask app for analysis. The endpoints are implemented by the FastAPI
+analysis router; these handlers call the same ClaudeService methods and
+legacy parser helper and keep the original Flask response shapes.
 """
 
 import logging
 from flask import Blueprint, request, jsonify
 from services.claude_service import ClaudeService
+from routers.analysis import parse_with_legacy_parser
 
 logger = logging.getLogger(__name__)
 
 analysis_bp = Blueprint('analysis', __name__)
 
+def request_text(purpose):
+    """Return (text, None) from the JSON body, or (None, error response) if it's missing or too short."""
+    data = request.get_json(silent=True)
+    if not data or 'text' not in data:
+        return None, (jsonify({'error': 'No text provided'}), 400)
+    text = data['text']
+    if not text or len(text.strip()) < 10:
+        return None, (jsonify({'error': f'Text too short for {purpose}'}), 400)
+    return text, None
+
+def claude_unavailable(feature):
+    """503 response for an AI endpoint when Claude isn't configured."""
+    return jsonify({
+        'error': f'AI {feature} not available',
+        'message': 'Claude service is not configured'
+    }), 503
+
 @analysis_bp.route('/analyze', methods=['POST'])
 def analyze_deed():
     """Perform comprehensive AI analysis of deed document."""
     try:
-        data = request.get_json()
-        
-        if not data or 'text' not in data:
-            return jsonify({'error': 'No text provided'}), 400
-        
-        text = data['text']
-        
-        if not text or len(text.strip()) < 10:
-            return jsonify({'error': 'Text too short for analysis'}), 400
-        
-        # Check if Claude is available
+        text, error = request_text('analysis')
+        if error:
+            return error
         if not ClaudeService.is_available():
-            return jsonify({
-                'error': 'AI analysis not available',
-                'message': 'Claude service is not configured'
-            }), 503
+            return claude_unavailable('analysis')
         
-        # Perform AI analysis
         analysis_result = ClaudeService.analyze_deed_document(text)
-        
-        # Add metadata
         analysis_result['analysis_metadata'] = {
             'text_length': len(text),
-            'token_count': len(text.split()),  # Simple token count
-            'analysis_timestamp': None,  # Could add timestamp
+            'token_count': len(text.split()),
+            'analysis_timestamp': None,
             'model_used': ClaudeService._model
         }
         
@@ -49,7 +56,7 @@ def analyze_deed():
             'analysis': analysis_result,
             'message': 'Deed analysis completed successfully'
         })
-        
+    
     except Exception as e:
         logger.error(f"Error in deed analysis: {e}")
         return jsonify({
@@ -61,24 +68,12 @@ def analyze_deed():
 def generate_summary():
     """Generate a concise summary of the deed document."""
     try:
-        data = request.get_json()
-        
-        if not data or 'text' not in data:
-            return jsonify({'error': 'No text provided'}), 400
-        
-        text = data['text']
-        
-        if not text or len(text.strip()) < 10:
-            return jsonify({'error': 'Text too short for summary'}), 400
-        
-        # Check if Claude is available
+        text, error = request_text('summary')
+        if error:
+            return error
         if not ClaudeService.is_available():
-            return jsonify({
-                'error': 'AI summary not available',
-                'message': 'Claude service is not configured'
-            }), 503
+            return claude_unavailable('summary')
         
-        # Generate summary
         summary = ClaudeService.generate_summary(text)
         
         return jsonify({
@@ -91,7 +86,7 @@ def generate_summary():
             },
             'message': 'Summary generated successfully'
         })
-        
+    
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
         return jsonify({
@@ -103,24 +98,12 @@ def generate_summary():
 def extract_coordinates():
     """Extract coordinate information from deed text."""
     try:
-        data = request.get_json()
-        
-        if not data or 'text' not in data:
-            return jsonify({'error': 'No text provided'}), 400
-        
-        text = data['text']
-        
-        if not text or len(text.strip()) < 10:
-            return jsonify({'error': 'Text too short for coordinate extraction'}), 400
-        
-        # Check if Claude is available
+        text, error = request_text('coordinate extraction')
+        if error:
+            return error
         if not ClaudeService.is_available():
-            return jsonify({
-                'error': 'AI coordinate extraction not available',
-                'message': 'Claude service is not configured'
-            }), 503
+            return claude_unavailable('coordinate extraction')
         
-        # Extract coordinates
         coordinates = ClaudeService.extract_coordinates(text)
         
         return jsonify({
@@ -132,7 +115,7 @@ def extract_coordinates():
             },
             'message': 'Coordinate extraction completed successfully'
         })
-        
+    
     except Exception as e:
         logger.error(f"Error extracting coordinates: {e}")
         return jsonify({
@@ -144,29 +127,20 @@ def extract_coordinates():
 def validate_analysis():
     """Validate extracted deed data using AI."""
     try:
-        data = request.get_json()
-        
+        data = request.get_json(silent=True)
         if not data or 'extracted_data' not in data:
             return jsonify({'error': 'No extracted data provided'}), 400
-        
-        extracted_data = data['extracted_data']
-        
-        # Check if Claude is available
         if not ClaudeService.is_available():
-            return jsonify({
-                'error': 'AI validation not available',
-                'message': 'Claude service is not configured'
-            }), 503
+            return claude_unavailable('validation')
         
-        # Validate data
-        validation_result = ClaudeService.validate_deed_data(extracted_data)
+        validation_result = ClaudeService.validate_deed_data(data['extracted_data'])
         
         return jsonify({
             'success': True,
             'validation': validation_result,
             'message': 'Data validation completed successfully'
         })
-        
+    
     except Exception as e:
         logger.error(f"Error validating data: {e}")
         return jsonify({
@@ -178,66 +152,26 @@ def validate_analysis():
 def parse_deed_legacy():
     """Parse deed using legacy parser for comparison."""
     try:
-        data = request.get_json()
-        
+        data = request.get_json(silent=True)
         if not data or 'text' not in data:
             return jsonify({'error': 'No text provided'}), 400
         
-        text = data['text']
-        
-        # Try to import and use the original deed parser
         try:
-            import sys
-            import os
-            
-            # Add the original deed_reader path
-            original_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'deed_reader')
-            sys.path.insert(0, original_path)
-            
-            from deed_reader.core.deed_parser import AdvancedDeedParser
-            
-            # Parse using original logic
-            parser = AdvancedDeedParser(enable_filtering=True, filter_mode='hybrid')
-            calls = parser.parse_deed_text(text)
-            
-            # Convert to serializable format
-            parsed_calls = []
-            for call in calls:
-                call_dict = {
-                    'call_type': call.call_type,
-                    'bearing': call.bearing,
-                    'distance': call.distance,
-                    'units': call.units,
-                    'monument': call.monument,
-                    'description': call.description,
-                    'raw_text': call.raw_text,
-                    'confidence': call.confidence
-                }
-                
-                if call.curve_data:
-                    call_dict['curve_data'] = call.curve_data
-                if call.passing_monuments:
-                    call_dict['passing_monuments'] = call.passing_monuments
-                    
-                parsed_calls.append(call_dict)
-            
-            # Get summary
-            summary = parser.get_call_summary()
-            
-            return jsonify({
-                'success': True,
-                'parsed_calls': parsed_calls,
-                'summary': summary,
-                'message': 'Legacy parsing completed successfully'
-            })
-            
+            parsed_calls, summary = parse_with_legacy_parser(data['text'])
         except ImportError as ie:
             logger.warning(f"Legacy parser not available: {ie}")
             return jsonify({
                 'error': 'Legacy parser not available',
                 'message': 'Original deed parser could not be imported'
             }), 503
-            
+        
+        return jsonify({
+            'success': True,
+            'parsed_calls': parsed_calls,
+            'summary': summary,
+            'message': 'Legacy parsing completed successfully'
+        })
+    
     except Exception as e:
         logger.error(f"Error in legacy parsing: {e}")
         return jsonify({
@@ -249,19 +183,16 @@ def parse_deed_legacy():
 def compare_analysis():
     """Compare AI analysis with legacy parsing results."""
     try:
-        data = request.get_json()
-        
+        data = request.get_json(silent=True)
         if not data or 'text' not in data:
             return jsonify({'error': 'No text provided'}), 400
         
         text = data['text']
         results = {}
         
-        # Try AI analysis
         if ClaudeService.is_available():
             try:
-                ai_analysis = ClaudeService.analyze_deed_document(text)
-                results['ai_analysis'] = ai_analysis
+                results['ai_analysis'] = ClaudeService.analyze_deed_document(text)
                 results['ai_status'] = 'success'
             except Exception as e:
                 results['ai_status'] = 'failed'
@@ -269,46 +200,17 @@ def compare_analysis():
         else:
             results['ai_status'] = 'unavailable'
         
-        # Try legacy parsing
         try:
-            import sys
-            import os
-            
-            # Add the original deed_reader path
-            original_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'deed_reader')
-            sys.path.insert(0, original_path)
-            
-            from deed_reader.core.deed_parser import AdvancedDeedParser
-            
-            parser = AdvancedDeedParser(enable_filtering=True, filter_mode='hybrid')
-            calls = parser.parse_deed_text(text)
-            
-            # Convert to serializable format
-            parsed_calls = []
-            for call in calls:
-                call_dict = {
-                    'call_type': call.call_type,
-                    'bearing': call.bearing,
-                    'distance': call.distance,
-                    'units': call.units,
-                    'monument': call.monument,
-                    'description': call.description,
-                    'raw_text': call.raw_text,
-                    'confidence': call.confidence
-                }
-                parsed_calls.append(call_dict)
-            
+            parsed_calls, summary = parse_with_legacy_parser(text, include_extras=False)
             results['legacy_analysis'] = {
                 'parsed_calls': parsed_calls,
-                'summary': parser.get_call_summary()
+                'summary': summary
             }
             results['legacy_status'] = 'success'
-            
         except Exception as e:
             results['legacy_status'] = 'failed'
             results['legacy_error'] = str(e)
         
-        # Add comparison metadata
         results['comparison_metadata'] = {
             'text_length': len(text),
             'both_available': results.get('ai_status') == 'success' and results.get('legacy_status') == 'success'
@@ -319,10 +221,10 @@ def compare_analysis():
             'comparison': results,
             'message': 'Analysis comparison completed'
         })
-        
+    
     except Exception as e:
         logger.error(f"Error in comparison: {e}")
         return jsonify({
             'error': 'Comparison failed',
             'message': str(e)
-        }), 500 
\ No newline at end of file
+        }), 500
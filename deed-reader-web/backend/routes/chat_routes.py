@@ -4,16 +4,80 @@ Chat Routes for Deed Reader Pro
 Handles interactive Q&A about deed documents using Claude.
 """
 
+import re
+import math
 import logging
+import threading
+from collections import deque
 from flask import Blueprint, request, jsonify, session
-from services.claude_service import ClaudeService
+from services.claude_service import ClaudeService, ClaudeTimeout, TokenBudgetExceeded
+from services.cache_service import ContentCache, fingerprint
+from routes.document_routes import get_upload_text
 
 logger = logging.getLogger(__name__)
 
 chat_bp = Blueprint('chat', __name__)
 
-# In-memory storage for chat sessions (in production, use Redis or database)
-chat_sessions = {}
+# Exchanges kept per chat session; older ones are dropped as new ones arrive
+MAX_SESSION_EXCHANGES = 20
+# Sessions kept per worker; the least recently used go first, and sessions
+# idle longer than the TTL expire
+MAX_CHAT_SESSIONS = 1024
+CHAT_SESSION_TTL = 3600
+
+# In-memory storage for chat sessions (in production, use Redis or database):
+# session_id -> deque of exchanges. The lock covers read-modify-write of a
+# session so concurrent requests for one session don't drop exchanges.
+chat_sessions = ContentCache(max_entries=MAX_CHAT_SESSIONS, ttl=CHAT_SESSION_TTL)
+_sessions_lock = threading.Lock()
+
+def get_session_history(session_id):
+    """Snapshot of a session's exchanges, oldest first (empty if unknown)."""
+    with _sessions_lock:
+        return list(chat_sessions.get(session_id) or ())
+
+def record_exchange(session_id, exchange):
+    """Append an exchange to a session, creating it if needed; returns the exchange count."""
+    with _sessions_lock:
+        history = chat_sessions.get(session_id)
+        if history is None:
+            history = deque(maxlen=MAX_SESSION_EXCHANGES)
+        history.append(exchange)
+        # Re-setting refreshes the session's TTL and LRU position
+        chat_sessions.set(session_id, history)
+        return len(history)
+
+# Claude output for /suggestions and /explain, keyed by a hash of exactly
+# the document excerpt (and term) that goes into the prompt
+SUGGESTIONS_EXCERPT_CHARS = 2000
+EXPLAIN_CONTEXT_CHARS = 1000
+response_cache = ContentCache(max_entries=512, ttl=3600)
+
+# Longest /suggestions or /explain will queue for Claude token budget before
+# answering 503 with Retry-After
+CLAUDE_BUDGET_WAIT = 5.0
+
+# Leading whitespace and list bullets on a suggested question
+_BULLET_RE = re.compile(r'^[\s\-\u2022*]+')
+
+def budget_exceeded_response(error):
+    """503 telling the client when the Claude token budget will have room again."""
+    response = jsonify({
+        'error': 'AI service busy',
+        'message': 'Too many AI requests right now, please retry shortly'
+    })
+    response.headers['Retry-After'] = str(math.ceil(error.retry_after))
+    return response, 503
+
+def resolve_document_text(data):
+    """
+    Document text for a chat request: the text stored for ``upload_id`` when
+    given, so clients needn't re-send the document every turn, otherwise
+    ``document_text`` from the body. None if neither resolves.
+    """
+    if data.get('upload_id'):
+        return get_upload_text(data['upload_id'])
+    return data.get('document_text')
 
 @chat_bp.route('/ask', methods=['POST'])
 def ask_question():
@@ -21,11 +85,15 @@ def ask_question():
     try:
         data = request.get_json()
         
-        if not data or 'question' not in data or 'document_text' not in data:
+        if not data or 'question' not in data:
             return jsonify({'error': 'Question and document text are required'}), 400
         
         question = data['question']
-        document_text = data['document_text']
+        document_text = resolve_document_text(data)
+        if document_text is None:
+            if data.get('upload_id'):
+                return jsonify({'error': 'Document not found'}), 404
+            return jsonify({'error': 'Question and document text are required'}), 400
         session_id = data.get('session_id', 'default')
         
         if not question.strip():
@@ -38,15 +106,15 @@ def ask_question():
                 'message': 'Claude service is not configured'
             }), 503
         
-        # Get chat history for this session
-        chat_history = chat_sessions.get(session_id, [])
+        # Get chat history for this session (without creating one yet)
+        chat_history = get_session_history(session_id)
         
-        # Get answer from Claude
-        answer = ClaudeService.answer_question(
+        # Get answer from Claude on the shared async client
+        answer = ClaudeService.run_sync(ClaudeService.answer_question_async(
             document_text=document_text,
             question=question,
             chat_history=chat_history
-        )
+        ))
         
         # Store this exchange in chat history
         exchange = {
@@ -55,24 +123,24 @@ def ask_question():
             'timestamp': None  # Could add timestamp
         }
         
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = []
-        
-        chat_sessions[session_id].append(exchange)
-        
-        # Keep only last 20 exchanges to manage memory
-        if len(chat_sessions[session_id]) > 20:
-            chat_sessions[session_id] = chat_sessions[session_id][-20:]
+        # The deque keeps only the last MAX_SESSION_EXCHANGES exchanges
+        exchange_count = record_exchange(session_id, exchange)
         
         return jsonify({
             'success': True,
             'question': question,
             'answer': answer,
             'session_id': session_id,
-            'exchange_count': len(chat_sessions[session_id]),
+            'exchange_count': exchange_count,
             'message': 'Question answered successfully'
         })
         
+    except ClaudeTimeout as e:
+        logger.error(f"Question answering timed out: {e}")
+        return jsonify({
+            'error': 'AI service timed out',
+            'message': str(e)
+        }), 504
     except Exception as e:
         logger.error(f"Error answering question: {e}")
         return jsonify({
@@ -84,7 +152,7 @@ def ask_question():
 def get_chat_history(session_id):
     """Get chat history for a session."""
     try:
-        history = chat_sessions.get(session_id, [])
+        history = get_session_history(session_id)
         
         return jsonify({
             'success': True,
@@ -105,8 +173,8 @@ def get_chat_history(session_id):
 def clear_chat_history(session_id):
     """Clear chat history for a session."""
     try:
-        if session_id in chat_sessions:
-            del chat_sessions[session_id]
+        with _sessions_lock:
+            chat_sessions.delete(session_id)
         
         return jsonify({
             'success': True,
@@ -125,14 +193,15 @@ def clear_chat_history(session_id):
 def list_chat_sessions():
     """List all active chat sessions."""
     try:
-        sessions = [
-            {
-                'session_id': session_id,
-                'exchange_count': len(history),
-                'last_activity': history[-1].get('timestamp') if history else None
-            }
-            for session_id, history in chat_sessions.items()
-        ]
+        with _sessions_lock:
+            sessions = [
+                {
+                    'session_id': session_id,
+                    'exchange_count': len(history),
+                    'last_activity': history[-1].get('timestamp') if history else None
+                }
+                for session_id, history in chat_sessions.items()
+            ]
         
         return jsonify({
             'success': True,
@@ -154,11 +223,12 @@ def get_question_suggestions():
     try:
         data = request.get_json()
         
-        if not data or 'document_text' not in data:
+        document_text = resolve_document_text(data) if data else None
+        if document_text is None:
+            if data and data.get('upload_id'):
+                return jsonify({'error': 'Document not found'}), 404
             return jsonify({'error': 'Document text is required'}), 400
         
-        document_text = data['document_text']
-        
         # Check if Claude is available
         if not ClaudeService.is_available():
             return jsonify({
@@ -166,37 +236,49 @@ def get_question_suggestions():
                 'message': 'Claude service is not configured'
             }), 503
         
+        excerpt = document_text[:SUGGESTIONS_EXCERPT_CHARS]
+        cache_key = f"suggestions:{fingerprint(excerpt)}"
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return jsonify({
+                'success': True,
+                'suggestions': cached,
+                'message': 'Question suggestions generated successfully'
+            })
+        
         # Generate suggested questions using Claude
         suggestions_prompt = f"""
         Based on this deed document, suggest 5-7 relevant questions that a surveyor or property owner might want to ask. 
         Focus on practical questions about boundaries, measurements, monuments, and legal descriptions.
         
         Document excerpt:
-        {document_text[:2000]}...
+        {excerpt}...
         
         Return a simple list of questions, one per line:
         """
         
         try:
-            message = ClaudeService._client.messages.create(
-                model=ClaudeService._model,
-                messages=[{"role": "user", "content": suggestions_prompt}],
-                max_tokens=500,
-                temperature=0.5,
-                system="You are a helpful assistant suggesting relevant questions about deed documents for surveyors."
-            )
+            message = ClaudeService.run_sync(ClaudeService._create_message_async(
+                ClaudeService._user_request(
+                    "suggestions", suggestions_prompt,
+                    system="You are a helpful assistant suggesting relevant questions about deed documents for surveyors."
+                ),
+                "suggestions", max_wait=CLAUDE_BUDGET_WAIT
+            ))
             
             suggestions_text = message.content[0].text.strip()
             
             # Parse suggestions into a list
             suggestions = [
-                line.strip().lstrip('- ').lstrip('• ').lstrip('* ')
-                for line in suggestions_text.split('\n')
-                if line.strip() and '?' in line
+                _BULLET_RE.sub('', line).rstrip()
+                for line in suggestions_text.splitlines()
+                if '?' in line
             ]
             
-            # Fallback suggestions if none generated
-            if not suggestions:
+            if suggestions:
+                response_cache.set(cache_key, suggestions[:7])
+            else:
+                # Fallback suggestions if none generated
                 suggestions = [
                     "What are the main boundary measurements?",
                     "Who are the grantor and grantee?",
@@ -211,6 +293,9 @@ def get_question_suggestions():
                 'message': 'Question suggestions generated successfully'
             })
             
+        except TokenBudgetExceeded as e:
+            logger.warning(f"Suggestions request rejected: {e}")
+            return budget_exceeded_response(e)
         except Exception as e:
             logger.error(f"Error generating suggestions with Claude: {e}")
             
@@ -248,7 +333,7 @@ def explain_term():
             return jsonify({'error': 'Term is required'}), 400
         
         term = data['term']
-        context = data.get('document_text', '')
+        context = resolve_document_text(data) or ''
         
         if not term.strip():
             return jsonify({'error': 'Term cannot be empty'}), 400
@@ -260,6 +345,17 @@ def explain_term():
                 'message': 'Claude service is not configured'
             }), 503
         
+        context = context[:EXPLAIN_CONTEXT_CHARS]
+        cache_key = "explain:" + fingerprint(f"{term.strip().lower()}\n{context}")
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return jsonify({
+                'success': True,
+                'term': term,
+                'explanation': cached,
+                'message': 'Term explanation generated successfully'
+            })
+        
         # Generate explanation using Claude
         explanation_prompt = f"""
         Explain the following surveying or legal term in the context of deed documents.
@@ -268,21 +364,22 @@ def explain_term():
         Term: "{term}"
         
         Context from deed:
-        {context[:1000] if context else 'No additional context provided'}
+        {context if context else 'No additional context provided'}
         
         Provide a practical explanation focusing on how this term is used in surveying and deed interpretation.
         """
         
         try:
-            message = ClaudeService._client.messages.create(
-                model=ClaudeService._model,
-                messages=[{"role": "user", "content": explanation_prompt}],
-                max_tokens=300,
-                temperature=0.3,
-                system="You are an expert surveyor and legal assistant explaining technical terms clearly and accurately."
-            )
+            message = ClaudeService.run_sync(ClaudeService._create_message_async(
+                ClaudeService._user_request(
+                    "explain", explanation_prompt,
+                    system="You are an expert surveyor and legal assistant explaining technical terms clearly and accurately."
+                ),
+                "explain", max_wait=CLAUDE_BUDGET_WAIT
+            ))
             
             explanation = message.content[0].text.strip()
+            response_cache.set(cache_key, explanation)
             
             return jsonify({
                 'success': True,
@@ -291,6 +388,15 @@ def explain_term():
                 'message': 'Term explanation generated successfully'
             })
             
+        except TokenBudgetExceeded as e:
+            logger.warning(f"Explain request rejected: {e}")
+            return budget_exceeded_response(e)
+        except ClaudeTimeout as e:
+            logger.error(f"Explanation timed out: {e}")
+            return jsonify({
+                'error': 'AI service timed out',
+                'message': str(e)
+            }), 504
         except Exception as e:
             logger.error(f"Error generating explanation with Claude: {e}")
             return jsonify({
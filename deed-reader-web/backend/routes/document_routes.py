@@ -5,8 +5,10 @@ Handles file upload, OCR, and document processing.
 """
 
 import os
+import re
+import shutil
 import logging
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 from werkzeug.utils import secure_filename
 import PyPDF2
 from PIL import Image
@@ -14,54 +16,89 @@ import io
 import traceback
 from services.ocr_service import OCRService
 from services.claude_service import ClaudeService
+from services.pdf_service import count_pages, extract_pages, extract_all_pages
+from services.cache_service import ContentCache, fingerprint
 
 logger = logging.getLogger(__name__)
 
 document_bp = Blueprint('documents', __name__)
 
-ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp'}
+ALLOWED_EXTENSIONS = frozenset({'txt', 'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp'})
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB copy buffer when streaming uploads to disk
+# PDFs whose first pages have less text than this are treated as scanned (or
+# encrypted) and sent to OCR without extracting the remaining pages
+PDF_SAMPLE_PAGES = 2
+PDF_SAMPLE_MIN_CHARS = 50
+UPLOAD_ID_LENGTH = 16  # Hex digits of the text SHA-256 used as the upload id
+UPLOAD_PREVIEW_CHARS = 512
+_UPLOAD_ID_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
 
-def allowed_file(filename):
-    """Check if file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+# Extracted text by upload id, so clients get an id back instead of the whole
+# document and chat routes can look it up. Recent uploads stay in memory;
+# all are kept under UPLOAD_FOLDER/.text, the layout the FastAPI documents
+# router also serves from.
+upload_texts = ContentCache(
+    max_entries=64,
+    disk_dir=os.path.join(os.getenv('UPLOAD_FOLDER', os.path.join(os.getcwd(), 'uploads')), '.text')
+)
+
+# Validation keyword checks, compiled once; each is a single scan of the
+# original text with no lowercased copy
+_DEED_KEYWORD_RE = re.compile(r'deed|grantor|grantee|bearing|feet|thence|metes|bounds', re.IGNORECASE)
+_COORDINATE_RE = re.compile(r'°|degrees|north|south|east|west', re.IGNORECASE)
+
+def get_upload_text(upload_id):
+    """Return the extracted text stored for an upload, or None if unknown."""
+    if not upload_id or not _UPLOAD_ID_RE.match(upload_id):
+        return None
+    return upload_texts.get(upload_id)
+
+def allowed_extension(filename):
+    """Return the lowercased file extension if it is allowed, otherwise None."""
+    dot = filename.rfind('.')
+    if dot < 0:
+        return None
+    extension = filename[dot + 1:].lower()
+    return extension if extension in ALLOWED_EXTENSIONS else None
 
 def extract_text_from_pdf(file_path):
     """Extract text from PDF file."""
     try:
-        # First try standard text extraction
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            if not pdf_reader.pages:
-                logger.warning(f"PDF file has no pages: {file_path}")
-                return ""
-            for i, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                    else:
-                        logger.warning(f"No text extracted from page {i+1} of PDF: {file_path}")
-                except Exception as page_e:
-                    logger.error(f"Error extracting text from page {i+1} of PDF {file_path}: {page_e}", exc_info=True)
-            
-            # If no text found or very little text, try OCR
-            if len(text.strip()) < 100:
-                logger.info(f"PDF appears to be scanned or has minimal text. Using OCR...")
-                ocr_text = OCRService.extract_text_from_pdf(file_path)
-                if ocr_text and len(ocr_text) > len(text):
-                    logger.info(f"OCR extracted {len(ocr_text)} characters vs {len(text)} from standard extraction")
-                    text = ocr_text
-                    
-                    # Use Claude to enhance the OCR text if available
-                    if ClaudeService.is_available():
-                        logger.info("Using Claude to enhance OCR text...")
-                        enhanced_text = ClaudeService.enhance_ocr_text(text)
-                        if enhanced_text:
-                            text = enhanced_text
-            
-            return text.strip()
+        # First try standard text extraction; long PDFs are read in page
+        # blocks across the shared PDF process pool
+        n_pages = count_pages(file_path)
+        if not n_pages:
+            logger.warning(f"PDF file has no pages: {file_path}")
+            return ""
+        
+        # Sample the first pages before committing to the rest; scanned and
+        # encrypted PDFs yield (almost) nothing here and go straight to OCR
+        page_texts = extract_pages(file_path, 0, min(PDF_SAMPLE_PAGES, n_pages))
+        if len("".join(page_texts).strip()) >= PDF_SAMPLE_MIN_CHARS:
+            page_texts += extract_all_pages(file_path, n_pages, first_page=len(page_texts))
+        else:
+            logger.info(f"First {len(page_texts)} PDF pages have little or no text, skipping the rest")
+        parts = [page_text for page_text in page_texts if page_text]
+        
+        # Join once rather than growing a string page by page
+        text = "\n".join(parts)
+        
+        # If no text found or very little text, try OCR
+        if len(text.strip()) < 100:
+            logger.info(f"PDF appears to be scanned or has minimal text. Using OCR...")
+            ocr_text, confidence = OCRService.extract_text_from_pdf_with_confidence(file_path)
+            if ocr_text and len(ocr_text) > len(text):
+                logger.info(f"OCR extracted {len(ocr_text)} characters vs {len(text)} from standard extraction")
+                text = ocr_text
+                
+                # Use Claude to enhance the OCR text if available and needed
+                if ClaudeService.is_available() and OCRService.needs_enhancement(text, confidence):
+                    logger.info("Using Claude to enhance OCR text...")
+                    enhanced_text = ClaudeService.enhance_ocr_text(text)
+                    if enhanced_text:
+                        text = enhanced_text
+        
+        return text.strip()
     except FileNotFoundError:
         logger.error(f"PDF file not found: {file_path}")
         raise Exception(f"File not found: {file_path}")
@@ -85,14 +122,14 @@ def extract_text_from_image(file_path):
     logger.info(f"Attempting to extract text from image: {file_path}")
     try:
         # Use OCR service to extract text
-        text = OCRService.extract_text_from_image(file_path)
+        text, confidence = OCRService.extract_text_with_confidence(file_path)
         
         if not text:
             logger.warning(f"No text extracted from image: {file_path}")
             return ""
             
-        # Use Claude to enhance the OCR text if available
-        if ClaudeService.is_available():
+        # Use Claude to enhance the OCR text if available and needed
+        if ClaudeService.is_available() and OCRService.needs_enhancement(text, confidence):
             logger.info("Using Claude to enhance OCR text from image...")
             enhanced_text = ClaudeService.enhance_ocr_text(text)
             if enhanced_text:
@@ -126,7 +163,8 @@ def upload_document():
         # Log original filename
         logger.info(f"Received file upload attempt: Original filename '{file.filename}'")
         
-        if not allowed_file(file.filename):
+        file_extension = allowed_extension(file.filename)
+        if file_extension is None:
             logger.warning(f"File upload attempt with disallowed file type: {file.filename}")
             return jsonify({
                 'error': 'File type not allowed',
@@ -142,9 +180,11 @@ def upload_document():
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         logger.info(f"Processing file: '{filename}', saving to '{file_path}'")
         
-        # Save the file
+        # Stream the upload to disk through a fixed buffer so memory stays
+        # flat regardless of file size
         try:
-            file.save(file_path)
+            with open(file_path, 'wb') as out:
+                shutil.copyfileobj(file.stream, out, length=UPLOAD_CHUNK_SIZE)
             logger.info(f"File '{filename}' saved successfully to '{file_path}'")
         except Exception as e:
             logger.error(f"Failed to save uploaded file '{filename}' to '{file_path}': {e}", exc_info=True)
@@ -154,13 +194,14 @@ def upload_document():
             }), 500
         
         # Extract text based on file type
-        file_extension = filename.rsplit('.', 1)[1].lower()
         extracted_text = ""
         
         if file_extension == 'txt':
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    extracted_text = f.read()
+                # One binary read and decode; newlines normalized as text mode would
+                with open(file_path, 'rb') as f:
+                    extracted_text = f.read().decode('utf-8', errors='replace')
+                extracted_text = extracted_text.replace('\r\n', '\n').replace('\r', '\n')
                 logger.info(f"Successfully extracted text from TXT file: {filename}")
             except FileNotFoundError:
                 logger.error(f"TXT file not found after saving: {file_path}")
@@ -191,7 +232,7 @@ def upload_document():
                 logger.error(f"Error extracting text from Image wrapper for {filename}: {e}", exc_info=True)
                 return jsonify({'error': 'Image text extraction failed', 'message': str(e)}), 500
         else:
-            # This case should ideally not be reached if allowed_file works correctly
+            # This case should ideally not be reached if allowed_extension works correctly
             logger.error(f"Encountered unhandled file extension '{file_extension}' for file '{filename}' after passing checks.")
             return jsonify({'error': 'Unsupported file type', 'message': f"The file type '{file_extension}' is not supported for text extraction."}), 400
         
@@ -202,14 +243,18 @@ def upload_document():
                 'message': 'The document appears to be empty or the text could not be extracted.'
             }), 400
         
-        # Return the result
+        # Keep the text server-side and return a preview plus where to fetch it
+        upload_id = fingerprint(extracted_text)[:UPLOAD_ID_LENGTH]
+        upload_texts.set(upload_id, extracted_text)
+        
         result = {
             'success': True,
             'filename': filename,
             'file_type': file_extension,
             'text_length': len(extracted_text),
-            'extracted_text': extracted_text,
-            'upload_id': filename.replace('.', '_'),  # Simple ID for tracking
+            'preview': extracted_text[:UPLOAD_PREVIEW_CHARS],
+            'upload_id': upload_id,
+            'text_url': f"/api/documents/{upload_id}/text",
             'message': 'Document uploaded and processed successfully'
         }
         
@@ -226,6 +271,15 @@ def upload_document():
             'details': str(e)  # Provide generic error in production, or more details if debug mode is on
         }), 500
 
+@document_bp.route('/<upload_id>/text', methods=['GET'])
+def get_document_text(upload_id):
+    """Return the extracted text of an uploaded document as plain text."""
+    text = get_upload_text(upload_id)
+    if text is None:
+        return jsonify({'error': 'Document text not found'}), 404
+    
+    return Response(text, mimetype='text/plain; charset=utf-8')
+
 @document_bp.route('/text', methods=['POST'])
 def process_text():
     """Process raw text input."""
@@ -273,10 +327,8 @@ def validate_document():
             'is_valid': True,
             'checks': {
                 'length': len(text) >= 50,
-                'contains_deed_keywords': any(keyword in text.lower() for keyword in [
-                    'deed', 'grantor', 'grantee', 'bearing', 'feet', 'thence', 'metes', 'bounds'
-                ]),
-                'has_coordinates': any(pattern in text for pattern in ['°', 'degrees', 'north', 'south', 'east', 'west']),
+                'contains_deed_keywords': bool(_DEED_KEYWORD_RE.search(text)),
+                'has_coordinates': bool(_COORDINATE_RE.search(text)),
                 'readable_format': True  # Basic check - could be enhanced
             },
             'issues': [],
@@ -4,42 +4,186 @@ Plotting Routes for Deed Reader Pro
 Handles deed plotting, coordinate calculations, and visualization.
 """
 
+import json
 import logging
 import io
 import zipfile
-from flask import Blueprint, request, jsonify, send_file
+from typing import Any, Dict, List, Optional
+from flask import Blueprint, Response, request, jsonify
+from pydantic import BaseModel
 from services.plotting_service import AdvancedPlottingService
+from services.claude_service import ClaudeTimeout
+from services.cache_service import ContentCache, fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Coordinate-heavy endpoints also accept msgpack bodies, which skip parsing
+# every coordinate from decimal text
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 plotting_bp = Blueprint('plotting', __name__)
 
+# The service keeps no per-request state, so one instance serves every request
+plotting_service = AdvancedPlottingService()
+
+# Full plot results by deed text, shared by /plot and /validate so
+# validating (or replotting) a deed doesn't redo the pipeline
+plot_cache = ContentCache(max_entries=256, ttl=3600)
+
+def plot_deed_text(deed_text, text_hash=None):
+    """
+    Run the plotting pipeline for deed text, reusing a cached result for the same text.
+    
+    text_hash is fingerprint(deed_text), when the caller already has it; the
+    deed is hashed once per request however many caches it is looked up in.
+    """
+    key = text_hash or fingerprint(deed_text)
+    plot_result = plot_cache.get(key)
+    if plot_result is None:
+        plot_result = plotting_service.process_deed_for_plotting(deed_text, key)
+        # Only keep results built on a real Claude extraction, not the fallback
+        if plot_result.get('ai_extracted'):
+            plot_cache.set(key, plot_result)
+    return plot_result
+
+# Request bodies
+class DeedTextRequest(BaseModel):
+    text: str
+
+class PlotValidateRequest(DeedTextRequest):
+    plot_data: Optional[Dict[str, Any]] = None
+    text_hash: Optional[str] = None
+
+class CoordinatesRequest(BaseModel):
+    coordinates: List[Dict[str, Any]]
+
+class TransformRequest(CoordinatesRequest):
+    from_system: str = 'local'
+    to_system: str = 'state_plane'
+
+def parse_body(model):
+    """
+    Decode and validate the request body as model, or return None if it doesn't fit.
+    
+    JSON is decoded and validated in one pass by pydantic's core; msgpack
+    bodies (for coordinate-heavy requests) are unpacked first.
+    """
+    try:
+        if MSGPACK_AVAILABLE and request.mimetype == 'application/x-msgpack':
+            return model.model_validate(msgpack.unpackb(request.get_data(), raw=False))
+        return model.model_validate_json(request.get_data())
+    except ValueError:
+        # pydantic's ValidationError and msgpack's unpack errors are ValueErrors
+        return None
+
+# Export format -> (download filename, mimetype)
+EXPORT_FILES = {
+    'dxf': ('deed_plot.dxf', 'application/dxf'),
+    'csv': ('coordinates.csv', 'text/csv'),
+    'esri_traverse': ('traverse.txt', 'text/plain'),
+    'autocad_script': ('plot_script.scr', 'text/plain'),
+    'kml': ('deed_plot.kml', 'application/vnd.google-earth.kml+xml')
+}
+
+# Encoded export files by format and coordinate set, so single-format and
+# ZIP exports of the same plot generate each format once
+export_cache = ContentCache(max_entries=128, ttl=3600)
+# Fastest deflate level; export files are small, highly compressible text
+EXPORT_ZIP_LEVEL = 1
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only, unseekable sink that collects ZIP output for streaming."""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+    
+    def drain(self):
+        """Return and forget everything written since the last drain."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_zip(files):
+    """
+    Yield a deflated ZIP of (filename, bytes) pairs as it is compressed.
+    
+    The sink is unseekable, so zipfile writes sizes in data descriptors and
+    each member can be sent as soon as it is written; the whole archive is
+    never held in memory.
+    """
+    sink = _ZipChunks()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=EXPORT_ZIP_LEVEL) as zip_file:
+        for filename, content in files:
+            zip_file.writestr(filename, content)
+            yield sink.drain()
+    # Central directory, written on close
+    yield sink.drain()
+
+def coordinates_key(coordinates):
+    """Fingerprint of a coordinate list, for keying export caches."""
+    if ORJSON_AVAILABLE:
+        # Serializes straight to bytes in C, several times faster than json.dumps
+        return fingerprint(orjson.dumps(coordinates, default=str, option=orjson.OPT_SORT_KEYS))
+    return fingerprint(json.dumps(coordinates, sort_keys=True, default=str))
+
+def export_file(coordinates, format_type, coord_key=None):
+    """UTF-8 export file content for one format, generated once per coordinate set."""
+    key = f"{format_type}:{coord_key or coordinates_key(coordinates)}"
+    content = export_cache.get(key)
+    if content is None:
+        content = plotting_service._generate_export_format(coordinates, format_type).encode('utf-8')
+        export_cache.set(key, content)
+    return content
+
 @plotting_bp.route('/plot', methods=['POST'])
 def plot_deed():
     """Generate comprehensive plotting data from deed text."""
     try:
-        data = request.get_json()
+        body = parse_body(DeedTextRequest)
         
-        if not data or 'text' not in data:
+        if body is None:
             return jsonify({'error': 'No deed text provided'}), 400
         
-        deed_text = data['text']
+        deed_text = body.text
         
         if not deed_text or len(deed_text.strip()) < 10:
             return jsonify({'error': 'Deed text too short for plotting'}), 400
         
-        # Initialize plotting service
-        plotting_service = AdvancedPlottingService()
-        
         # Process deed for plotting
-        plot_result = plotting_service.process_deed_for_plotting(deed_text)
+        text_hash = fingerprint(deed_text)
+        plot_result = plot_deed_text(deed_text, text_hash)
         
         return jsonify({
             'success': True,
             'plot_data': plot_result,
+            'text_hash': text_hash,
             'message': 'Deed plotting completed successfully'
         })
         
+    except ClaudeTimeout as e:
+        logger.error(f"Deed plotting timed out: {e}")
+        return jsonify({
+            'error': 'Plotting timed out',
+            'message': str(e)
+        }), 504
     except Exception as e:
         logger.error(f"Error in deed plotting: {e}")
         return jsonify({
@@ -51,13 +195,12 @@ def plot_deed():
 def get_coordinates():
     """Extract and calculate coordinates from deed text."""
     try:
-        data = request.get_json()
+        body = parse_body(DeedTextRequest)
         
-        if not data or 'text' not in data:
+        if body is None:
             return jsonify({'error': 'No deed text provided'}), 400
         
-        deed_text = data['text']
-        plotting_service = AdvancedPlottingService()
+        deed_text = body.text
         
         # Extract plotting data
         plot_data = plotting_service._extract_plotting_data_with_ai(deed_text)
@@ -70,6 +213,12 @@ def get_coordinates():
             'message': 'Coordinates calculated successfully'
         })
         
+    except ClaudeTimeout as e:
+        logger.error(f"Coordinate calculation timed out: {e}")
+        return jsonify({
+            'error': 'Coordinate calculation timed out',
+            'message': str(e)
+        }), 504
     except Exception as e:
         logger.error(f"Error calculating coordinates: {e}")
         return jsonify({
@@ -81,13 +230,12 @@ def get_coordinates():
 def analyze_closure():
     """Perform closure analysis on deed coordinates."""
     try:
-        data = request.get_json()
+        body = parse_body(CoordinatesRequest)
         
-        if not data or 'coordinates' not in data:
+        if body is None:
             return jsonify({'error': 'No coordinates provided'}), 400
         
-        coordinates = data['coordinates']
-        plotting_service = AdvancedPlottingService()
+        coordinates = body.coordinates
         
         # Analyze closure
         closure_analysis = plotting_service._analyze_closure(coordinates)
@@ -109,55 +257,24 @@ def analyze_closure():
 def export_plot_data(format_type):
     """Export plot data in various formats."""
     try:
-        data = request.get_json()
+        body = parse_body(CoordinatesRequest)
         
-        if not data or 'coordinates' not in data:
+        if body is None:
             return jsonify({'error': 'No coordinates provided'}), 400
         
-        coordinates = data['coordinates']
-        plotting_service = AdvancedPlottingService()
-        
-        # Generate export data
-        export_data = plotting_service._generate_export_data(coordinates)
+        coordinates = body.coordinates
         
-        if format_type not in export_data['formats']:
+        if format_type not in EXPORT_FILES:
             return jsonify({'error': f'Export format {format_type} not supported'}), 400
         
-        # Get the specific format data
-        format_data = export_data['formats'][format_type]
-        
-        # Create in-memory file
-        if format_type == 'dxf':
-            file_content = format_data
-            filename = 'deed_plot.dxf'
-            mimetype = 'application/dxf'
-        elif format_type == 'csv':
-            file_content = format_data
-            filename = 'coordinates.csv'
-            mimetype = 'text/csv'
-        elif format_type == 'esri_traverse':
-            file_content = format_data
-            filename = 'traverse.txt'
-            mimetype = 'text/plain'
-        elif format_type == 'autocad_script':
-            file_content = format_data
-            filename = 'plot_script.scr'
-            mimetype = 'text/plain'
-        elif format_type == 'kml':
-            file_content = format_data
-            filename = 'deed_plot.kml'
-            mimetype = 'application/vnd.google-earth.kml+xml'
-        else:
-            return jsonify({'error': 'Unsupported format'}), 400
-        
-        # Create file-like object
-        file_obj = io.BytesIO(file_content.encode('utf-8'))
+        # Generate only the requested format; the cached bytes are the
+        # response body as-is, with no file object around them
+        filename, mimetype = EXPORT_FILES[format_type]
         
-        return send_file(
-            file_obj,
-            as_attachment=True,
-            download_name=filename,
-            mimetype=mimetype
+        return Response(
+            export_file(coordinates, format_type),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
         
     except Exception as e:
@@ -171,35 +288,26 @@ def export_plot_data(format_type):
 def export_all_formats():
     """Export plot data in all available formats as a ZIP file."""
     try:
-        data = request.get_json()
+        body = parse_body(CoordinatesRequest)
         
-        if not data or 'coordinates' not in data:
+        if body is None:
             return jsonify({'error': 'No coordinates provided'}), 400
         
-        coordinates = data['coordinates']
-        plotting_service = AdvancedPlottingService()
-        
-        # Generate export data for all formats
-        export_data = plotting_service._generate_export_data(coordinates)
-        
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add each format to ZIP
-            zip_file.writestr('deed_plot.dxf', export_data['formats']['dxf'])
-            zip_file.writestr('coordinates.csv', export_data['formats']['csv'])
-            zip_file.writestr('traverse.txt', export_data['formats']['esri_traverse'])
-            zip_file.writestr('plot_script.scr', export_data['formats']['autocad_script'])
-            zip_file.writestr('deed_plot.kml', export_data['formats']['kml'])
-        
-        zip_buffer.seek(0)
-        
-        return send_file(
-            zip_buffer,
-            as_attachment=True,
-            download_name='deed_plot_exports.zip',
-            mimetype='application/zip'
+        coordinates = body.coordinates
+        coord_key = coordinates_key(coordinates)
+        
+        # Generate every format up front (reusing any already generated for
+        # these coordinates) so failures still get a JSON error response
+        files = [
+            (filename, export_file(coordinates, format_type, coord_key))
+            for format_type, (filename, _) in EXPORT_FILES.items()
+        ]
+        
+        # Stream the ZIP out as it is compressed
+        return Response(
+            stream_zip(files),
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename=deed_plot_exports.zip'}
         )
         
     except Exception as e:
@@ -213,16 +321,20 @@ def export_all_formats():
 def validate_plot():
     """Validate plot data for errors and inconsistencies."""
     try:
-        data = request.get_json()
+        body = parse_body(PlotValidateRequest)
         
-        if not data or 'text' not in data:
+        if body is None:
             return jsonify({'error': 'No deed text provided'}), 400
         
-        deed_text = data['text']
-        plotting_service = AdvancedPlottingService()
+        deed_text = body.text
+        text_hash = fingerprint(deed_text)
         
-        # Process deed and validate
-        plot_result = plotting_service.process_deed_for_plotting(deed_text)
+        # Validate the plot the client already has if it was made from this
+        # exact text (text_hash from /plot); otherwise process the deed
+        if body.plot_data and body.text_hash == text_hash:
+            plot_result = body.plot_data
+        else:
+            plot_result = plot_deed_text(deed_text, text_hash)
         
         # Additional validation checks
         validation_results = {
@@ -262,9 +374,16 @@ def validate_plot():
             'success': True,
             'validation': validation_results,
             'plot_data': plot_result,
+            'text_hash': text_hash,
             'message': 'Plot validation completed'
         })
         
+    except ClaudeTimeout as e:
+        logger.error(f"Plot validation timed out: {e}")
+        return jsonify({
+            'error': 'Plot validation timed out',
+            'message': str(e)
+        }), 504
     except Exception as e:
         logger.error(f"Error validating plot: {e}")
         return jsonify({
@@ -276,25 +395,28 @@ def validate_plot():
 def transform_coordinates():
     """Transform coordinates between different coordinate systems."""
     try:
-        data = request.get_json()
+        body = parse_body(TransformRequest)
         
-        if not data or 'coordinates' not in data:
+        if body is None:
             return jsonify({'error': 'No coordinates provided'}), 400
         
-        coordinates = data['coordinates']
-        from_system = data.get('from_system', 'local')
-        to_system = data.get('to_system', 'state_plane')
+        coordinates = body.coordinates
+        from_system = body.from_system
+        to_system = body.to_system
         
         # For now, return the same coordinates with a note
         # In a real implementation, you'd use projection libraries like pyproj
-        transformed_coordinates = coordinates.copy()
-        
-        for coord in transformed_coordinates:
-            coord['original_x'] = coord['x']
-            coord['original_y'] = coord['y']
-            coord['coordinate_system'] = to_system
-            # Add transformation note
-            coord['transformation_note'] = f"Transformed from {from_system} to {to_system}"
+        transformation_note = f"Transformed from {from_system} to {to_system}"
+        transformed_coordinates = [
+            {
+                **coord,
+                'original_x': coord['x'],
+                'original_y': coord['y'],
+                'coordinate_system': to_system,
+                'transformation_note': transformation_note
+            }
+            for coord in coordinates
+        ]
         
         return jsonify({
             'success': True,
@@ -0,0 +1,128 @@
+"""
+Cache Service for Deed Reader Pro
+---------------------------------
+Content-addressed caches for expensive extraction and AI results.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(content: Union[bytes, str]) -> str:
+    """Return the SHA-256 hex digest of content, for use as a cache key."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_fingerprint(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's content, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ContentCache:
+    """
+    Bounded LRU cache keyed by content fingerprint.
+
+    Entries live in memory; when ``disk_dir`` is set, string values are also
+    written to ``{disk_dir}/{key}.txt`` so they survive restarts and are
+    shared between workers. With ``ttl`` (seconds), entries older than that
+    are treated as misses. Safe to use from threads and the event loop.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None,
+                 ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.ttl = ttl
+        # key -> (value, monotonic expiry time or None)
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, use_disk: bool = True) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._entries:
+                value, expires_at = self._entries[key]
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if use_disk and self.disk_dir:
+            value = self._read_disk(key)
+            if value is not None:
+                self._remember(key, value)
+                return value
+
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store value under key, evicting the least recently used entry if full."""
+        self._remember(key, value)
+        if self.disk_dir and isinstance(value, str):
+            self._write_disk(key, value)
+
+    def delete(self, key: str):
+        """Drop the in-memory entry for key, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        """Snapshot of unexpired in-memory entries, least recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value) for key, (value, expires_at) in self._entries.items()
+                if expires_at is None or now < expires_at
+            ]
+    
+    def clear(self):
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(self._disk_path(key)) > self.ttl:
+                return None
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, value: str):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            # Write to a temp file and rename so readers never see partial entries
+            tmp_path = f"{self._disk_path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(tmp_path, self._disk_path(key))
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
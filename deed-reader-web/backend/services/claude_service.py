@@ -6,21 +6,455 @@ Handles all Claude (Anthropic) API interactions for deed analysis and OCR enhanc
 
 import os
 import json
+import time
+import re
+import random
+import asyncio
 import logging
 import base64
-from typing import Dict, List, Optional, Any
+import weakref
+import threading
+import concurrent.futures
+from pathlib import Path
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, List, Optional, Tuple, TypeVar, Union
 import anthropic
+import httpx
 from PIL import Image
 import io
 
+from config import Config
+from services.cache_service import ContentCache, fingerprint
+
+# orjson parses the JSON in Claude responses faster than the stdlib; the
+# stdlib parser is used when it isn't installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by every request through a client, so calls reuse
+# keep-alive TLS connections to the Anthropic API instead of reconnecting.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+HTTP_TIMEOUT = httpx.Timeout(Config.CLAUDE_API_TIMEOUT, connect=5.0)
+
+# Transient API failures (rate limited, overloaded, server errors) are retried
+# with exponential backoff, honoring Retry-After when the API sends one
+CLAUDE_MAX_ATTEMPTS = 5
+CLAUDE_RETRY_STATUSES = {429, 500, 503, 529}
+CLAUDE_MAX_BACKOFF = 30.0
+# Longest one request can spend in the retry loop: every attempt running to
+# the HTTP timeout, with the longest backoff between attempts
+CLAUDE_REQUEST_DEADLINE = CLAUDE_MAX_ATTEMPTS * Config.CLAUDE_API_TIMEOUT + (CLAUDE_MAX_ATTEMPTS - 1) * CLAUDE_MAX_BACKOFF
+
+# Response length and sampling per request type (the endpoint names used for
+# token budget accounting), so each is tuned in one place
+CLAUDE_REQUEST_SETTINGS = {
+    "enhance_ocr": {"max_tokens": 4000, "temperature": 0.1},
+    "vision": {"max_tokens": 4000, "temperature": 0.1},
+    "analyze": {"max_tokens": 4000, "temperature": 0.1},
+    "summary": {"max_tokens": 1000, "temperature": 0.2},
+    "validate": {"max_tokens": 2000, "temperature": 0.0},
+    "coordinates": {"max_tokens": 3000, "temperature": 0.0},
+    "chat": {"max_tokens": 1000, "temperature": 0.2},
+    "suggestions": {"max_tokens": 500, "temperature": 0.5},
+    "explain": {"max_tokens": 300, "temperature": 0.3},
+    "plotting": {"max_tokens": 3000, "temperature": 0.1},
+}
+
+# OCR enhancement is skipped for text whose leading OCR_ARTIFACT_SAMPLE
+# characters have fewer than this fraction of OCR artifacts: stray glyphs,
+# control characters and tokens mixing look-alike letters and digits
+# (e.g. "1O0", "l0"). Born-digital text and Claude Vision output land here.
+OCR_CLEAN_ARTIFACT_RATIO = 0.005
+OCR_ARTIFACT_SAMPLE = 4000
+_OCR_ARTIFACT_CHARS = frozenset('|¦~`^\ufffd')
+_OCR_CONFUSABLE_RE = re.compile(r'\b(?=[O0Il1]*[OIl])(?=[O0Il1]*[01])[O0Il1]{2,}\b')
+
+
+def _ocr_artifact_ratio(text: str) -> float:
+    """Fraction of OCR artifacts in the start of text (see OCR_CLEAN_ARTIFACT_RATIO)."""
+    sample = text[:OCR_ARTIFACT_SAMPLE]
+    artifacts = sum(
+        1 for c in sample
+        if c in _OCR_ARTIFACT_CHARS or not (c.isprintable() or c.isspace())
+    )
+    artifacts += len(_OCR_CONFUSABLE_RE.findall(sample))
+    return artifacts / len(sample)
+
+
+# JSON in a Claude response: the body of the first ``` fence if there is one,
+# then the object from its first brace to its last, so prose around the fence
+# or the object (even prose with braces after the fence) is dropped
+_FENCED_JSON = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+_JSON_OBJECT = re.compile(r'\{.*\}', re.DOTALL)
+
+# Longest image side sent to Claude Vision; larger scans are downscaled
+VISION_MAX_DIMENSION = 2048
+# Pillow format name -> media type for images the API accepts as-is
+VISION_MEDIA_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after error, or None if it shouldn't be retried."""
+    if not isinstance(error, anthropic.APIStatusError) or error.status_code not in CLAUDE_RETRY_STATUSES:
+        return None
+    if attempt + 1 >= CLAUDE_MAX_ATTEMPTS:
+        return None
+    
+    retry_after = error.response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(CLAUDE_MAX_BACKOFF, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(CLAUDE_MAX_BACKOFF, 2 ** attempt + random.random())
+
+
+# Prompt templates, split around the document text so each request is one
+# join instead of re-formatting the whole template
+_PROMPT_ENHANCE_HEAD = """This text was extracted from a scanned deed document using OCR. Please clean up and correct any obvious OCR errors while preserving the original structure and information.
+
+Focus on:
+- Fixing misrecognized characters (e.g., O vs 0, I vs 1)
+- Correcting bearing formats (e.g., "N 45 30 15 E" to "N45°30'15"E")
+- Fixing common deed terms that may have been misread
+- Correcting obvious spelling errors in legal/surveying terms
+- Preserving exact measurements and legal descriptions
+
+Return ONLY the corrected text without any commentary.
+
+OCR Text:
+"""
+
+_PROMPT_VISION_OCR = "Please extract all text from this scanned deed document. Focus on preserving exact formatting, especially for metes and bounds descriptions, bearings, distances, names, dates, and legal descriptions. Return only the extracted text."
+
+_PROMPT_ANALYZE_HEAD = """As an expert surveyor and legal document analyst, analyze this deed document and extract key information in JSON format.
+
+Deed Document:
+"""
+_PROMPT_ANALYZE_TAIL = """
+
+Return a comprehensive analysis in this exact JSON structure:
+{
+    "summary": "Brief summary of the deed",
+    "property_description": {
+        "legal_description": "Full legal description",
+        "acres": "Acreage if mentioned",
+        "lot_block": "Lot and block if applicable",
+        "subdivision": "Subdivision name if applicable"
+    },
+    "parties": {
+        "grantor": "Person/entity granting the deed",
+        "grantee": "Person/entity receiving the deed"
+    },
+    "metes_and_bounds": [
+        {
+            "call_number": 1,
+            "bearing": "Bearing direction",
+            "distance": "Distance with units",
+            "description": "Full call description"
+        }
+    ],
+    "monuments": [
+        {
+            "type": "Type of monument",
+            "description": "Description of monument",
+            "action": "found/set/referenced"
+        }
+    ],
+    "dates": {
+        "deed_date": "Date of deed",
+        "recording_date": "Date recorded if mentioned"
+    },
+    "references": {
+        "book_page": "Book and page reference",
+        "deed_book": "Deed book reference",
+        "plat_references": "Any plat references"
+    },
+    "key_findings": [
+        "Important findings or notable aspects"
+    ],
+    "confidence_score": 0.95
+}
+
+Provide 'null' for any information not clearly present. If not a deed, return: {"error": "Invalid document type"}"""
+_PROMPT_SUMMARY_HEAD = """As an expert surveyor and legal document analyst, write a concise summary of this deed document.
+
+Deed Document:
+"""
+_PROMPT_SUMMARY_TAIL = """
+
+In a few short paragraphs, cover the property location, the parties, the key boundaries and any important legal information. Do not invent details that are not in the document."""
+_PROMPT_VALIDATE_HEAD = """As an expert surveyor, review this data extracted from a deed document for errors.
+
+Extracted Data:
+"""
+_PROMPT_VALIDATE_TAIL = """
+
+Check for closure errors, bearing consistency, distance accuracy and legal description completeness.
+
+Return in this exact JSON format:
+{
+    "is_valid": true,
+    "issues": [
+        {"type": "closure/bearing/distance/completeness", "description": "What is wrong", "severity": "low/medium/high"}
+    ],
+    "recommendations": [
+        "Suggested corrections or checks"
+    ],
+    "confidence_score": 0.95
+}"""
+_PROMPT_COORDINATES_HEAD = """Extract all coordinate information from this deed document and return it in structured JSON format.
+
+Look for:
+- Bearings (e.g., N45°30'15"E, South 28 degrees West)
+- Distances (with units: feet, chains, poles, etc.)
+- Curve data (radius, delta, chord bearings)
+- Coordinate points if present
+
+Deed Document:
+"""
+_PROMPT_COORDINATES_TAIL = """
+
+Return in this exact JSON format:
+{
+    "bearings": [
+        {"bearing": "N45°30'15\"E", "normalized": "45.504167", "quadrant": "NE"}
+    ],
+    "distances": [
+        {"distance": "125.75", "units": "feet", "in_feet": 125.75}
+    ],
+    "curves": [
+        {"radius": "50.0", "delta": "45°30'", "chord_bearing": "N67°45'E"}
+    ],
+    "coordinate_points": [
+        {"point": "Point A", "coordinates": "x, y if present"}
+    ]
+}
+
+If no coordinate information found, return structure with empty lists."""
+_PROMPT_QUESTION_HEAD = """You are an expert surveyor and legal assistant helping users understand deed documents.
+
+Here is the deed document for reference:
+"""
+_PROMPT_QUESTION_TAIL = """
+
+Answer questions clearly and accurately based on the document content. If information is not in the document, clearly state that. Provide specific references to the document when possible."""
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a request can't fit in the token budget within its allowed wait."""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Claude token budget exhausted, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ClaudeTimeout(Exception):
+    """Raised when a Claude call run from synchronous code misses its deadline."""
+    
+    def __init__(self, timeout: float):
+        super().__init__(f"Claude request did not finish within {timeout:.0f}s")
+        self.timeout = timeout
+
+
+class TokenBudgetTracker:
+    """
+    Rolling-window token and request budget for Claude requests.
+    
+    Callers reserve an estimated token count before each request and wait
+    while the window is full, so bursts queue locally instead of tripping
+    the API's tokens-per-minute or requests-per-minute limits and coming
+    back as 429s.
+    """
+    
+    def __init__(self, tokens_per_minute: int, window_seconds: float = 60.0,
+                 requests_per_minute: Optional[int] = None):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.window_seconds = window_seconds
+        self._usage: Deque[Tuple[float, int, str]] = deque()
+        self._used = 0
+        self._lock = threading.Lock()
+    
+    def _expire(self, now: float):
+        """Drop reservations that have aged out of the window."""
+        while self._usage and now - self._usage[0][0] >= self.window_seconds:
+            _, tokens, _ = self._usage.popleft()
+            self._used -= tokens
+    
+    def _try_reserve(self, tokens: int, endpoint: str) -> float:
+        """Reserve tokens if they fit, otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            request_slot = self.requests_per_minute is None or len(self._usage) < self.requests_per_minute
+            # An oversized request still goes through once the window is empty
+            if request_slot and (self._used + tokens <= self.tokens_per_minute or not self._usage):
+                self._usage.append((now, tokens, endpoint))
+                self._used += tokens
+                return 0.0
+            return self._usage[0][0] + self.window_seconds - now
+    
+    async def await_capacity(self, tokens: int, endpoint: str = "other",
+                             max_wait: Optional[float] = None):
+        """
+        Wait without blocking the event loop until the tokens fit in the window.
+        
+        With max_wait, raises TokenBudgetExceeded instead of waiting longer
+        than that many seconds.
+        """
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+        while True:
+            wait = self._try_reserve(tokens, endpoint)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TokenBudgetExceeded(wait)
+            logger.info(f"Token budget full, delaying {endpoint} request by {wait:.1f}s")
+            await asyncio.sleep(wait)
+    
+    def wait_for_capacity(self, tokens: int, endpoint: str = "other",
+                          max_wait: Optional[float] = None):
+        """Blocking variant of await_capacity for synchronous callers."""
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+        while True:
+            wait = self._try_reserve(tokens, endpoint)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TokenBudgetExceeded(wait)
+            logger.info(f"Token budget full, delaying {endpoint} request by {wait:.1f}s")
+            time.sleep(wait)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current window usage, overall and per endpoint."""
+        with self._lock:
+            self._expire(time.monotonic())
+            by_endpoint: Dict[str, int] = {}
+            for _, tokens, endpoint in self._usage:
+                by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + tokens
+            return {
+                'tokens_per_minute': self.tokens_per_minute,
+                'requests_per_minute': self.requests_per_minute,
+                'window_seconds': self.window_seconds,
+                'tokens_used': self._used,
+                'tokens_available': max(0, self.tokens_per_minute - self._used),
+                'requests_in_window': len(self._usage),
+                'by_endpoint': by_endpoint
+            }
+
+
+T = TypeVar("T")
+
+
+class ClaudeDispatcher:
+    """
+    Event loop on a background thread for running async Claude calls from
+    synchronous code.
+    
+    The Flask handlers submit coroutines here instead of making blocking SDK
+    calls, so every in-flight request shares the async client's connection
+    pool, concurrency cap and token budget. The loop starts on first use.
+    """
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="claude-dispatcher", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+    
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """The dispatcher's event loop, or None until it is first used."""
+        return self._loop
+    
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run coro on the dispatcher loop and block until it returns."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # Not the builtin TimeoutError before Python 3.11; cancelling
+            # frees the coroutine's concurrency slot and budget reservation
+            future.cancel()
+            raise
+
+
+class LoopSemaphore:
+    """
+    Async semaphore with a separate count per event loop.
+    
+    asyncio primitives belong to one loop (the first to wait on them, or
+    before Python 3.10 the loop current when they are created), but the
+    same module-level cap is used from uvicorn's loop and the dispatcher
+    loop. Each running loop gets its own asyncio.Semaphore of ``value``,
+    created on first use there.
+    """
+    
+    def __init__(self, value: int):
+        self.value = value
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.value)
+        return semaphore
+    
+    async def __aenter__(self):
+        await self._semaphore().acquire()
+    
+    async def __aexit__(self, *exc_info):
+        self._semaphore().release()
+
+
 class ClaudeService:
-    """Service for Claude API interactions."""
+    """
+    Service for Claude API interactions.
+    
+    The sync client is created once in initialize(), and an async client
+    once per event loop that calls Claude; each is shared by every caller
+    over a pooled httpx client, so requests reuse keep-alive connections
+    rather than paying a TLS handshake per call.
+    """
     
     _client: Optional[anthropic.Anthropic] = None
+    _api_key: Optional[str] = None
+    # Async clients by event loop. httpx connections belong to the loop that
+    # opened them, and Claude is awaited both on uvicorn's loop and on the
+    # dispatcher loop, so each loop gets its own client and connection pool
+    _async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anthropic.AsyncAnthropic]" = weakref.WeakKeyDictionary()
+    _async_clients_lock = threading.Lock()
     _model: str = "claude-3-5-sonnet-20241022"  # Using latest Claude 3.5 Sonnet for best performance
     _vision_model: str = "claude-3-5-sonnet-20241022"  # Claude 3.5 Sonnet with enhanced vision capabilities
+    _token_budget = TokenBudgetTracker(
+        Config.CLAUDE_TOKENS_PER_MINUTE, requests_per_minute=Config.CLAUDE_REQUESTS_PER_MINUTE
+    )
+    # Caps in-flight async requests on each event loop, so a burst of
+    # uploads queues here rather than opening a socket per request
+    _claude_sem = LoopSemaphore(Config.CLAUDE_MAX_CONCURRENCY)
+    _dispatcher = ClaudeDispatcher()
+    # Results for identical inputs, shared by the sync and async variants.
+    # Enhanced OCR text is also kept on disk, so it survives restarts and is
+    # shared between workers; failed calls are never cached.
+    _enhancement_cache = ContentCache(max_entries=512, disk_dir=os.path.join("uploads", ".cache", "enhanced"))
+    _analysis_cache = ContentCache(max_entries=512, ttl=3600)
     
     @classmethod
     def initialize(cls, api_key: Optional[str] = None):
@@ -33,7 +467,16 @@ class ClaudeService:
             return False
 
         try:
-            cls._client = anthropic.Anthropic(api_key=api_key)
+            # Retries are handled by _call_claude_with_retry. Both clients
+            # speak HTTP/2, which multiplexes concurrent requests over one
+            # pooled connection
+            cls._client = anthropic.Anthropic(
+                api_key=api_key,
+                max_retries=0,
+                http_client=httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=True)
+            )
+            # Async clients are created per event loop by _get_async_client
+            cls._api_key = api_key
             # Test the connection
             test_message = cls._client.messages.create(
                 model=cls._model,
@@ -45,186 +488,325 @@ class ClaudeService:
         except Exception as e:
             logger.error(f"Failed to initialize Claude client: {e}")
             cls._client = None
+            cls._api_key = None
             return False
     
+    @classmethod
+    def _get_async_client(cls) -> Optional[anthropic.AsyncAnthropic]:
+        """The async client for the running event loop, created on first use there."""
+        if cls._api_key is None:
+            return None
+        loop = asyncio.get_running_loop()
+        with cls._async_clients_lock:
+            client = cls._async_clients.get(loop)
+            if client is None:
+                client = anthropic.AsyncAnthropic(
+                    api_key=cls._api_key,
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=True)
+                )
+                cls._async_clients[loop] = client
+        return client
+    
+    @classmethod
+    async def _close_async_client(cls):
+        """Close the running event loop's async client, if it has one."""
+        with cls._async_clients_lock:
+            client = cls._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+    
+    @classmethod
+    async def close(cls):
+        """
+        Close the pooled HTTP connections held by the async clients.
+        
+        The running loop's client is closed here, and the dispatcher loop's
+        client on the dispatcher loop.
+        """
+        await cls._close_async_client()
+        dispatcher_loop = cls._dispatcher.loop
+        if dispatcher_loop is not None and dispatcher_loop is not asyncio.get_running_loop():
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(cls._close_async_client(), dispatcher_loop)
+            )
+    
+    @classmethod
+    def run_sync(cls, coro: Awaitable[T], requests: int = 1) -> T:
+        """
+        Run an async ClaudeService call from synchronous (Flask) code.
+        
+        requests is how many Claude requests coro makes one after another.
+        The deadline allows each the full retry loop, plus one token budget
+        window to wait for capacity; past it the call is cancelled and
+        ClaudeTimeout raised.
+        """
+        timeout = requests * CLAUDE_REQUEST_DEADLINE + cls._token_budget.window_seconds
+        try:
+            return cls._dispatcher.run(coro, timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            raise ClaudeTimeout(timeout) from None
+    
     @classmethod
     def is_available(cls) -> bool:
         """Check if Claude service is available."""
         return cls._client is not None
     
+    @classmethod
+    def token_budget_status(cls) -> Dict[str, Any]:
+        """Report usage of the rolling token budget."""
+        return cls._token_budget.snapshot()
+    
+    @classmethod
+    def _user_request(cls, endpoint: str, content: Any, model: Optional[str] = None,
+                      system: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build messages.create arguments for a single user turn, with the
+        max_tokens and temperature configured for endpoint.
+        """
+        request = {
+            "model": model or cls._model,
+            **CLAUDE_REQUEST_SETTINGS[endpoint],
+            "messages": [{"role": "user", "content": content}]
+        }
+        if system:
+            request["system"] = system
+        return request
+    
+    @staticmethod
+    def _estimate_tokens(request: Dict[str, Any]) -> int:
+        """Estimate tokens for a text request: ~4 characters per token plus the response cap."""
+        prompt_chars = 0
+        for m in request["messages"]:
+            if isinstance(m["content"], str):
+                prompt_chars += len(m["content"])
+            else:
+                prompt_chars += sum(len(block.get("text", "")) for block in m["content"])
+        return prompt_chars // 4 + request["max_tokens"]
+    
+    @classmethod
+    def _create_message(cls, request: Dict[str, Any], endpoint: str):
+        """Send a text request once it fits in the token budget."""
+        cls._token_budget.wait_for_capacity(cls._estimate_tokens(request), endpoint)
+        return cls._call_claude_with_retry(**request)
+    
+    @classmethod
+    async def _create_message_async(cls, request: Dict[str, Any], endpoint: str,
+                                    max_wait: Optional[float] = None):
+        """
+        Send a text request on the async client once it fits in the token budget.
+        
+        With max_wait, gives up with TokenBudgetExceeded rather than queueing
+        longer than that many seconds.
+        """
+        await cls._token_budget.await_capacity(cls._estimate_tokens(request), endpoint, max_wait)
+        async with cls._claude_sem:
+            return await cls._call_claude_with_retry_async(**request)
+    
+    @classmethod
+    def _call_claude_with_retry(cls, **kwargs):
+        """messages.create with backoff on rate limits and transient server errors."""
+        attempt = 0
+        while True:
+            try:
+                return cls._client.messages.create(**kwargs)
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f"Claude request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+    
+    @classmethod
+    async def _call_claude_with_retry_async(cls, **kwargs):
+        """Async variant of _call_claude_with_retry on the running loop's async client."""
+        client = cls._get_async_client()
+        attempt = 0
+        while True:
+            try:
+                return await client.messages.create(**kwargs)
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f"Claude request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+    
     @classmethod
     def enhance_ocr_text(cls, ocr_text: str) -> Optional[str]:
         """Use Claude to enhance and correct OCR-extracted text from deed documents."""
         if not cls.is_available() or not ocr_text:
             return ocr_text
+        if _ocr_artifact_ratio(ocr_text) < OCR_CLEAN_ARTIFACT_RATIO:
+            logger.info("OCR text has no OCR artifacts, skipping Claude enhancement")
+            return ocr_text
+        
+        key = fingerprint(ocr_text)
+        cached = cls._enhancement_cache.get(key)
+        if cached is not None:
+            return cached
             
         try:
-            prompt = f"""This text was extracted from a scanned deed document using OCR. Please clean up and correct any obvious OCR errors while preserving the original structure and information.
-
-Focus on:
-- Fixing misrecognized characters (e.g., O vs 0, I vs 1)
-- Correcting bearing formats (e.g., "N 45 30 15 E" to "N45°30'15"E")
-- Fixing common deed terms that may have been misread
-- Correcting obvious spelling errors in legal/surveying terms
-- Preserving exact measurements and legal descriptions
-
-Return ONLY the corrected text without any commentary.
-
-OCR Text:
-{ocr_text}"""
-
-            message = cls._client.messages.create(
-                model=cls._model,
-                max_tokens=4000,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            message = cls._create_message(cls._enhance_ocr_request(ocr_text), "enhance_ocr")
+            return cls._remember_enhancement(key, ocr_text, cls._enhanced_text(ocr_text, message))
+            
+        except Exception as e:
+            logger.error(f"Failed to enhance OCR text with Claude: {e}")
+            return ocr_text
+    
+    @classmethod
+    async def enhance_ocr_text_async(cls, ocr_text: str) -> Optional[str]:
+        """Async variant of enhance_ocr_text using the pooled async client."""
+        if not cls.is_available() or not ocr_text:
+            return ocr_text
+        if _ocr_artifact_ratio(ocr_text) < OCR_CLEAN_ARTIFACT_RATIO:
+            logger.info("OCR text has no OCR artifacts, skipping Claude enhancement")
+            return ocr_text
+        
+        # The enhancement cache is disk-backed, so misses in memory and
+        # writes go through a thread instead of blocking the loop
+        key = fingerprint(ocr_text)
+        cached = cls._enhancement_cache.get(key, use_disk=False)
+        if cached is None:
+            cached = await asyncio.to_thread(cls._enhancement_cache.get, key)
+        if cached is not None:
+            return cached
             
-            enhanced_text = message.content[0].text
-            logger.info(f"Claude OCR enhancement successful. Input: {len(ocr_text)} chars, Output: {len(enhanced_text)} chars")
-            return enhanced_text.strip()
+        try:
+            message = await cls._create_message_async(cls._enhance_ocr_request(ocr_text), "enhance_ocr")
+            return await asyncio.to_thread(
+                cls._remember_enhancement, key, ocr_text, cls._enhanced_text(ocr_text, message)
+            )
             
         except Exception as e:
             logger.error(f"Failed to enhance OCR text with Claude: {e}")
             return ocr_text
     
+    @classmethod
+    def _remember_enhancement(cls, key: str, ocr_text: str, enhanced_text: str) -> str:
+        """Cache an enhancement result unless it came back empty or unchanged."""
+        if enhanced_text and enhanced_text != ocr_text:
+            cls._enhancement_cache.set(key, enhanced_text)
+        return enhanced_text
+    
+    @classmethod
+    def _enhance_ocr_request(cls, ocr_text: str) -> Dict[str, Any]:
+        """Build the messages.create arguments for OCR enhancement."""
+        prompt = _PROMPT_ENHANCE_HEAD + ocr_text
+
+        return cls._user_request("enhance_ocr", prompt)
+    
+    @staticmethod
+    def _enhanced_text(ocr_text: str, message) -> str:
+        """Extract the corrected text from an OCR enhancement response."""
+        enhanced_text = message.content[0].text
+        logger.info(f"Claude OCR enhancement successful. Input: {len(ocr_text)} chars, Output: {len(enhanced_text)} chars")
+        return enhanced_text.strip()
+    
     @classmethod
     def extract_text_from_image(cls, image_path: str) -> Optional[str]:
         """Extract text from image using Claude's vision capabilities."""
+        return cls.extract_text_from_images([image_path])[0]
+    
+    @classmethod
+    def extract_text_from_images(cls, images: List[Union[str, bytes]]) -> List[Optional[str]]:
+        """
+        Extract text from several images with Claude Vision, one result per image.
+        
+        Images are file paths or encoded image bytes (e.g. rendered PDF
+        pages, which then never touch the disk). The requests run
+        concurrently on the dispatcher loop; a failed image yields None
+        without affecting the others.
+        """
+        if not cls.is_available() or not images:
+            return [None] * len(images)
+        # Each image may queue behind the concurrency cap, so allow one
+        # request's deadline per image rather than one for the whole batch
+        return cls.run_sync(cls.extract_text_from_images_async(images), requests=len(images))
+    
+    @classmethod
+    async def extract_text_from_images_async(cls, images: List[Union[str, bytes]]) -> List[Optional[str]]:
+        """Async variant of extract_text_from_images on the pooled async client."""
         if not cls.is_available():
-            return None
-            
+            return [None] * len(images)
+        return await asyncio.gather(*(
+            cls._extract_text_from_image_async(image, index) for index, image in enumerate(images)
+        ))
+    
+    @classmethod
+    async def _extract_text_from_image_async(cls, image: Union[str, bytes], index: int) -> Optional[str]:
         try:
-            # Read and encode image
-            with open(image_path, "rb") as image_file:
-                image_data = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            # Determine image type
-            image_type = "image/png"
-            if image_path.lower().endswith(('.jpg', '.jpeg')):
-                image_type = "image/jpeg"
-            
-            message = cls._client.messages.create(
-                model=cls._vision_model,
-                max_tokens=4000,
-                temperature=0.1,
-                messages=[
-                    {
-                        "role": "user", 
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Please extract all text from this scanned deed document. Focus on preserving exact formatting, especially for metes and bounds descriptions, bearings, distances, names, dates, and legal descriptions. Return only the extracted text."
-                            },
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": image_type,
-                                    "data": image_data
-                                }
-                            }
-                        ]
-                    }
-                ]
-            )
+            # File read and base64 run off the loop so encodes overlap with requests
+            image_type, image_data = await asyncio.to_thread(cls._encode_image, image)
+            message = await cls._create_message_async(cls._vision_request(image_type, image_data), "vision")
             
             extracted_text = message.content[0].text
             logger.info(f"Claude vision OCR successful. Extracted {len(extracted_text)} characters")
             return extracted_text
             
         except Exception as e:
-            logger.error(f"Failed to extract text from image with Claude: {e}")
+            name = image if isinstance(image, str) else f"#{index + 1}"
+            logger.error(f"Failed to extract text from image {name} with Claude: {e}")
             return None
     
+    @staticmethod
+    def _encode_image(image: Union[str, bytes]) -> Tuple[str, str]:
+        """
+        Return (media type, base64 data) for an image file path or encoded image bytes.
+        
+        Images larger than VISION_MAX_DIMENSION, or in formats the API does
+        not accept (e.g. TIFF scans), are downscaled and re-encoded as PNG;
+        anything else is sent as the original bytes.
+        """
+        source = image if isinstance(image, str) else io.BytesIO(image)
+        with Image.open(source) as pil_image:
+            image_format = (pil_image.format or "").lower()
+            if image_format in VISION_MEDIA_TYPES and max(pil_image.size) <= VISION_MAX_DIMENSION:
+                image_bytes = Path(image).read_bytes() if isinstance(image, str) else image
+                return VISION_MEDIA_TYPES[image_format], base64.b64encode(image_bytes).decode('ascii')
+            
+            # The vision model gains nothing from pixels beyond this size
+            pil_image.thumbnail((VISION_MAX_DIMENSION, VISION_MAX_DIMENSION), Image.Resampling.LANCZOS)
+            if pil_image.mode not in ("1", "L", "LA", "RGB", "RGBA"):
+                pil_image = pil_image.convert("RGB")
+            buffer = io.BytesIO()
+            pil_image.save(buffer, format="PNG")
+        return "image/png", base64.b64encode(buffer.getbuffer()).decode('ascii')
+    
+    @classmethod
+    def _vision_request(cls, image_type: str, image_data: str) -> Dict[str, Any]:
+        """Build the messages.create arguments for Claude Vision OCR."""
+        return cls._user_request("vision", [
+            {
+                "type": "text",
+                "text": _PROMPT_VISION_OCR
+            },
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": image_type,
+                    "data": image_data
+                }
+            }
+        ], model=cls._vision_model)
+    
     @classmethod
     def analyze_deed_document(cls, text: str) -> Dict[str, Any]:
         """Comprehensive analysis of deed document using Claude."""
         if not cls.is_available():
             return {"error": "Claude service not available"}
+        
+        key = fingerprint(text)
+        cached = cls._analysis_cache.get(key)
+        if cached is not None:
+            return dict(cached)
             
         try:
-            prompt = f"""As an expert surveyor and legal document analyst, analyze this deed document and extract key information in JSON format.
-
-Deed Document:
-{text}
-
-Return a comprehensive analysis in this exact JSON structure:
-{{
-    "summary": "Brief summary of the deed",
-    "property_description": {{
-        "legal_description": "Full legal description",
-        "acres": "Acreage if mentioned",
-        "lot_block": "Lot and block if applicable",
-        "subdivision": "Subdivision name if applicable"
-    }},
-    "parties": {{
-        "grantor": "Person/entity granting the deed",
-        "grantee": "Person/entity receiving the deed"
-    }},
-    "metes_and_bounds": [
-        {{
-            "call_number": 1,
-            "bearing": "Bearing direction",
-            "distance": "Distance with units",
-            "description": "Full call description"
-        }}
-    ],
-    "monuments": [
-        {{
-            "type": "Type of monument",
-            "description": "Description of monument",
-            "action": "found/set/referenced"
-        }}
-    ],
-    "dates": {{
-        "deed_date": "Date of deed",
-        "recording_date": "Date recorded if mentioned"
-    }},
-    "references": {{
-        "book_page": "Book and page reference",
-        "deed_book": "Deed book reference",
-        "plat_references": "Any plat references"
-    }},
-    "key_findings": [
-        "Important findings or notable aspects"
-    ],
-    "confidence_score": 0.95
-}}
-
-Provide 'null' for any information not clearly present. If not a deed, return: {{"error": "Invalid document type"}}"""
-
-            message = cls._client.messages.create(
-                model=cls._model,
-                max_tokens=4000,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            result_text = message.content[0].text
-            
-            # Try to extract JSON from the response
-            try:
-                # Find JSON in the response (might be wrapped in markdown)
-                if "```json" in result_text:
-                    json_start = result_text.find("```json") + 7
-                    json_end = result_text.find("```", json_start)
-                    result_text = result_text[json_start:json_end].strip()
-                elif "{" in result_text:
-                    json_start = result_text.find("{")
-                    json_end = result_text.rfind("}") + 1
-                    result_text = result_text[json_start:json_end]
-                
-                parsed_result = json.loads(result_text)
-                logger.info(f"Claude deed analysis successful")
-                return parsed_result
-                
-            except json.JSONDecodeError as json_e:
-                logger.error(f"Failed to parse JSON from Claude response: {json_e}")
-                return {
-                    "error": "Invalid JSON response from Claude",
-                    "raw_response": result_text
-                }
+            message = cls._create_message(cls._analysis_request(text), "analyze")
+            return cls._remember_analysis(key, cls._parse_analysis(message.content[0].text))
                 
         except Exception as e:
             logger.error(f"Failed to analyze deed with Claude: {e}")
@@ -234,71 +816,159 @@ Provide 'null' for any information not clearly present. If not a deed, return: {
             }
     
     @classmethod
-    def extract_coordinates(cls, text: str) -> Dict[str, Any]:
-        """Extract coordinate information from deed text using Claude."""
+    async def analyze_deed_document_async(cls, text: str) -> Dict[str, Any]:
+        """Async variant of analyze_deed_document using the pooled async client."""
         if not cls.is_available():
             return {"error": "Claude service not available"}
+        
+        key = fingerprint(text)
+        cached = cls._analysis_cache.get(key)
+        if cached is not None:
+            return dict(cached)
             
         try:
-            prompt = f"""Extract all coordinate information from this deed document and return it in structured JSON format.
-
-Look for:
-- Bearings (e.g., N45°30'15"E, South 28 degrees West)
-- Distances (with units: feet, chains, poles, etc.)
-- Curve data (radius, delta, chord bearings)
-- Coordinate points if present
-
-Deed Document:
-{text}
-
-Return in this exact JSON format:
-{{
-    "bearings": [
-        {{"bearing": "N45°30'15\"E", "normalized": "45.504167", "quadrant": "NE"}}
-    ],
-    "distances": [
-        {{"distance": "125.75", "units": "feet", "in_feet": 125.75}}
-    ],
-    "curves": [
-        {{"radius": "50.0", "delta": "45°30'", "chord_bearing": "N67°45'E"}}
-    ],
-    "coordinate_points": [
-        {{"point": "Point A", "coordinates": "x, y if present"}}
-    ]
-}}
+            message = await cls._create_message_async(cls._analysis_request(text), "analyze")
+            return cls._remember_analysis(key, cls._parse_analysis(message.content[0].text))
+                
+        except Exception as e:
+            logger.error(f"Failed to analyze deed with Claude: {e}")
+            return {
+                "error": "Claude analysis failed",
+                "message": str(e)
+            }
+    
+    @classmethod
+    def _remember_analysis(cls, key: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a copy of a successful analysis; callers may add keys to theirs."""
+        if 'error' not in analysis:
+            cls._analysis_cache.set(key, dict(analysis))
+        return analysis
+    
+    @classmethod
+    def _analysis_request(cls, text: str) -> Dict[str, Any]:
+        """Build the messages.create arguments for deed analysis."""
+        prompt = "".join((_PROMPT_ANALYZE_HEAD, text, _PROMPT_ANALYZE_TAIL))
 
-If no coordinate information found, return structure with empty lists."""
+        return cls._user_request("analyze", prompt)
+    
+    @classmethod
+    def _parse_analysis(cls, result_text: str) -> Dict[str, Any]:
+        """Parse the JSON body of a deed analysis response."""
+        try:
+            parsed_result = cls._parse_claude_json(result_text)
+            logger.info("Claude deed analysis successful")
+            return parsed_result
+            
+        except json.JSONDecodeError as json_e:
+            logger.error(f"Failed to parse JSON from Claude response: {json_e}")
+            return {
+                "error": "Invalid JSON response from Claude",
+                "raw_response": result_text
+            }
+    
+    @classmethod
+    def generate_summary(cls, text: str) -> str:
+        """Generate a concise plain-language summary of a deed. Raises on API errors."""
+        message = cls._create_message(cls._summary_request(text), "summary")
+        logger.info("Claude deed summary successful")
+        return message.content[0].text.strip()
+    
+    @classmethod
+    async def generate_summary_async(cls, text: str) -> str:
+        """Async variant of generate_summary using the pooled async client."""
+        message = await cls._create_message_async(cls._summary_request(text), "summary")
+        logger.info("Claude deed summary successful")
+        return message.content[0].text.strip()
+    
+    @classmethod
+    def _summary_request(cls, text: str) -> Dict[str, Any]:
+        """Build the messages.create arguments for a deed summary."""
+        prompt = "".join((_PROMPT_SUMMARY_HEAD, text, _PROMPT_SUMMARY_TAIL))
 
-            message = cls._client.messages.create(
-                model=cls._model,
-                max_tokens=3000,
-                temperature=0.0,
-                messages=[{"role": "user", "content": prompt}]
-            )
+        return cls._user_request("summary", prompt)
+    
+    @classmethod
+    def validate_deed_data(cls, extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Check extracted deed data for closure, consistency and completeness using Claude."""
+        if not cls.is_available():
+            return {"error": "Claude service not available"}
             
-            result_text = message.content[0].text
+        try:
+            message = cls._create_message(cls._validation_request(extracted_data), "validate")
+            return cls._parse_validation(message.content[0].text)
+                
+        except Exception as e:
+            logger.error(f"Failed to validate deed data with Claude: {e}")
+            return {
+                "error": "Claude validation failed",
+                "message": str(e)
+            }
+    
+    @classmethod
+    async def validate_deed_data_async(cls, extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of validate_deed_data using the pooled async client."""
+        if not cls.is_available():
+            return {"error": "Claude service not available"}
             
-            # Parse JSON response
-            try:
-                if "```json" in result_text:
-                    json_start = result_text.find("```json") + 7
-                    json_end = result_text.find("```", json_start)
-                    result_text = result_text[json_start:json_end].strip()
-                elif "{" in result_text:
-                    json_start = result_text.find("{")
-                    json_end = result_text.rfind("}") + 1
-                    result_text = result_text[json_start:json_end]
+        try:
+            message = await cls._create_message_async(cls._validation_request(extracted_data), "validate")
+            return cls._parse_validation(message.content[0].text)
                 
-                parsed_result = json.loads(result_text)
-                logger.info(f"Claude coordinate extraction successful")
-                return parsed_result
+        except Exception as e:
+            logger.error(f"Failed to validate deed data with Claude: {e}")
+            return {
+                "error": "Claude validation failed",
+                "message": str(e)
+            }
+    
+    @classmethod
+    def _validation_request(cls, extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the messages.create arguments for validating extracted deed data."""
+        prompt = "".join((_PROMPT_VALIDATE_HEAD, json.dumps(extracted_data, indent=2, default=str), _PROMPT_VALIDATE_TAIL))
+
+        return cls._user_request("validate", prompt)
+    
+    @classmethod
+    def _parse_validation(cls, result_text: str) -> Dict[str, Any]:
+        """Parse the JSON body of a validation response."""
+        try:
+            parsed_result = cls._parse_claude_json(result_text)
+            logger.info("Claude deed validation successful")
+            return parsed_result
+            
+        except json.JSONDecodeError as json_e:
+            logger.error(f"Failed to parse validation JSON from Claude: {json_e}")
+            return {
+                "error": "Invalid JSON response from Claude for validation",
+                "raw_response": result_text
+            }
+    
+    @classmethod
+    def extract_coordinates(cls, text: str) -> Dict[str, Any]:
+        """Extract coordinate information from deed text using Claude."""
+        if not cls.is_available():
+            return {"error": "Claude service not available"}
+            
+        try:
+            message = cls._create_message(cls._coordinates_request(text), "coordinates")
+            return cls._parse_coordinates(message.content[0].text)
                 
-            except json.JSONDecodeError as json_e:
-                logger.error(f"Failed to parse coordinate JSON from Claude: {json_e}")
-                return {
-                    "error": "Invalid JSON response from Claude for coordinates",
-                    "raw_response": result_text
-                }
+        except Exception as e:
+            logger.error(f"Failed to extract coordinates with Claude: {e}")
+            return {
+                "error": "Claude coordinate extraction failed",
+                "message": str(e)
+            }
+    
+    @classmethod
+    async def extract_coordinates_async(cls, text: str) -> Dict[str, Any]:
+        """Async variant of extract_coordinates using the pooled async client."""
+        if not cls.is_available():
+            return {"error": "Claude service not available"}
+            
+        try:
+            message = await cls._create_message_async(cls._coordinates_request(text), "coordinates")
+            return cls._parse_coordinates(message.content[0].text)
                 
         except Exception as e:
             logger.error(f"Failed to extract coordinates with Claude: {e}")
@@ -307,6 +977,42 @@ If no coordinate information found, return structure with empty lists."""
                 "message": str(e)
             }
     
+    @classmethod
+    def _coordinates_request(cls, text: str) -> Dict[str, Any]:
+        """Build the messages.create arguments for coordinate extraction."""
+        prompt = "".join((_PROMPT_COORDINATES_HEAD, text, _PROMPT_COORDINATES_TAIL))
+
+        return cls._user_request("coordinates", prompt)
+    
+    @classmethod
+    def _parse_coordinates(cls, result_text: str) -> Dict[str, Any]:
+        """Parse the JSON body of a coordinate extraction response."""
+        try:
+            parsed_result = cls._parse_claude_json(result_text)
+            logger.info("Claude coordinate extraction successful")
+            return parsed_result
+            
+        except json.JSONDecodeError as json_e:
+            logger.error(f"Failed to parse coordinate JSON from Claude: {json_e}")
+            return {
+                "error": "Invalid JSON response from Claude for coordinates",
+                "raw_response": result_text
+            }
+    
+    @staticmethod
+    def _parse_claude_json(result_text: str) -> Any:
+        """
+        Parse JSON from a Claude response, which might be wrapped in markdown.
+        
+        Raises json.JSONDecodeError (which orjson's error subclasses) when the
+        response holds no valid JSON object.
+        """
+        match = _FENCED_JSON.search(result_text)
+        body = match.group(1) if match else result_text
+        match = _JSON_OBJECT.search(body)
+        body = match.group(0) if match else body
+        return orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+    
     @classmethod
     def answer_question(cls, document_text: str, question: str, chat_history: Optional[List[Dict]] = None) -> str:
         """Answer questions about the deed document using Claude."""
@@ -314,29 +1020,28 @@ If no coordinate information found, return structure with empty lists."""
             return "Claude service is not available."
             
         try:
-            # Build conversation context
-            conversation = f"""You are an expert surveyor and legal assistant helping users understand deed documents.
-
-Here is the deed document for reference:
-{document_text}
-
-Answer questions clearly and accurately based on the document content. If information is not in the document, clearly state that. Provide specific references to the document when possible."""
-
-            # Add chat history if provided
-            if chat_history:
-                conversation += "\n\nPrevious conversation:\n"
-                for entry in chat_history[-3:]:  # Limit to last 3 exchanges
-                    role = entry.get("role", "user")
-                    content = entry.get("content", "")
-                    conversation += f"{role}: {content}\n"
+            message = cls._create_message(
+                cls._question_request(document_text, question, chat_history), "chat"
+            )
             
-            conversation += f"\nUser question: {question}"
-
-            message = cls._client.messages.create(
-                model=cls._model,
-                max_tokens=1000,
-                temperature=0.2,
-                messages=[{"role": "user", "content": conversation}]
+            answer = message.content[0].text
+            logger.info(f"Claude Q&A successful for question: '{question[:50]}...'")
+            return answer.strip()
+            
+        except Exception as e:
+            logger.error(f"Failed to answer question with Claude: {e}")
+            return f"Sorry, I encountered an error while processing your question: {str(e)}"
+    
+    @classmethod
+    async def answer_question_async(cls, document_text: str, question: str,
+                                    chat_history: Optional[List[Dict]] = None) -> str:
+        """Async variant of answer_question using the pooled async client."""
+        if not cls.is_available():
+            return "Claude service is not available."
+            
+        try:
+            message = await cls._create_message_async(
+                cls._question_request(document_text, question, chat_history), "chat"
             )
             
             answer = message.content[0].text
@@ -345,4 +1050,23 @@ Answer questions clearly and accurately based on the document content. If inform
             
         except Exception as e:
             logger.error(f"Failed to answer question with Claude: {e}")
-            return f"Sorry, I encountered an error while processing your question: {str(e)}" 
\ No newline at end of file
+            return f"Sorry, I encountered an error while processing your question: {str(e)}"
+    
+    @classmethod
+    def _question_request(cls, document_text: str, question: str,
+                          chat_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Build the messages.create arguments for a document Q&A turn."""
+        # Build conversation context
+        conversation = "".join((_PROMPT_QUESTION_HEAD, document_text, _PROMPT_QUESTION_TAIL))
+
+        # Add chat history if provided
+        if chat_history:
+            conversation += "\n\nPrevious conversation:\n"
+            for entry in list(chat_history)[-3:]:  # Limit to last 3 exchanges
+                role = entry.get("role", "user")
+                content = entry.get("content", "")
+                conversation += f"{role}: {content}\n"
+        
+        conversation += f"\nUser question: {question}"
+
+        return cls._user_request("chat", conversation)
\ No newline at end of file
@@ -5,16 +5,79 @@ Fallback OCR using OpenAI's vision capabilities when Tesseract is not available.
 """
 
 import os
+import time
+import random
 import logging
+import threading
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from PIL import Image
 import io
+import cv2
+import numpy as np
 import fitz  # PyMuPDF
-from openai import OpenAI
+import httpx
+from openai import OpenAI, APITimeoutError, RateLimitError
+
+from .cache_service import ContentCache, file_fingerprint
+from .ocr_service import EMBEDDED_TEXT_MIN_CHARS, close_pdf, page_render_scale
 
 logger = logging.getLogger(__name__)
 
+# Longest image side sent to OpenAI Vision (the high-detail tile grid's limit);
+# larger images are downscaled and all are sent as JPEG
+VISION_MAX_DIMENSION = 2048
+VISION_JPEG_QUALITY = 85
+# Pages of a PDF sent to OpenAI Vision at once
+VISION_MAX_WORKERS = 8
+# Tries per page on rate limits and timeouts, with exponential backoff
+VISION_MAX_ATTEMPTS = 3
+
+# Per-page Vision prompt, identical for every page so requests share a
+# byte-identical prefix (the page number only appears in logs)
+_VISION_PAGE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert at reading scanned deed documents. Extract all text from the image exactly as it appears, preserving formatting and structure."
+}
+_VISION_PAGE_PROMPT = {
+    "type": "text",
+    "text": "Extract all text from this page of a scanned deed document. Preserve exact formatting, especially for metes and bounds descriptions, bearings, and distances."
+}
+
+# Connection pool for the shared OpenAI client; keep-alive connections are
+# reused across page requests instead of paying a TLS handshake per page
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=30.0)
+OPENAI_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+_openai_client: Optional[OpenAI] = None
+_openai_client_lock = threading.Lock()
+
+# OpenAI Vision results by file content, so re-uploaded deeds cost no API calls
+vision_cache = ContentCache(max_entries=128, disk_dir=os.path.join("uploads", ".cache", "openai_vision"))
+
+def get_openai_client() -> Optional[OpenAI]:
+    """
+    Return the shared OpenAI client, creating it on first use.
+    
+    The client speaks HTTP/2 over a pooled httpx client, so concurrent page
+    requests multiplex over one connection. Returns None when
+    OPENAI_API_KEY is not set.
+    """
+    global _openai_client
+    if _openai_client is None:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning("OPENAI_API_KEY not found. OpenAI Vision fallback is disabled.")
+            return None
+        with _openai_client_lock:
+            if _openai_client is None:
+                _openai_client = OpenAI(
+                    api_key=api_key,
+                    http_client=httpx.Client(limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT, http2=True)
+                )
+    return _openai_client
+
 class OCRFallbackService:
     """Fallback OCR service using OpenAI's vision capabilities."""
     
@@ -22,20 +85,88 @@ class OCRFallbackService:
     def encode_image(image_path: str) -> str:
         """Encode image to base64 string."""
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            return base64.b64encode(image_file.read()).decode('ascii')
     
     @staticmethod
-    def encode_pil_image(pil_image: Image.Image) -> str:
-        """Encode PIL Image to base64 string."""
+    def encode_pil_image(pil_image: Image.Image, format: str = "JPEG",
+                         quality: int = VISION_JPEG_QUALITY) -> str:
+        """
+        Encode PIL Image to base64 string.
+        
+        The image is downscaled in place to fit VISION_MAX_DIMENSION first.
+        """
+        pil_image.thumbnail((VISION_MAX_DIMENSION, VISION_MAX_DIMENSION), Image.Resampling.LANCZOS)
+        if format == "JPEG":
+            if pil_image.mode not in ("L", "RGB"):
+                pil_image = pil_image.convert("RGB")
+            return OCRFallbackService.encode_jpeg(np.asarray(pil_image), quality)
         buffer = io.BytesIO()
-        pil_image.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        pil_image.save(buffer, format=format, quality=quality, optimize=True)
+        return base64.b64encode(buffer.getbuffer()).decode('ascii')
+    
+    @staticmethod
+    def encode_jpeg(pixels: np.ndarray, quality: int = VISION_JPEG_QUALITY) -> str:
+        """
+        Encode an RGB or grayscale pixel array as a base64 JPEG.
+        
+        Uses OpenCV's libjpeg-turbo encoder, which is several times faster
+        than Pillow's and releases the GIL while it runs.
+        """
+        if pixels.ndim == 3:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+        ok, buffer = cv2.imencode(
+            '.jpg', pixels, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+        )
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return base64.b64encode(buffer).decode('ascii')
+    
+    @staticmethod
+    def image_url(base64_image: str) -> dict:
+        """image_url content for a JPEG from encode_pil_image, read at high detail."""
+        return {
+            "url": f"data:image/jpeg;base64,{base64_image}",
+            "detail": "high"
+        }
+    
+    @staticmethod
+    def cached_vision(file_path: str, client: Optional[OpenAI], extract) -> Optional[str]:
+        """
+        Return extract(file_path, client), reusing the result for files with identical content.
+        
+        Without a client, the shared one from get_openai_client() is used.
+        """
+        client = client or get_openai_client()
+        if client is None:
+            return None
+        
+        try:
+            key = file_fingerprint(file_path)
+        except OSError:
+            return extract(file_path, client)
+        
+        text = vision_cache.get(key)
+        if text is not None:
+            logger.info(f"OpenAI Vision cache hit for {file_path} ({key[:12]})")
+            return text
+        
+        text = extract(file_path, client)
+        if text:
+            vision_cache.set(key, text)
+        return text
+    
+    @staticmethod
+    def extract_text_from_image_with_vision(image_path: str, client: Optional[OpenAI] = None) -> Optional[str]:
+        """Extract text from image using OpenAI's vision capabilities, cached by file content."""
+        return OCRFallbackService.cached_vision(
+            image_path, client, OCRFallbackService._extract_text_from_image_with_vision
+        )
     
     @staticmethod
-    def extract_text_from_image_with_vision(image_path: str, client: OpenAI) -> Optional[str]:
-        """Extract text from image using OpenAI's vision capabilities."""
+    def _extract_text_from_image_with_vision(image_path: str, client: OpenAI) -> Optional[str]:
         try:
-            base64_image = OCRFallbackService.encode_image(image_path)
+            with Image.open(image_path) as image:
+                base64_image = OCRFallbackService.encode_pil_image(image)
             
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
@@ -53,9 +184,7 @@ class OCRFallbackService:
                             },
                             {
                                 "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{base64_image}"
-                                }
+                                "image_url": OCRFallbackService.image_url(base64_image)
                             }
                         ]
                     }
@@ -73,46 +202,82 @@ class OCRFallbackService:
             return None
     
     @staticmethod
-    def extract_text_from_pdf_with_vision(pdf_path: str, client: OpenAI) -> Optional[str]:
-        """Extract text from PDF pages using OpenAI's vision capabilities."""
-        extracted_text = ""
+    def extract_text_from_pdf_with_vision(pdf_path: str, client: Optional[OpenAI] = None) -> Optional[str]:
+        """
+        Extract text from PDF pages using OpenAI's vision capabilities.
         
+        Pages with embedded text are used as is. Each of the rest is sent
+        as soon as it is rendered, so rendering overlaps the requests in
+        flight (up to VISION_MAX_WORKERS at once); results are joined back
+        in page order and cached by file content.
+        """
+        return OCRFallbackService.cached_vision(
+            pdf_path, client, OCRFallbackService._extract_text_from_pdf_with_vision
+        )
+    
+    @staticmethod
+    def _extract_text_from_pdf_with_vision(pdf_path: str, client: OpenAI) -> Optional[str]:
         try:
-            pdf_document = fitz.open(pdf_path)
-            
-            for page_num in range(pdf_document.page_count):
-                logger.info(f"Processing page {page_num + 1} of {pdf_document.page_count} with OpenAI Vision")
-                
-                page = pdf_document[page_num]
-                
-                # Convert page to image
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x scale for better quality
-                img_data = pix.tobytes("png")
-                pil_image = Image.open(io.BytesIO(img_data))
-                
-                # Encode image
-                base64_image = OCRFallbackService.encode_pil_image(pil_image)
+            page_texts = {}
+            with ThreadPoolExecutor(max_workers=VISION_MAX_WORKERS) as executor:
+                pdf_document = fitz.open(pdf_path)
+                try:
+                    vision_pages = {}
+                    for page_num in range(pdf_document.page_count):
+                        page = pdf_document[page_num]
+                        # Born-digital pages need no Vision call
+                        text = page.get_text()
+                        if len(text.strip()) > EMBEDDED_TEXT_MIN_CHARS:
+                            page_texts[page_num] = text
+                            continue
+                        
+                        # Convert page to image at 2x for better quality, or less
+                        # for low-resolution scans or if that would exceed
+                        # VISION_MAX_DIMENSION
+                        scale = page_render_scale(page, VISION_MAX_DIMENSION)
+                        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csRGB, alpha=False)
+                        # Encode the raw RGB samples directly, with no PNG round trip
+                        pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+                        base64_image = OCRFallbackService.encode_jpeg(pixels)
+                        del pix, pixels
+                        vision_pages[page_num] = executor.submit(
+                            OCRFallbackService._extract_page_with_vision, client, page_num, base64_image
+                        )
+                finally:
+                    close_pdf(pdf_document)
                 
-                # Extract text using vision
+                logger.info(f"Processing {len(vision_pages)} pages with OpenAI Vision")
+                for page_num, future in vision_pages.items():
+                    page_texts[page_num] = future.result()
+            
+            extracted_text = "".join(
+                f"\n--- Page {page_num + 1} ---\n{page_texts[page_num]}"
+                for page_num in sorted(page_texts) if page_texts[page_num]
+            )
+            
+            logger.info(f"Successfully extracted {len(extracted_text)} characters from PDF using OpenAI Vision")
+            return extracted_text
+        
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF with OpenAI Vision: {e}")
+            return None
+    
+    @staticmethod
+    def _extract_page_with_vision(client: OpenAI, page_num: int, base64_image: str) -> Optional[str]:
+        """Extract text from one rendered PDF page, backing off on rate limits and timeouts."""
+        for attempt in range(VISION_MAX_ATTEMPTS):
+            try:
                 response = client.chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert at reading scanned deed documents. Extract all text from the image exactly as it appears, preserving formatting and structure."
-                        },
+                        _VISION_PAGE_SYSTEM_MESSAGE,
                         {
                             "role": "user",
                             "content": [
-                                {
-                                    "type": "text",
-                                    "text": f"Extract all text from page {page_num + 1} of this scanned deed document. Preserve exact formatting, especially for metes and bounds descriptions, bearings, and distances."
-                                },
+                                _VISION_PAGE_PROMPT,
                                 {
                                     "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{base64_image}"
-                                    }
+                                    "image_url": OCRFallbackService.image_url(base64_image)
                                 }
                             ]
                         }
@@ -120,16 +285,11 @@ class OCRFallbackService:
                     max_tokens=4000,
                     temperature=0.1
                 )
-                
-                page_text = response.choices[0].message.content
-                if page_text:
-                    extracted_text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-                    
-            pdf_document.close()
-            
-            logger.info(f"Successfully extracted {len(extracted_text)} characters from PDF using OpenAI Vision")
-            return extracted_text
+                return response.choices[0].message.content
             
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF with OpenAI Vision: {e}")
-            return None 
\ No newline at end of file
+            except (RateLimitError, APITimeoutError) as e:
+                if attempt == VISION_MAX_ATTEMPTS - 1:
+                    raise
+                delay = 2 ** attempt + random.uniform(0, 1)
+                logger.warning(f"OpenAI Vision failed on page {page_num + 1} ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
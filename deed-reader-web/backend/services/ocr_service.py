@@ -5,10 +5,14 @@ Handles optical character recognition for scanned deed documents.
 """
 
 import os
-import io
+import json
+import asyncio
 import logging
 import tempfile
-from typing import List, Optional, Tuple
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
 import cv2
 import numpy as np
 from PIL import Image
@@ -34,31 +38,325 @@ except ImportError:
     logger.warning("pytesseract module not available. Will use Claude Vision as fallback.")
 
 from .claude_service import ClaudeService
+from .cache_service import ContentCache, file_fingerprint
+
+# OCR output at or above this Tesseract confidence, with enough deed
+# vocabulary, is used as-is instead of being sent to Claude for cleanup
+OCR_CONFIDENCE_THRESHOLD = 80
+OCR_MIN_KEYWORD_HITS = 3
+_OCR_KEYWORD_RE = re.compile(r'\b(thence|bearing|feet|grantor)\b', re.IGNORECASE)
+# PDF pages with more embedded text than this are used as is, without OCR
+EMBEDDED_TEXT_MIN_CHARS = 50
+# Pages are rendered for OCR at up to 2x (144 DPI), and at most this many
+# pixels on their longer side
+OCR_RENDER_SCALE = 2.0
+OCR_MAX_DIMENSION = 3000
+
+# Patterns for clean_ocr_text and enhance_deed_text, compiled once
+# Runs of blank lines (group 1) or of spaces, collapsed in one scan
+_WHITESPACE_RE = re.compile(r'(\n\s*\n)| +')
+# Deed terms normalized to their usual case, whatever case OCR produced
+_UPPERCASE_TERMS_RE = re.compile(r'\b(?:THENCE|NORTH|SOUTH|EAST|WEST|BEARING|DEED|GRANTOR|GRANTEE)\b', re.IGNORECASE)
+_LOWERCASE_TERMS_RE = re.compile(r'\b(?:feet|degrees|minutes|seconds)\b', re.IGNORECASE)
+_DEGREE_RE = re.compile(r'(\d+)\s*[°o]\s*')
+# Letter O misread next to digits
+_O_AS_ZERO_RE = re.compile(r'\bO\b(?=\d)|(?<=\d)O\b')
+_BEARING_RE = re.compile(r'([NS])\s*(\d+)\s*[°o]?\s*(\d+)?\s*[\']?\s*(\d+)?\s*["]?\s*([EW])', re.IGNORECASE)
+_FEET_ABBREVIATION_RE = re.compile(r'(\d+\.?\d*)\s*ft\.?', re.IGNORECASE)
+
+# Process pool for Tesseract OCR, created on first use; preprocessing is
+# Python/OpenCV work that doesn't release the GIL
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+# OCR results by file content, so a re-uploaded deed skips Tesseract and
+# Claude Vision entirely; on disk so worker processes and restarts share it
+ocr_cache = ContentCache(max_entries=128, disk_dir=os.path.join("uploads", ".cache", "ocr"))
+
+def close_pdf(pdf_document: fitz.Document):
+    """
+    Close a PyMuPDF document and empty MuPDF's resource store.
+    
+    Fonts, images and display lists decoded while rendering stay in the
+    process-wide store after the document is gone; on long deed books that
+    adds up, so it is released once each document is done with.
+    """
+    pdf_document.close()
+    fitz.TOOLS.store_shrink(100)
+
+def page_render_scale(page: fitz.Page, max_dimension: int = OCR_MAX_DIMENSION) -> float:
+    """
+    Zoom factor for rendering a PDF page for OCR.
+    
+    Pages render at OCR_RENDER_SCALE, except that a scanned page is not
+    rendered beyond its scan's own resolution (interpolated pixels add no
+    detail, only work), and no page exceeds max_dimension pixels.
+    """
+    scale = OCR_RENDER_SCALE
+    try:
+        images = page.get_images(full=True)
+        if images:
+            # The largest embedded image is the scan itself
+            xref, _, width, height = max(images, key=lambda image: image[2] * image[3])[:4]
+            rects = page.get_image_rects(xref)
+            if rects and not rects[0].is_empty:
+                # Image pixels per PDF point, which is the zoom matching the scan
+                native_scale = max(width, height) / max(rects[0].width, rects[0].height)
+                scale = min(scale, max(1.0, native_scale))
+    except Exception as e:
+        logger.debug(f"Could not read scan resolution of page {page.number + 1}: {e}")
+    return min(scale, max_dimension / max(page.rect.width, page.rect.height))
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared OCR pool, creating it on first use.
+    
+    Workers start from a forkserver where the platform has one, as the PDF
+    and parser pools do: the pool is first used from a request thread, and
+    a plain fork could copy a lock held by the Claude dispatcher, HTTP pool
+    or logging threads into a worker.
+    """
+    global _ocr_pool
+    if _ocr_pool is None:
+        with _ocr_pool_lock:
+            if _ocr_pool is None:
+                mp_context = None
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    mp_context = multiprocessing.get_context("forkserver")
+                _ocr_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=mp_context)
+    return _ocr_pool
+
+def shutdown_ocr_pool():
+    """Shut down the OCR pool, if it was started."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False)
+            _ocr_pool = None
 
 class OCRService:
     """Service for extracting text from scanned documents."""
     
     @staticmethod
-    def preprocess_image(image):
-        """Preprocess image for better OCR results."""
-        # Convert PIL Image to OpenCV format
-        open_cv_image = np.array(image)
+    def preprocess_image(image) -> np.ndarray:
+        """
+        Preprocess a PIL Image or RGB/grayscale pixel array for better OCR results.
+        
+        Returns the binarized grayscale array, which pytesseract takes as is.
+        """
+        # View as OpenCV pixels; arrays are used without copying
+        open_cv_image = np.asarray(image)
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(open_cv_image, cv2.COLOR_RGB2GRAY)
+        # Convert to grayscale; the converted copy is ours, so thresholding
+        # can overwrite it instead of allocating another page-sized buffer
+        if open_cv_image.ndim == 3:
+            gray = cv2.cvtColor(open_cv_image, cv2.COLOR_RGB2GRAY)
+            dst = gray
+        else:
+            gray = open_cv_image
+            dst = None
         
         # Apply thresholding to get better contrast
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst)
+        return thresh
+    
+    @staticmethod
+    def ocr_with_confidence(image) -> Tuple[str, Optional[float]]:
+        """
+        Preprocess and OCR an image, returning (text, mean word confidence).
+        
+        Uses a single image_to_data pass and rebuilds the text from its
+        words, so confidence costs no second OCR run. Confidence is 0-100,
+        or None when no words were recognized.
+        """
+        processed_pixels = OCRService.preprocess_image(image)
+        data = pytesseract.image_to_data(processed_pixels, lang='eng', output_type=pytesseract.Output.DICT)
+        return OCRService._text_with_confidence(data, range(len(data['text'])))
+    
+    @staticmethod
+    def _text_with_confidence(data: dict, indices) -> Tuple[str, Optional[float]]:
+        """Rebuild (text, mean word confidence) from the image_to_data rows at indices."""
+        lines = {}
+        confidences = []
+        for i in indices:
+            word = data['text'][i]
+            if not word.strip():
+                continue
+            line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(line_key, []).append(word)
+            conf = float(data['conf'][i])
+            if conf >= 0:
+                confidences.append(conf)
+        
+        # Blank line between blocks, as image_to_string does
+        text_lines = []
+        previous_block = None
+        for (block_num, _, _), words in lines.items():
+            if previous_block is not None and block_num != previous_block:
+                text_lines.append("")
+            text_lines.append(" ".join(words))
+            previous_block = block_num
+        
+        mean_confidence = sum(confidences) / len(confidences) if confidences else None
+        return "\n".join(text_lines), mean_confidence
+    
+    @staticmethod
+    def ocr_page_pixels(pixels: np.ndarray) -> Tuple[str, Optional[float]]:
+        """OCR a rendered page, returning (text, mean confidence). Safe to run in a worker process."""
+        return OCRService.ocr_with_confidence(pixels)
+    
+    @staticmethod
+    def ocr_pages_batch(pages: List[np.ndarray]) -> List[Tuple[str, Optional[float]]]:
+        """
+        OCR rendered pages in a single Tesseract run, returning (text, mean confidence) for each.
+        
+        The pages go to Tesseract as one multi-page TIFF, so its process
+        start and model load are paid once rather than per page. Safe to
+        run in a worker process.
+        """
+        fd, tiff_path = tempfile.mkstemp(suffix=".tif")
+        os.close(fd)
+        try:
+            images = [Image.fromarray(OCRService.preprocess_image(pixels)) for pixels in pages]
+            images[0].save(tiff_path, save_all=True, append_images=images[1:])
+            data = pytesseract.image_to_data(tiff_path, lang='eng', output_type=pytesseract.Output.DICT)
+        finally:
+            os.remove(tiff_path)
         
-        # Denoise
-        denoised = cv2.medianBlur(thresh, 1)
+        # Tesseract numbers the TIFF's pages from 1
+        rows_by_page = {}
+        for i, page_num in enumerate(data['page_num']):
+            rows_by_page.setdefault(page_num, []).append(i)
+        return [OCRService._text_with_confidence(data, rows_by_page.get(n, [])) for n in range(1, len(pages) + 1)]
+    
+    @staticmethod
+    def ocr_pages_pixels(pages: List[np.ndarray]) -> List[Tuple[str, Optional[float]]]:
+        """
+        OCR several rendered pages, returning (text, mean confidence) for each in order.
         
-        # Convert back to PIL Image
-        return Image.fromarray(denoised)
+        Pages are split into one contiguous batch per core, each OCR'd by a
+        single Tesseract run on the OCR pool; a single page is OCR'd here.
+        """
+        if len(pages) <= 1:
+            return [OCRService.ocr_page_pixels(pixels) for pixels in pages]
+        results = get_ocr_pool().map(OCRService.ocr_pages_batch, OCRService.page_batches(pages))
+        return [result for batch in results for result in batch]
+    
+    @staticmethod
+    def page_batches(pages: list) -> List[list]:
+        """Split pages into one contiguous batch per core, for ocr_pages_batch."""
+        if not pages:
+            return []
+        batch_size = -(-len(pages) // min(len(pages), os.cpu_count() or 1))
+        return [pages[start:start + batch_size] for start in range(0, len(pages), batch_size)]
+    
+    @staticmethod
+    def encode_page_png(pixels: np.ndarray) -> bytes:
+        """PNG bytes of a rendered page, for Claude Vision."""
+        _, png = cv2.imencode('.png', pixels)
+        return png.tobytes()
+    
+    @staticmethod
+    def render_pdf_pages(pdf_path: str, page_numbers: Optional[List[int]] = None) -> List[Tuple[int, Optional[str], Optional[np.ndarray]]]:
+        """
+        Split a PDF into pages that have embedded text and pages that need OCR.
+        
+        Returns (page_num, text, pixels) for each page, or only for the
+        zero-based page_numbers given; text is set for pages with substantial
+        embedded text, pixels for the rest. Pages are rendered straight to
+        grayscale arrays, which is what OCR preprocessing works on, with no
+        image encode/decode in between.
+        """
+        pages = []
+        pdf_document = fitz.open(pdf_path)
+        try:
+            if page_numbers is None:
+                page_numbers = range(pdf_document.page_count)
+            for page_num in page_numbers:
+                page = pdf_document[page_num]
+                text = page.get_text()
+                
+                # If page has substantial text, use it
+                if len(text.strip()) > EMBEDDED_TEXT_MIN_CHARS:
+                    logger.info(f"Page {page_num + 1} has embedded text")
+                    pages.append((page_num, text, None))
+                else:
+                    # Page needs OCR; extract it as an image
+                    logger.info(f"Page {page_num + 1} needs OCR")
+                    scale = page_render_scale(page)
+                    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False)
+                    pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+                    pages.append((page_num, None, pixels))
+                    # Drop the pixmap now rather than at the next page
+                    del pix
+        finally:
+            close_pdf(pdf_document)
+        return pages
+    
+    @staticmethod
+    def join_page_texts(page_texts: List[Tuple[int, str]]) -> str:
+        """Join per-page text in page order with page markers and clean it up."""
+        extracted_text = "".join(
+            f"\n--- Page {page_num + 1} ---\n{page_text}"
+            for page_num, page_text in sorted(page_texts) if page_text.strip()
+        )
+        return OCRService.clean_ocr_text(extracted_text)
+    
+    @staticmethod
+    def needs_enhancement(text: str, confidence: Optional[float]) -> bool:
+        """
+        Decide whether OCR text is worth a Claude cleanup pass.
+        
+        Skips the call when Tesseract was confident and the text already reads
+        like a deed. Unknown confidence (e.g. Claude Vision OCR) is judged on
+        the keywords alone.
+        """
+        if confidence is not None and confidence < OCR_CONFIDENCE_THRESHOLD:
+            return True
+        return len(_OCR_KEYWORD_RE.findall(text)) < OCR_MIN_KEYWORD_HITS
+    
+    @staticmethod
+    def cached_ocr(file_path: str, extract: Callable[[str], Tuple[str, Optional[float]]]) -> Tuple[str, Optional[float]]:
+        """
+        Return extract(file_path), reusing the result for files with identical content.
+        
+        Results are keyed by the file's SHA-256; empty results (failures)
+        are not cached.
+        """
+        try:
+            key = file_fingerprint(file_path)
+        except OSError:
+            # Let extract report the missing or unreadable file
+            return extract(file_path)
+        
+        cached = ocr_cache.get(key)
+        if cached is not None:
+            logger.info(f"OCR cache hit for {file_path} ({key[:12]})")
+            entry = json.loads(cached)
+            return entry["text"], entry["confidence"]
+        
+        text, confidence = extract(file_path)
+        if text:
+            ocr_cache.set(key, json.dumps({"text": text, "confidence": confidence}))
+        return text, confidence
     
     @staticmethod
     def extract_text_from_image(image_path: str) -> str:
         """Extract text from a single image using OCR."""
+        return OCRService.extract_text_with_confidence(image_path)[0]
+    
+    @staticmethod
+    def extract_text_with_confidence(image_path: str) -> Tuple[str, Optional[float]]:
+        """
+        Extract text from a single image, with Tesseract's mean word confidence.
+        
+        Confidence is None when Claude Vision did the OCR. Results are cached
+        by file content.
+        """
+        return OCRService.cached_ocr(image_path, OCRService._extract_text_with_confidence)
+    
+    @staticmethod
+    def _extract_text_with_confidence(image_path: str) -> Tuple[str, Optional[float]]:
         try:
             # If Tesseract is not available, use Claude Vision
             if not TESSERACT_AVAILABLE:
@@ -66,112 +364,150 @@ class OCRService:
                 if ClaudeService.is_available():
                     text = ClaudeService.extract_text_from_image(image_path)
                     if text:
-                        return OCRService.clean_ocr_text(text)
+                        return OCRService.clean_ocr_text(text), None
                 else:
                     logger.error("Neither Tesseract nor Claude is available for OCR")
-                    return ""
+                    return "", None
             
-            # Load image
+            # Load image, preprocess and OCR
             image = Image.open(image_path)
-            
-            # Preprocess for better OCR
-            processed_image = OCRService.preprocess_image(image)
-            
-            # Perform OCR
-            text = pytesseract.image_to_string(processed_image, lang='eng')
+            text, confidence = OCRService.ocr_with_confidence(image)
             
             # Clean up extracted text
             text = OCRService.clean_ocr_text(text)
             
             logger.info(f"Successfully extracted {len(text)} characters from image")
-            return text
+            return text, confidence
             
         except Exception as e:
             logger.error(f"Error extracting text from image: {e}")
-            return ""
+            return "", None
+    
+    @staticmethod
+    async def extract_text_with_vision_async(image_path: str) -> str:
+        """
+        Extract text from a single image with Claude Vision, for async callers.
+        
+        The request is awaited on the running loop's Claude client rather
+        than through the dispatcher. Shares the OCR cache with
+        extract_text_with_confidence.
+        """
+        key = await asyncio.to_thread(file_fingerprint, image_path)
+        cached = await asyncio.to_thread(ocr_cache.get, key)
+        if cached is not None:
+            logger.info(f"OCR cache hit for {image_path} ({key[:12]})")
+            return json.loads(cached)["text"]
+        
+        text = (await ClaudeService.extract_text_from_images_async([image_path]))[0]
+        text = OCRService.clean_ocr_text(text or "")
+        if text:
+            await asyncio.to_thread(ocr_cache.set, key, json.dumps({"text": text, "confidence": None}))
+        return text
     
     @staticmethod
     def extract_text_from_pdf(pdf_path: str) -> str:
         """Extract text from a scanned PDF using OCR."""
-        extracted_text = ""
-        temp_dir = None
+        return OCRService.extract_text_from_pdf_with_confidence(pdf_path)[0]
+    
+    @staticmethod
+    def extract_text_from_pdf_with_confidence(pdf_path: str) -> Tuple[str, Optional[float]]:
+        """
+        Extract text from a scanned PDF, with Tesseract's mean word confidence
+        over the OCR'd pages.
         
+        Confidence is None when Claude Vision did the OCR or no page needed it.
+        Results are cached by file content.
+        """
+        return OCRService.cached_ocr(pdf_path, OCRService._extract_text_from_pdf_with_confidence)
+    
+    @staticmethod
+    def _extract_text_from_pdf_with_confidence(pdf_path: str) -> Tuple[str, Optional[float]]:
         # If Tesseract is not available, use Claude Vision
         if not TESSERACT_AVAILABLE:
             logger.info("Using Claude Vision for PDF OCR (Tesseract not available)")
             if ClaudeService.is_available():
                 try:
-                    pdf_document = fitz.open(pdf_path)
-                    for page_num in range(pdf_document.page_count):
-                        page = pdf_document[page_num]
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                        img_data = pix.tobytes("png")
-                        temp_image_path = f"temp_page_{page_num}.png"
-                        
-                        with open(temp_image_path, "wb") as f:
-                            f.write(img_data)
-                        
-                        page_text = ClaudeService.extract_text_from_image(temp_image_path)
-                        if page_text:
-                            extracted_text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-                        
-                        # Clean up temp file
-                        if os.path.exists(temp_image_path):
-                            os.remove(temp_image_path)
+                    # Pages with embedded text are used as is; only scanned
+                    # pages are rendered and sent to Claude, all in one batch
+                    page_texts = OCRService.extract_text_from_pdf_pages(pdf_path)
+                    extracted_text = "".join(
+                        f"\n--- Page {page_num + 1} ---\n{page_text}"
+                        for page_num, page_text in page_texts if page_text
+                    )
                     
-                    pdf_document.close()
                     if extracted_text:
-                        enhanced_text = ClaudeService.enhance_ocr_text(extracted_text)
-                        return enhanced_text if enhanced_text else extracted_text
-                    return ""
+                        # Vision output that already reads like a deed is
+                        # used as is rather than sent back for cleanup
+                        if OCRService.needs_enhancement(extracted_text, None):
+                            enhanced_text = ClaudeService.enhance_ocr_text(extracted_text)
+                            if enhanced_text:
+                                return enhanced_text, None
+                        return extracted_text, None
+                    return "", None
                 except Exception as e:
                     logger.error(f"Claude PDF OCR failed: {e}")
-                    return ""
+                    return "", None
             else:
                 logger.error("Neither Tesseract nor Claude is available for OCR")
-                return ""
+                return "", None
         
         try:
-            # First, try to extract any embedded text
-            pdf_document = fitz.open(pdf_path)
-            
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                text = page.get_text()
-                
-                # If page has substantial text, use it
-                if len(text.strip()) > 50:
-                    logger.info(f"Page {page_num + 1} has embedded text")
-                    extracted_text += f"\n--- Page {page_num + 1} ---\n{text}"
-                else:
-                    # Page needs OCR
-                    logger.info(f"Page {page_num + 1} needs OCR")
-                    
-                    # Extract page as image
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                    img_data = pix.tobytes("png")
-                    
-                    # Convert to PIL Image
-                    image = Image.open(io.BytesIO(img_data))
-                    
-                    # Preprocess and OCR
-                    processed_image = OCRService.preprocess_image(image)
-                    page_text = pytesseract.image_to_string(processed_image, lang='eng')
-                    
-                    if page_text.strip():
-                        extracted_text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-            
-            pdf_document.close()
+            # First, try to extract any embedded text; OCR the remaining pages
+            pages = OCRService.render_pdf_pages(pdf_path)
+            ocr_results = iter(OCRService.ocr_pages_pixels(
+                [pixels for _, text, pixels in pages if text is None]
+            ))
+            page_texts = []
+            confidences = []
+            for page_num, text, _ in pages:
+                if text is None:
+                    text, confidence = next(ocr_results)
+                    if confidence is not None:
+                        confidences.append(confidence)
+                page_texts.append((page_num, text))
             
             # Clean up the entire extracted text
-            extracted_text = OCRService.clean_ocr_text(extracted_text)
+            extracted_text = OCRService.join_page_texts(page_texts)
+            mean_confidence = sum(confidences) / len(confidences) if confidences else None
             
             logger.info(f"Successfully extracted {len(extracted_text)} characters from PDF")
-            return extracted_text
+            return extracted_text, mean_confidence
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
-            return ""
+            return "", None
+    
+    @staticmethod
+    def extract_text_from_pdf_pages(pdf_path: str, page_numbers: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+        """
+        OCR the given zero-based pages of a PDF, or all of them.
+        
+        Returns (page_num, cleaned text) for each page, using Tesseract or,
+        when it is not installed, Claude Vision.
+        """
+        page_texts = []
+        # Pages for Claude Vision are collected and sent as one batch
+        vision_pages = []
+        try:
+            for page_num, text, pixels in OCRService.render_pdf_pages(pdf_path, page_numbers):
+                if text is None:
+                    if TESSERACT_AVAILABLE:
+                        text = OCRService.ocr_page_pixels(pixels)[0]
+                    elif ClaudeService.is_available():
+                        vision_pages.append((len(page_texts), OCRService.encode_page_png(pixels)))
+                        text = ""
+                    else:
+                        logger.error("Neither Tesseract nor Claude is available for OCR")
+                        text = ""
+                page_texts.append((page_num, OCRService.clean_ocr_text(text)))
+            
+            if vision_pages:
+                vision_texts = ClaudeService.extract_text_from_images([png for _, png in vision_pages])
+                for (index, _), text in zip(vision_pages, vision_texts):
+                    page_texts[index] = (page_texts[index][0], OCRService.clean_ocr_text(text or ""))
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF pages: {e}")
+        return page_texts
     
     @staticmethod
     def clean_ocr_text(text: str) -> str:
@@ -180,35 +516,17 @@ class OCRService:
             return ""
         
         # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _WHITESPACE_RE.sub(lambda match: '\n\n' if match.group(1) else ' ', text)
         
         # Fix common OCR mistakes in deed documents
-        replacements = {
-            r'\bTHENCE\b': 'THENCE',
-            r'\bNORTH\b': 'NORTH',
-            r'\bSOUTH\b': 'SOUTH',
-            r'\bEAST\b': 'EAST',
-            r'\bWEST\b': 'WEST',
-            r'\bBEARING\b': 'BEARING',
-            r'\bDEED\b': 'DEED',
-            r'\bGRANTOR\b': 'GRANTOR',
-            r'\bGRANTEE\b': 'GRANTEE',
-            r'\bfeet\b': 'feet',
-            r'\bdegrees\b': 'degrees',
-            r'\bminutes\b': 'minutes',
-            r'\bseconds\b': 'seconds',
-        }
-        
-        for pattern, replacement in replacements.items():
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+        text = _UPPERCASE_TERMS_RE.sub(lambda match: match.group(0).upper(), text)
+        text = _LOWERCASE_TERMS_RE.sub(lambda match: match.group(0).lower(), text)
         
         # Fix degree symbols
-        text = re.sub(r'(\d+)\s*[°o]\s*', r'\1° ', text)
+        text = _DEGREE_RE.sub(r'\1° ', text)
         
         # Fix common number/letter confusion
-        text = re.sub(r'\bO\b(?=\d)', '0', text)
-        text = re.sub(r'(?<=\d)O\b', '0', text)
+        text = _O_AS_ZERO_RE.sub('0', text)
         
         return text.strip()
     
@@ -225,8 +543,6 @@ class OCRService:
                 return enhanced
         
         # Fallback: basic enhancements
-        bearing_pattern = r'([NS])\s*(\d+)\s*[°o]?\s*(\d+)?\s*[\']?\s*(\d+)?\s*["]?\s*([EW])'
-        
         def fix_bearing(match):
             parts = match.groups()
             direction1 = parts[0]
@@ -236,27 +552,34 @@ class OCRService:
             direction2 = parts[4]
             return f"{direction1} {degrees}° {minutes}' {seconds}\" {direction2}"
         
-        text = re.sub(bearing_pattern, fix_bearing, text, flags=re.IGNORECASE)
-        text = re.sub(r'(\d+\.?\d*)\s*ft\.?', r'\1 feet', text, flags=re.IGNORECASE)
+        text = _BEARING_RE.sub(fix_bearing, text)
+        text = _FEET_ABBREVIATION_RE.sub(r'\1 feet', text)
         
         return text
     
     @staticmethod
     def is_ocr_needed(file_path: str, file_type: str) -> bool:
-        """Check if OCR is needed for the file."""
+        """
+        Check if OCR is needed for the file.
+        
+        A PDF needs OCR when it has under 100 characters of embedded text;
+        pages are read only until that much is found.
+        """
         if file_type in ['png', 'jpg', 'jpeg', 'tiff', 'bmp']:
             return True
         
         if file_type == 'pdf':
             try:
                 pdf_document = fitz.open(file_path)
-                total_text = ""
-                
-                for page in pdf_document:
-                    total_text += page.get_text()
-                
-                pdf_document.close()
-                return len(total_text.strip()) < 100
+                try:
+                    total_chars = 0
+                    for page in pdf_document:
+                        total_chars += len(page.get_text().strip())
+                        if total_chars >= 100:
+                            return False
+                    return True
+                finally:
+                    pdf_document.close()
                 
             except Exception as e:
                 logger.error(f"Error checking PDF for text: {e}")
@@ -0,0 +1,154 @@
+"""
+PDF Service for Deed Reader Pro
+-------------------------------
+Text extraction from digital PDFs, spread over a process pool for long documents.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# PDFium is much faster than PyPDF2 at text extraction; PyPDF2 remains the
+# fallback when it is not installed or cannot read a file
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+    logger.warning("pypdfium2 not available. Falling back to PyPDF2 for PDF text extraction.")
+
+PDF_PAGE_BLOCK = 4  # Pages per worker task; blocks keep IPC and re-open costs down
+
+# Process pool for PDF text extraction, created on first use
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared PDF extraction pool, creating it on first use.
+    
+    Workers start from a forkserver where the platform has one, like
+    main.py's parser pool. The pool is first used from a request thread,
+    once the Claude dispatcher, HTTP pools and logging threads are running;
+    a plain fork could copy one of their locks mid-use into a worker.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                mp_context = None
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    mp_context = multiprocessing.get_context("forkserver")
+                _pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=mp_context)
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    """Shut down the PDF extraction pool, if it was started."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False)
+            _pdf_pool = None
+
+
+def page_blocks(n_pages: int, first_page: int = 0) -> List[Tuple[int, int]]:
+    """Split pages [first_page, n_pages) into (start, end) blocks of PDF_PAGE_BLOCK pages."""
+    return [
+        (start, min(start + PDF_PAGE_BLOCK, n_pages))
+        for start in range(first_page, n_pages, PDF_PAGE_BLOCK)
+    ]
+
+
+def count_pages(file_path: str) -> int:
+    """Return the number of pages in a PDF."""
+    if PDFIUM_AVAILABLE:
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        except Exception as e:
+            logger.warning(f"PDFium could not open {file_path}, falling back to PyPDF2: {e}")
+
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def extract_pages(file_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract text from pages [start, end) of a PDF.
+
+    Returns one string per page, empty for pages without text. Module-level
+    so it can run in the PDF process pool; each call opens the file once for
+    its whole block of pages.
+    """
+    if PDFIUM_AVAILABLE:
+        try:
+            return _extract_pages_pdfium(file_path, start, end)
+        except Exception as e:
+            logger.warning(f"PDFium failed on pages {start+1}-{end}, falling back to PyPDF2: {e}")
+
+    return _extract_pages_pypdf2(file_path, start, end)
+
+
+def extract_all_pages(file_path: str, n_pages: int, first_page: int = 0) -> List[str]:
+    """
+    Extract text from pages [first_page, n_pages) of a PDF, one string per page.
+
+    Short runs of pages are read inline; longer ones are split into blocks
+    that run in parallel on the PDF pool and come back in page order.
+    """
+    if n_pages - first_page <= PDF_PAGE_BLOCK:
+        # A single block isn't worth a process hop
+        return extract_pages(file_path, first_page, n_pages) if n_pages > first_page else []
+
+    starts, ends = zip(*page_blocks(n_pages, first_page))
+    blocks = get_pdf_pool().map(extract_pages, [file_path] * len(starts), starts, ends)
+    return [page_text for block in blocks for page_text in block]
+
+
+def _extract_pages_pdfium(file_path: str, start: int, end: int) -> List[str]:
+    """Extract text from a block of pages with PDFium."""
+    texts = []
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for i in range(start, end):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            # PDFium reports line breaks as CRLF
+            page_text = textpage.get_text_range().replace('\r\n', '\n')
+            textpage.close()
+            page.close()
+
+            if not page_text.strip():
+                logger.warning(f"No text extracted from page {i+1}")
+            texts.append(page_text)
+    finally:
+        pdf.close()
+    return texts
+
+
+def _extract_pages_pypdf2(file_path: str, start: int, end: int) -> List[str]:
+    """Extract text from a block of pages with PyPDF2."""
+    texts = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for i in range(start, end):
+            page_text = ""
+            try:
+                page_text = pdf_reader.pages[i].extract_text() or ""
+                if not page_text:
+                    logger.warning(f"No text extracted from page {i+1}")
+            except Exception as page_e:
+                logger.error(f"Error extracting text from page {i+1}: {page_e}")
+            texts.append(page_text)
+    return texts
@@ -4,15 +4,135 @@ Advanced Plotting Service for Deed Reader Pro
 Handles intelligent deed plotting, coordinate calculations, and closure analysis using AI.
 """
 
+import os
 import json
 import math
+import asyncio
 import logging
+from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
-from services.claude_service import ClaudeService
+import numpy as np
+from config import Config
+from services.claude_service import ClaudeService, ClaudeTimeout
+from services.cache_service import ContentCache, fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Claude's plotting extraction by model, prompt version and deed text, kept
+# on disk so replots after a restart skip the Claude call; fallback results
+# aren't cached. PLOT_DATA_CACHE=false disables it
+plot_data_cache = ContentCache(max_entries=256, disk_dir=os.path.join("uploads", ".cache", "plot_data"))
+
+# Bump whenever _PLOTTING_PROMPT changes, so cached extractions made with the
+# old prompt are no longer used
+PLOTTING_PROMPT_VERSION = 1
+
+# Times Claude is asked again, with the parse error, when its plotting
+# response isn't valid JSON, before falling back to basic extraction
+PLOTTING_JSON_RETRIES = 2
+
+# Deeds plotted at once by process_deeds_async
+PLOTTING_MAX_CONCURRENCY = 8
+
+# Instructions and schema for the plotting extraction, identical for every
+# deed; the deed text follows them. At about 450 tokens this is under the
+# 1,024-token minimum for Anthropic prompt caching, so it isn't marked for it
+_PLOTTING_PROMPT = """As an expert land surveyor, analyze the deed that follows and extract ALL plotting information in precise detail.
+
+Extract and return in JSON format:
+{
+    "point_of_beginning": {
+        "description": "Detailed POB description",
+        "coordinates": {"x": 0, "y": 0},
+        "monument": "Monument type at POB"
+    },
+    "calls": [
+        {
+            "sequence": 1,
+            "bearing": "N45°30'15\"E",
+            "bearing_decimal": 45.504167,
+            "distance": 125.75,
+            "units": "feet",
+            "call_type": "line",
+            "description": "Full call description",
+            "to_monument": "Monument at end of call",
+            "passing_monuments": ["Monument 1", "Monument 2"],
+            "curve_data": null
+        }
+    ],
+    "curves": [
+        {
+            "sequence": 2,
+            "chord_bearing": "S67°45'W",
+            "chord_distance": 89.44,
+            "radius": 50.0,
+            "delta": "45°30'",
+            "curve_length": 39.79,
+            "units": "feet"
+        }
+    ],
+    "adjoiners": [
+        {
+            "direction": "northerly",
+            "description": "Lands of John Smith",
+            "calls": ["Adjoining property calls if any"]
+        }
+    ],
+    "commencement": {
+        "has_commencement": true,
+        "calls": ["Calls from monument to POB"]
+    },
+    "closure_info": {
+        "expected_closure": "Returns to POB",
+        "area_mentioned": "5.75 acres more or less"
+    }
+}
+
+Be extremely precise with bearings, distances, and coordinate calculations."""
+
+# Fixed parts of the export files; each generator joins these around the
+# per-vertex lines in one pass instead of growing a string per vertex
+_DXF_HEAD = """0
+SECTION
+2
+ENTITIES
+0
+POLYLINE
+8
+BOUNDARY
+66
+1
+10
+0.0
+20
+0.0
+30
+0.0
+"""
+_DXF_TAIL = """0
+SEQEND
+0
+ENDSEC
+0
+EOF
+"""
+_KML_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+  <Document>
+    <name>Deed Plot</name>
+    <Placemark>
+      <name>Property Boundary</name>
+      <LineString>
+        <coordinates>
+"""
+_KML_TAIL = """        </coordinates>
+      </LineString>
+    </Placemark>
+  </Document>
+</kml>
+"""
+
 @dataclass
 class PlotPoint:
     """Represents a point in the deed plot."""
@@ -47,6 +167,10 @@ class ClosureAnalysis:
     is_closed: bool
     closure_error_ppm: float  # Parts per million
 
+def plot_data_key(text_key: str) -> str:
+    """Cache key for the plotting extraction of the deed text with fingerprint text_key."""
+    return fingerprint(f"{ClaudeService._model}\n{PLOTTING_PROMPT_VERSION}\n{text_key}")
+
 class AdvancedPlottingService:
     """Service for intelligent deed plotting and analysis."""
     
@@ -55,129 +179,154 @@ class AdvancedPlottingService:
         self.calls: List[PlotCall] = []
         self.closure_analysis: Optional[ClosureAnalysis] = None
         
-    def process_deed_for_plotting(self, deed_text: str) -> Dict[str, Any]:
+    def process_deed_for_plotting(self, deed_text: str, text_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Process deed text and generate comprehensive plotting data using AI.
-        Returns coordinates, closure analysis, and plotting instructions.
+        Returns coordinates, closure analysis, and plotting instructions;
+        'ai_extracted' is False when Claude's response couldn't be used and
+        the basic regex extraction was plotted instead.
+        
+        text_key is fingerprint(deed_text), when the caller already has it.
         """
         try:
             # Use Claude to extract detailed plotting information
-            plot_data = self._extract_plotting_data_with_ai(deed_text)
-            
-            # Calculate coordinates
-            coordinates = self._calculate_coordinates(plot_data)
-            
-            # Perform closure analysis
-            closure = self._analyze_closure(coordinates)
-            
-            # Generate plotting instructions
-            plotting_instructions = self._generate_plotting_instructions(coordinates, closure)
+            plot_data, ai_extracted = ClaudeService.run_sync(
+                self._extract_plot_data_async(deed_text, text_key), requests=PLOTTING_JSON_RETRIES + 1
+            )
+            return self._plot_result(plot_data, ai_extracted)
             
-            return {
-                'success': True,
-                'coordinates': coordinates,
-                'closure_analysis': closure,
-                'plotting_data': plot_data,
-                'plotting_instructions': plotting_instructions,
-                'export_formats': self._generate_export_data(coordinates)
-            }
+        except ClaudeTimeout:
+            # Left unwrapped so routes can answer it with a 504
+            raise
+        except Exception as e:
+            logger.error(f"Error in deed plotting: {e}")
+            raise Exception(f"Failed to process deed for plotting: {str(e)}")
+    
+    async def process_deed_for_plotting_async(self, deed_text: str, text_key: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of process_deed_for_plotting, for use on an event loop."""
+        try:
+            plot_data, ai_extracted = await self._extract_plot_data_async(deed_text, text_key)
+            return self._plot_result(plot_data, ai_extracted)
             
         except Exception as e:
             logger.error(f"Error in deed plotting: {e}")
             raise Exception(f"Failed to process deed for plotting: {str(e)}")
     
-    def _extract_plotting_data_with_ai(self, deed_text: str) -> Dict[str, Any]:
-        """Use Claude to extract detailed plotting information."""
+    async def process_deeds_async(self, texts: List[str]) -> List[Any]:
+        """
+        Plot several deeds concurrently, returning their results in order.
+        
+        At most PLOTTING_MAX_CONCURRENCY deeds are in flight at once. A deed
+        that fails doesn't stop the others; its entry is the exception.
+        """
+        sem = asyncio.Semaphore(PLOTTING_MAX_CONCURRENCY)
+        
+        async def plot(deed_text: str) -> Dict[str, Any]:
+            async with sem:
+                return await self.process_deed_for_plotting_async(deed_text)
+        
+        return await asyncio.gather(*(plot(deed_text) for deed_text in texts), return_exceptions=True)
+    
+    def _plot_result(self, plot_data: Dict[str, Any], ai_extracted: bool) -> Dict[str, Any]:
+        """Coordinates, closure analysis and plotting instructions for extracted plot data."""
+        # Calculate coordinates
+        coordinates = self._calculate_coordinates(plot_data)
+        
+        # Perform closure analysis
+        closure = self._analyze_closure(coordinates)
+        
+        # Generate plotting instructions
+        plotting_instructions = self._generate_plotting_instructions(coordinates, closure)
+        
+        return {
+            'success': True,
+            'coordinates': coordinates,
+            'closure_analysis': closure,
+            'plotting_data': plot_data,
+            'plotting_instructions': plotting_instructions,
+            'export_formats': self._generate_export_data(coordinates),
+            'ai_extracted': ai_extracted
+        }
+    
+    def _extract_plotting_data_with_ai(self, deed_text: str, text_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Use Claude to extract detailed plotting information.
+        
+        Results are cached by deed text, model and prompt version, so
+        replotting, validating or re-exporting the same deed skips the Claude
+        call.
+        """
+        return ClaudeService.run_sync(
+            self._extract_plot_data_async(deed_text, text_key), requests=PLOTTING_JSON_RETRIES + 1
+        )[0]
+    
+    async def _extract_plotting_data_with_ai_async(self, deed_text: str, text_key: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of _extract_plotting_data_with_ai."""
+        return (await self._extract_plot_data_async(deed_text, text_key))[0]
+    
+    async def _extract_plot_data_async(self, deed_text: str, text_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Plot data for deed text, and whether it came from Claude (cached or
+        not) rather than the basic extraction fallback.
+        
+        Sync callers run this on the shared async client through
+        ClaudeService.run_sync, so back-to-back plots reuse its pooled
+        connections and count against the same token budget.
+        """
         if not ClaudeService.is_available():
             raise Exception("Claude service not available for plotting")
         
-        prompt = f"""
-        As an expert land surveyor, analyze this deed and extract ALL plotting information in precise detail.
-        
-        Deed Text:
-        {deed_text}
-        
-        Extract and return in JSON format:
-        {{
-            "point_of_beginning": {{
-                "description": "Detailed POB description",
-                "coordinates": {{"x": 0, "y": 0}},
-                "monument": "Monument type at POB"
-            }},
-            "calls": [
-                {{
-                    "sequence": 1,
-                    "bearing": "N45°30'15\"E",
-                    "bearing_decimal": 45.504167,
-                    "distance": 125.75,
-                    "units": "feet",
-                    "call_type": "line",
-                    "description": "Full call description",
-                    "to_monument": "Monument at end of call",
-                    "passing_monuments": ["Monument 1", "Monument 2"],
-                    "curve_data": null
-                }}
-            ],
-            "curves": [
-                {{
-                    "sequence": 2,
-                    "chord_bearing": "S67°45'W",
-                    "chord_distance": 89.44,
-                    "radius": 50.0,
-                    "delta": "45°30'",
-                    "curve_length": 39.79,
-                    "units": "feet"
-                }}
-            ],
-            "adjoiners": [
-                {{
-                    "direction": "northerly",
-                    "description": "Lands of John Smith",
-                    "calls": ["Adjoining property calls if any"]
-                }}
-            ],
-            "commencement": {{
-                "has_commencement": true,
-                "calls": ["Calls from monument to POB"]
-            }},
-            "closure_info": {{
-                "expected_closure": "Returns to POB",
-                "area_mentioned": "5.75 acres more or less"
-            }}
-        }}
-        
-        Be extremely precise with bearings, distances, and coordinate calculations.
-        """
+        # The cache is disk-backed and this can run on the dispatcher loop
+        # shared by every Flask Claude call, so its disk I/O goes to a thread
+        cache_key = plot_data_key(text_key or fingerprint(deed_text))
+        if Config.PLOT_DATA_CACHE_ENABLED:
+            cached = plot_data_cache.get(cache_key, use_disk=False)
+            if cached is None:
+                cached = await asyncio.to_thread(plot_data_cache.get, cache_key)
+            if cached is not None:
+                return json.loads(cached)["plot_data"], True
+        
+        prompt = f"{_PLOTTING_PROMPT}\n\nDeed Text:\n{deed_text}"
         
         try:
-            message = ClaudeService._client.messages.create(
-                model=ClaudeService._model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=3000,
-                temperature=0.1
-            )
-            
-            result = message.content[0].text
-            
-            # Try to extract JSON from the response
-            if "```json" in result:
-                json_start = result.find("```json") + 7
-                json_end = result.find("```", json_start)
-                result = result[json_start:json_end].strip()
-            elif "{" in result:
-                json_start = result.find("{")
-                json_end = result.rfind("}") + 1
-                result = result[json_start:json_end]
-                
-            return json.loads(result)
+            plot_data = await self._request_plot_data_async(prompt)
+            if Config.PLOT_DATA_CACHE_ENABLED:
+                await asyncio.to_thread(plot_data_cache.set, cache_key, json.dumps({
+                    "extracted_at": datetime.now(timezone.utc).isoformat(),
+                    "plot_data": plot_data
+                }))
+            return plot_data, True
             
         except json.JSONDecodeError:
             # Fallback to basic parsing if JSON fails
-            return self._basic_plotting_extraction(deed_text)
+            return self._basic_plotting_extraction(deed_text), False
         except Exception as e:
             logger.error(f"Error in AI plotting extraction: {e}")
             raise
     
+    @staticmethod
+    async def _request_plot_data_async(prompt: str) -> Dict[str, Any]:
+        """
+        Ask Claude for the plotting JSON, re-asking with the parse error when
+        a response isn't valid JSON.
+        
+        Raises json.JSONDecodeError once PLOTTING_JSON_RETRIES re-asks have failed.
+        """
+        request = ClaudeService._user_request("plotting", prompt)
+        for attempt in range(PLOTTING_JSON_RETRIES + 1):
+            message = await ClaudeService._create_message_async(request, "plotting")
+            result_text = message.content[0].text
+            try:
+                return ClaudeService._parse_claude_json(result_text)
+            except json.JSONDecodeError as e:
+                if attempt == PLOTTING_JSON_RETRIES:
+                    raise
+                logger.warning(f"Plotting response was not valid JSON ({e}), asking again")
+                request["messages"] += [
+                    {"role": "assistant", "content": result_text},
+                    {"role": "user", "content": f"Your output had error: {e}. Return raw JSON only."}
+                ]
+    
     def _calculate_coordinates(self, plot_data: Dict) -> List[Dict]:
         """Calculate precise coordinates for all points."""
         coordinates = []
@@ -194,34 +343,35 @@ class AdvancedPlottingService:
             'monument': pob.get('monument')
         })
         
-        # Process each call
-        for i, call in enumerate(plot_data.get('calls', [])):
-            bearing_decimal = call.get('bearing_decimal')
-            distance = call.get('distance', 0)
-            
-            if bearing_decimal is not None and distance > 0:
-                # Convert bearing to radians and calculate coordinates
-                bearing_rad = math.radians(bearing_decimal)
-                
-                # Calculate delta coordinates
-                delta_x = distance * math.sin(bearing_rad)
-                delta_y = distance * math.cos(bearing_rad)
-                
-                # Update current position
-                current_x += delta_x
-                current_y += delta_y
-                
-                coordinates.append({
-                    'point_number': i + 1,
-                    'x': round(current_x, 3),
-                    'y': round(current_y, 3),
-                    'label': f'P{i + 1}',
-                    'description': call.get('description', ''),
-                    'monument': call.get('to_monument'),
-                    'bearing': call.get('bearing'),
-                    'distance': distance,
-                    'units': call.get('units', 'feet')
-                })
+        # Calls with a bearing and a positive distance, with their index
+        calls = [
+            (i, call) for i, call in enumerate(plot_data.get('calls', []))
+            if call.get('bearing_decimal') is not None and call.get('distance', 0) > 0
+        ]
+        if not calls:
+            return coordinates
+        
+        # Delta coordinates for every call at once; the running sums walk
+        # the traverse from the POB
+        bearings_rad = np.radians(np.fromiter(
+            (call['bearing_decimal'] for _, call in calls), dtype=np.float64, count=len(calls)
+        ))
+        distances = np.fromiter((call['distance'] for _, call in calls), dtype=np.float64, count=len(calls))
+        xs = np.cumsum(distances * np.sin(bearings_rad))
+        ys = np.cumsum(distances * np.cos(bearings_rad))
+        
+        for (i, call), x, y in zip(calls, xs.tolist(), ys.tolist()):
+            coordinates.append({
+                'point_number': i + 1,
+                'x': round(x, 3),
+                'y': round(y, 3),
+                'label': f'P{i + 1}',
+                'description': call.get('description', ''),
+                'monument': call.get('to_monument'),
+                'bearing': call.get('bearing'),
+                'distance': call['distance'],
+                'units': call.get('units', 'feet')
+            })
         
         return coordinates
     
@@ -230,15 +380,15 @@ class AdvancedPlottingService:
         if len(coordinates) < 3:
             return {'error': 'Insufficient points for closure analysis'}
         
-        # Get last point and POB
-        last_point = coordinates[-1]
-        pob = coordinates[0]
+        # Pull the vertex columns out once for the closure and area math
+        xs = np.fromiter((coord['x'] for coord in coordinates), dtype=np.float64, count=len(coordinates))
+        ys = np.fromiter((coord['y'] for coord in coordinates), dtype=np.float64, count=len(coordinates))
         
-        # Calculate closure distance and bearing
-        dx = pob['x'] - last_point['x']
-        dy = pob['y'] - last_point['y']
+        # Calculate closure distance and bearing from the last point to the POB
+        dx = float(xs[0] - xs[-1])
+        dy = float(ys[0] - ys[-1])
         
-        closure_distance = math.sqrt(dx**2 + dy**2)
+        closure_distance = math.hypot(dx, dy)
         closure_bearing_rad = math.atan2(dx, dy)
         closure_bearing_deg = math.degrees(closure_bearing_rad)
         
@@ -252,7 +402,7 @@ class AdvancedPlottingService:
         precision_ratio = f"1:{int(perimeter / closure_distance)}" if closure_distance > 0 else "Perfect"
         
         # Calculate area using shoelace formula
-        area_sq_feet = self._calculate_area(coordinates)
+        area_sq_feet = self._calculate_area_np(xs, ys)
         area_acres = area_sq_feet / 43560  # Convert to acres
         
         # Determine if closed (within reasonable tolerance)
@@ -278,17 +428,19 @@ class AdvancedPlottingService:
     
     def _calculate_area(self, coordinates: List[Dict]) -> float:
         """Calculate area using the shoelace formula."""
-        n = len(coordinates)
-        if n < 3:
+        xs = np.fromiter((coord['x'] for coord in coordinates), dtype=np.float64, count=len(coordinates))
+        ys = np.fromiter((coord['y'] for coord in coordinates), dtype=np.float64, count=len(coordinates))
+        return self._calculate_area_np(xs, ys)
+    
+    @staticmethod
+    def _calculate_area_np(xs: np.ndarray, ys: np.ndarray) -> float:
+        """Shoelace area of the polygon with vertex coordinates xs, ys."""
+        if len(xs) < 3:
             return 0.0
         
-        area = 0.0
-        for i in range(n):
-            j = (i + 1) % n
-            area += coordinates[i]['x'] * coordinates[j]['y']
-            area -= coordinates[j]['x'] * coordinates[i]['y']
-        
-        return abs(area) / 2.0
+        # Each vertex's cross product with the next, wrapping to the first
+        area = np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1))
+        return abs(float(area)) / 2.0
     
     def _decimal_to_bearing(self, decimal_degrees: float) -> str:
         """Convert decimal degrees to surveyor bearing format."""
@@ -338,119 +490,67 @@ class AdvancedPlottingService:
             }
         }
     
+    # Export format -> name of the method that generates it
+    EXPORT_GENERATORS = {
+        'dxf': '_generate_dxf_data',
+        'csv': '_generate_csv_data',
+        'esri_traverse': '_generate_esri_traverse',
+        'autocad_script': '_generate_autocad_script',
+        'kml': '_generate_kml_data'
+    }
+    
+    def _generate_export_format(self, coordinates: List[Dict], format_type: str) -> Optional[str]:
+        """Generate a single export format, or None if the format is unknown."""
+        generator = self.EXPORT_GENERATORS.get(format_type)
+        return getattr(self, generator)(coordinates) if generator else None
+    
     def _generate_export_data(self, coordinates: List[Dict]) -> Dict[str, Any]:
         """Generate data for various export formats."""
         return {
             'formats': {
-                'dxf': self._generate_dxf_data(coordinates),
-                'csv': self._generate_csv_data(coordinates),
-                'esri_traverse': self._generate_esri_traverse(coordinates),
-                'autocad_script': self._generate_autocad_script(coordinates),
-                'kml': self._generate_kml_data(coordinates)
+                format_type: self._generate_export_format(coordinates, format_type)
+                for format_type in self.EXPORT_GENERATORS
             }
         }
     
     def _generate_dxf_data(self, coordinates: List[Dict]) -> str:
         """Generate DXF file content."""
-        dxf_content = """0
-SECTION
-2
-ENTITIES
-"""
-        
-        # Add polyline
-        dxf_content += """0
-POLYLINE
-8
-BOUNDARY
-66
-1
-10
-0.0
-20
-0.0
-30
-0.0
-"""
-        
-        for coord in coordinates:
-            dxf_content += f"""0
-VERTEX
-8
-BOUNDARY
-10
-{coord['x']}
-20
-{coord['y']}
-30
-0.0
-"""
-        
-        dxf_content += """0
-SEQEND
-0
-ENDSEC
-0
-EOF
-"""
-        return dxf_content
+        vertices = "".join(
+            f"0\nVERTEX\n8\nBOUNDARY\n10\n{coord['x']}\n20\n{coord['y']}\n30\n0.0\n"
+            for coord in coordinates
+        )
+        return _DXF_HEAD + vertices + _DXF_TAIL
     
     def _generate_csv_data(self, coordinates: List[Dict]) -> str:
         """Generate CSV coordinate data."""
-        csv_content = "Point,X,Y,Description,Monument\n"
-        for coord in coordinates:
-            csv_content += f"{coord['label']},{coord['x']},{coord['y']},{coord.get('description', '')},{coord.get('monument', '')}\n"
-        return csv_content
+        rows = "".join(
+            f"{coord['label']},{coord['x']},{coord['y']},{coord.get('description', '')},{coord.get('monument', '')}\n"
+            for coord in coordinates
+        )
+        return "Point,X,Y,Description,Monument\n" + rows
     
     def _generate_esri_traverse(self, coordinates: List[Dict]) -> str:
         """Generate Esri traverse file for ArcGIS Pro."""
-        traverse_content = "TRAVERSE\n"
-        traverse_content += "UNITS FEET\n"
-        traverse_content += "BEGIN\n"
-        
-        for i, coord in enumerate(coordinates[1:], 1):
-            prev_coord = coordinates[i - 1]
+        courses = []
+        for prev_coord, coord in zip(coordinates, coordinates[1:]):
             dx = coord['x'] - prev_coord['x']
             dy = coord['y'] - prev_coord['y']
             distance = math.sqrt(dx**2 + dy**2)
             bearing = math.degrees(math.atan2(dx, dy))
-            
-            traverse_content += f"COURSE {bearing:.6f} {distance:.3f}\n"
+            courses.append(f"COURSE {bearing:.6f} {distance:.3f}\n")
         
-        traverse_content += "END\n"
-        return traverse_content
+        return "TRAVERSE\nUNITS FEET\nBEGIN\n" + "".join(courses) + "END\n"
     
     def _generate_autocad_script(self, coordinates: List[Dict]) -> str:
         """Generate AutoCAD script commands."""
-        script = "PLINE\n"
-        for coord in coordinates:
-            script += f"{coord['x']},{coord['y']}\n"
-        script += "C\n"  # Close polyline
-        return script
+        points = "".join(f"{coord['x']},{coord['y']}\n" for coord in coordinates)
+        return "PLINE\n" + points + "C\n"  # Close polyline
     
     def _generate_kml_data(self, coordinates: List[Dict]) -> str:
         """Generate KML for Google Earth visualization."""
-        kml_content = """<?xml version="1.0" encoding="UTF-8"?>
-<kml xmlns="http://www.opengis.net/kml/2.2">
-  <Document>
-    <name>Deed Plot</name>
-    <Placemark>
-      <name>Property Boundary</name>
-      <LineString>
-        <coordinates>
-"""
-        
-        for coord in coordinates:
-            # Note: For real KML, you'd need to convert local coordinates to lat/lon
-            kml_content += f"{coord['x']},{coord['y']},0\n"
-        
-        kml_content += """        </coordinates>
-      </LineString>
-    </Placemark>
-  </Document>
-</kml>
-"""
-        return kml_content
+        # Note: For real KML, you'd need to convert local coordinates to lat/lon
+        points = "".join(f"{coord['x']},{coord['y']},0\n" for coord in coordinates)
+        return _KML_HEAD + points + _KML_TAIL
     
     def _basic_plotting_extraction(self, deed_text: str) -> Dict[str, Any]:
         """Fallback basic plotting extraction if AI fails."""
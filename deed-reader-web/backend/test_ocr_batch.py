@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test of per-page text from a batched OCR run
+
+ocr_pages_batch writes several pages to one multi-page TIFF, OCRs it in a
+single Tesseract run and splits the image_to_data rows back out by
+page_num. Tesseract is replaced by a fake that reads the TIFF back and
+returns synthetic rows for each of its frames; each page's result must
+match ocr_with_confidence run on that page alone.
+"""
+
+import os
+import sys
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services import ocr_service
+from services.ocr_service import OCRService
+
+WORDS = ["BEGINNING", "at", "an", "iron", "pin", "THENCE", "N", "45°", "30'", "E", "150.00", "feet", "to", "the", "POB"]
+ROW_KEYS = ('text', 'conf', 'block_num', 'par_num', 'line_num')
+
+
+def random_page_data(rng: random.Random) -> dict:
+    """
+    image_to_data-style rows for one page: layout rows with no text and
+    words with confidences. Some pages get no rows at all, as Tesseract
+    returns for a blank page in a batch.
+    """
+    data = {key: [] for key in ROW_KEYS}
+    if rng.random() < 0.1:
+        return data
+    
+    def add_row(text, conf, block_num, par_num, line_num):
+        data['text'].append(text)
+        data['conf'].append(conf)
+        data['block_num'].append(block_num)
+        data['par_num'].append(par_num)
+        data['line_num'].append(line_num)
+    
+    add_row('', -1, 0, 0, 0)
+    for block_num in range(1, rng.randint(0, 4) + 1):
+        add_row('', -1, block_num, 0, 0)
+        for par_num in range(1, rng.randint(1, 2) + 1):
+            add_row('', -1, block_num, par_num, 0)
+            for line_num in range(1, rng.randint(1, 3) + 1):
+                add_row('', -1, block_num, par_num, line_num)
+                for _ in range(rng.randint(0, 6)):
+                    if rng.random() < 0.1:
+                        add_row(' ', rng.choice([-1, 95]), block_num, par_num, line_num)
+                    else:
+                        add_row(rng.choice(WORDS), rng.choice([-1, rng.randint(0, 100), round(rng.uniform(0, 100), 6)]), block_num, par_num, line_num)
+    return data
+
+
+def fake_tesseract(page_data):
+    """
+    Stand-in for pytesseract. Page i is a small image filled with the value
+    i; image_to_data returns page_data[i] for it, and for a multi-page TIFF
+    the rows of every frame in order, numbered by page from 1.
+    """
+    def image_to_data(image, lang=None, output_type=None):
+        if isinstance(image, np.ndarray):
+            return page_data[int(image.flat[0])]
+        
+        data = {key: [] for key in ROW_KEYS + ('page_num',)}
+        with Image.open(image) as tiff:
+            for page_num, frame in enumerate(ImageSequence.Iterator(tiff), start=1):
+                page = page_data[np.asarray(frame).flat[0]]
+                for key in ROW_KEYS:
+                    data[key].extend(page[key])
+                data['page_num'].extend([page_num] * len(page['text']))
+        return data
+    
+    return SimpleNamespace(image_to_data=image_to_data, Output=SimpleNamespace(DICT='dict'))
+
+
+def test_batch_page_text():
+    """ocr_pages_batch gives each page the text and confidence it gets OCR'd on its own."""
+    print("🧪 Testing per-page text from batched OCR")
+    print("=" * 50)
+    
+    rng = random.Random(20240816)
+    failures = 0
+    batches = 200
+    for _ in range(batches):
+        page_data = [random_page_data(rng) for _ in range(rng.randint(1, 6))]
+        pages = [np.full((8, 8), index, dtype=np.uint8) for index in range(len(page_data))]
+        
+        # preprocess_image (OpenCV thresholding) would flatten the page values
+        with mock.patch.object(ocr_service, 'pytesseract', fake_tesseract(page_data), create=True), \
+                mock.patch.object(OCRService, 'preprocess_image', staticmethod(np.asarray)):
+            results = OCRService.ocr_pages_batch(pages)
+            expected = [OCRService.ocr_with_confidence(pixels) for pixels in pages]
+        
+        if results != expected:
+            failures += 1
+            if failures == 1:
+                print(f"❌ First mismatch:\n   got      {results!r}\n   expected {expected!r}")
+    
+    if failures:
+        print(f"❌ {failures} of {batches} batches differ")
+    else:
+        print(f"✅ All {batches} batches match page-by-page OCR")
+    assert not failures
+
+
+if __name__ == "__main__":
+    test_batch_page_text()
+    print("\n✅ Batched OCR page text test passed!")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Parity test for the OCR text cleanup
+
+Checks that OCRService.clean_ocr_text and the enhance_deed_text fallback
+match their original re.sub-per-rule implementations on fixed and
+randomized deed-like text.
+"""
+
+import os
+import re
+import sys
+import random
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.ocr_service import OCRService
+from services.claude_service import ClaudeService
+
+# Fixed cases covering each cleanup rule and their overlaps
+SAMPLES = [
+    "",
+    "   ",
+    "THENCE north 45 o 30' east 150.00 Feet to an iron pin",
+    "thence   South  12o 5'  West\n\n\n  200 ft. along the line",
+    "Grantor: JOHN DOE\n \n \nGrantee: jane doe\n\nDEED BOOK 12O PAGE O45",
+    "N 45° 30' 15\" E 100.5 ft\nS45o30W 88ft.\n\t\n",
+    "O 5 degrees, 10 O, 1O, O1, OO, 10 MINUTES 20 Seconds",
+    "northern eastward WESTERLY Southbound deeds grantors feetfeet",
+    "  \n  leading and trailing  \n  ",
+]
+
+# Pieces random samples are built from: deed terms in mixed case, OCR
+# misreads, degree marks and whitespace runs
+TOKENS = [
+    "THENCE", "thence", "Thence", "NORTH", "north", "South", "EAST", "west",
+    "BEARING", "bearing", "Deed", "deeds", "GRANTOR", "grantee", "Grantees",
+    "feet", "FEET", "Feet", "ft", "ft.", "FT", "degrees", "Degrees", "MINUTES",
+    "minutes", "seconds", "SECONDS", "N", "S", "E", "W", "n", "s", "e", "w",
+    "O", "o", "OO", "12O", "O5", "1O0", "45", "30", "0", "100.25", "7.",
+    "°", "o", "'", '"', "45o", "12°", "5o30'", "to", "an", "iron", "pin",
+]
+SEPARATORS = [" ", " ", " ", "", "  ", "   ", "\n", "\n\n", "\n \n", "\n\n\n", " \n ", "\t", "\n\t\n"]
+
+
+def original_clean_ocr_text(text: str) -> str:
+    """clean_ocr_text as it was before its patterns were compiled and combined."""
+    if not text:
+        return ""
+    
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    
+    replacements = {
+        r'\bTHENCE\b': 'THENCE',
+        r'\bNORTH\b': 'NORTH',
+        r'\bSOUTH\b': 'SOUTH',
+        r'\bEAST\b': 'EAST',
+        r'\bWEST\b': 'WEST',
+        r'\bBEARING\b': 'BEARING',
+        r'\bDEED\b': 'DEED',
+        r'\bGRANTOR\b': 'GRANTOR',
+        r'\bGRANTEE\b': 'GRANTEE',
+        r'\bfeet\b': 'feet',
+        r'\bdegrees\b': 'degrees',
+        r'\bminutes\b': 'minutes',
+        r'\bseconds\b': 'seconds',
+    }
+    for pattern, replacement in replacements.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    
+    text = re.sub(r'(\d+)\s*[°o]\s*', r'\1° ', text)
+    
+    text = re.sub(r'\bO\b(?=\d)', '0', text)
+    text = re.sub(r'(?<=\d)O\b', '0', text)
+    
+    return text.strip()
+
+
+def original_enhance_deed_text(text: str) -> str:
+    """The enhance_deed_text fallback (no Claude) as it was before its patterns were compiled."""
+    if not text:
+        return ""
+    
+    def fix_bearing(match):
+        parts = match.groups()
+        direction1 = parts[0]
+        degrees = parts[1]
+        minutes = parts[2] or '00'
+        seconds = parts[3] or '00'
+        direction2 = parts[4]
+        return f"{direction1} {degrees}° {minutes}' {seconds}\" {direction2}"
+    
+    bearing_pattern = r'([NS])\s*(\d+)\s*[°o]?\s*(\d+)?\s*[\']?\s*(\d+)?\s*["]?\s*([EW])'
+    text = re.sub(bearing_pattern, fix_bearing, text, flags=re.IGNORECASE)
+    text = re.sub(r'(\d+\.?\d*)\s*ft\.?', r'\1 feet', text, flags=re.IGNORECASE)
+    
+    return text
+
+
+def random_deed_text(rng: random.Random) -> str:
+    """Random deed-like text from TOKENS joined by random whitespace."""
+    words = [rng.choice(TOKENS) for _ in range(rng.randint(0, 40))]
+    return "".join(word + rng.choice(SEPARATORS) for word in words)
+
+
+def test_clean_ocr_text_parity():
+    """clean_ocr_text matches the original implementation."""
+    print("🧪 Testing clean_ocr_text against the original implementation")
+    print("=" * 50)
+    
+    rng = random.Random(20240806)
+    samples = SAMPLES + [random_deed_text(rng) for _ in range(5000)]
+    mismatches = [
+        text for text in samples
+        if OCRService.clean_ocr_text(text) != original_clean_ocr_text(text)
+    ]
+    
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(samples)} samples differ, first: {mismatches[0]!r}")
+    else:
+        print(f"✅ All {len(samples)} samples match")
+    assert not mismatches
+
+
+def test_enhance_deed_text_parity():
+    """The enhance_deed_text fallback matches the original implementation."""
+    print("\n🧪 Testing enhance_deed_text fallback against the original implementation")
+    print("=" * 50)
+    
+    if ClaudeService.is_available():
+        print("⚠️  Claude is configured; enhance_deed_text would not use the fallback, skipping")
+        return
+    
+    rng = random.Random(20240807)
+    samples = SAMPLES + [random_deed_text(rng) for _ in range(5000)]
+    mismatches = [
+        text for text in samples
+        if OCRService.enhance_deed_text(text) != original_enhance_deed_text(text)
+    ]
+    
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(samples)} samples differ, first: {mismatches[0]!r}")
+    else:
+        print(f"✅ All {len(samples)} samples match")
+    assert not mismatches
+
+
+if __name__ == "__main__":
+    test_clean_ocr_text_parity()
+    test_enhance_deed_text_parity()
+    print("\n✅ OCR cleanup parity tests passed!")
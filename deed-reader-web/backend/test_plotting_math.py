@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Parity test for the plotting traverse math
+
+Checks that AdvancedPlottingService._calculate_coordinates and the
+shoelace area in _calculate_area / _calculate_area_np match the original
+loop implementations on randomized traverses.
+"""
+
+import os
+import sys
+import math
+import random
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.plotting_service import AdvancedPlottingService
+
+# Rounded coordinates may land either side of a 0.001 rounding boundary
+# when numpy's sin/cos differ from math's in the last bit
+COORDINATE_TOLERANCE = 0.0011
+# The dot products round differently from math.fsum; areas are compared
+# relative to the size of the shoelace terms
+AREA_RELATIVE_TOLERANCE = 1e-9
+
+
+def original_calculate_coordinates(plot_data):
+    """_calculate_coordinates as it was, walking the calls one at a time."""
+    coordinates = []
+    current_x, current_y = 0.0, 0.0
+    
+    pob = plot_data.get('point_of_beginning', {})
+    coordinates.append({
+        'point_number': 0,
+        'x': current_x,
+        'y': current_y,
+        'label': 'POB',
+        'description': pob.get('description', 'Point of Beginning'),
+        'monument': pob.get('monument')
+    })
+    
+    for i, call in enumerate(plot_data.get('calls', [])):
+        bearing_decimal = call.get('bearing_decimal')
+        distance = call.get('distance', 0)
+        
+        if bearing_decimal is not None and distance > 0:
+            bearing_rad = math.radians(bearing_decimal)
+            
+            delta_x = distance * math.sin(bearing_rad)
+            delta_y = distance * math.cos(bearing_rad)
+            
+            current_x += delta_x
+            current_y += delta_y
+            
+            coordinates.append({
+                'point_number': i + 1,
+                'x': round(current_x, 3),
+                'y': round(current_y, 3),
+                'label': f'P{i + 1}',
+                'description': call.get('description', ''),
+                'monument': call.get('to_monument'),
+                'bearing': call.get('bearing'),
+                'distance': distance,
+                'units': call.get('units', 'feet')
+            })
+    
+    return coordinates
+
+
+def original_calculate_area(coordinates):
+    """_calculate_area as it was, summing the shoelace terms with math.fsum."""
+    n = len(coordinates)
+    if n < 3:
+        return 0.0
+    
+    xs = [coord['x'] for coord in coordinates]
+    ys = [coord['y'] for coord in coordinates]
+    next_xs = xs[1:] + xs[:1]
+    next_ys = ys[1:] + ys[:1]
+    area = math.fsum(x * next_y - next_x * y for x, y, next_x, next_y in zip(xs, ys, next_xs, next_ys))
+    
+    return abs(area) / 2.0
+
+
+def random_plot_data(rng: random.Random) -> dict:
+    """Plot data with random calls, some missing a bearing or a positive distance."""
+    calls = []
+    for i in range(rng.randint(0, 30)):
+        call = {'description': f'Call {i + 1}', 'bearing': f'B{i + 1}'}
+        roll = rng.random()
+        if roll < 0.05:
+            call['bearing_decimal'] = None
+        elif roll < 0.1:
+            pass
+        else:
+            call['bearing_decimal'] = rng.choice([rng.uniform(0, 360), float(rng.randint(0, 359)), rng.randint(0, 359)])
+        roll = rng.random()
+        if roll < 0.05:
+            call['distance'] = 0
+        elif roll < 0.08:
+            call['distance'] = -rng.uniform(1, 100)
+        elif roll >= 0.12:
+            call['distance'] = rng.choice([rng.uniform(0.01, 5000), rng.randint(1, 5000)])
+        if rng.random() < 0.5:
+            call['to_monument'] = 'iron pin'
+        if rng.random() < 0.2:
+            call['units'] = 'chains'
+        calls.append(call)
+    
+    plot_data = {'calls': calls}
+    if rng.random() < 0.8:
+        plot_data['point_of_beginning'] = {'description': 'iron pin found', 'monument': 'iron pin'}
+    return plot_data
+
+
+def coordinates_match(new, old) -> bool:
+    """Same points and fields, with x and y equal to within COORDINATE_TOLERANCE."""
+    if len(new) != len(old):
+        return False
+    for new_point, old_point in zip(new, old):
+        if new_point.keys() != old_point.keys():
+            return False
+        for key, value in old_point.items():
+            if key in ('x', 'y'):
+                if abs(new_point[key] - value) > COORDINATE_TOLERANCE:
+                    return False
+            elif new_point[key] != value:
+                return False
+    return True
+
+
+def test_calculate_coordinates_parity():
+    """_calculate_coordinates matches the original loop."""
+    print("🧪 Testing _calculate_coordinates against the original loop")
+    print("=" * 50)
+    
+    service = AdvancedPlottingService()
+    rng = random.Random(20240901)
+    samples = [{}, {'calls': []}] + [random_plot_data(rng) for _ in range(2000)]
+    mismatches = [
+        plot_data for plot_data in samples
+        if not coordinates_match(service._calculate_coordinates(plot_data), original_calculate_coordinates(plot_data))
+    ]
+    
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(samples)} traverses differ, first: {mismatches[0]!r}")
+    else:
+        print(f"✅ All {len(samples)} traverses match")
+    assert not mismatches
+
+
+def area_matches(new, old, coordinates) -> bool:
+    """new and old areas agree to within AREA_RELATIVE_TOLERANCE of the shoelace terms."""
+    xs = [coord['x'] for coord in coordinates]
+    ys = [coord['y'] for coord in coordinates]
+    scale = sum(abs(x * next_y) + abs(next_x * y) for x, y, next_x, next_y in zip(xs, ys, xs[1:] + xs[:1], ys[1:] + ys[:1]))
+    return abs(new - old) <= AREA_RELATIVE_TOLERANCE * max(scale, 1.0)
+
+
+def test_calculate_area_parity():
+    """_calculate_area and _calculate_area_np match the original fsum shoelace."""
+    print("\n🧪 Testing the shoelace area against the original loop")
+    print("=" * 50)
+    
+    service = AdvancedPlottingService()
+    rng = random.Random(20240902)
+    
+    # Traverse points, plus closed random polygons away from the origin
+    polygons = [[], [{'x': 1.0, 'y': 2.0}], [{'x': 0.0, 'y': 0.0}, {'x': 3.0, 'y': 4.0}]]
+    polygons += [service._calculate_coordinates(random_plot_data(rng)) for _ in range(1000)]
+    for _ in range(1000):
+        cx, cy = rng.uniform(-1e6, 1e6), rng.uniform(-1e6, 1e6)
+        polygons.append([
+            {'x': round(cx + rng.uniform(-5000, 5000), 3), 'y': round(cy + rng.uniform(-5000, 5000), 3)}
+            for _ in range(rng.randint(3, 40))
+        ])
+    
+    mismatches = []
+    for coordinates in polygons:
+        old = original_calculate_area(coordinates)
+        xs = np.array([coord['x'] for coord in coordinates], dtype=np.float64)
+        ys = np.array([coord['y'] for coord in coordinates], dtype=np.float64)
+        if not (area_matches(service._calculate_area(coordinates), old, coordinates)
+                and area_matches(AdvancedPlottingService._calculate_area_np(xs, ys), old, coordinates)):
+            mismatches.append(coordinates)
+    
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(polygons)} polygons differ, first: {mismatches[0]!r}")
+    else:
+        print(f"✅ All {len(polygons)} polygons match")
+    assert not mismatches
+
+
+if __name__ == "__main__":
+    test_calculate_coordinates_parity()
+    test_calculate_area_parity()
+    print("\n✅ Plotting math parity tests passed!")
@@ -34,6 +34,7 @@ export interface DocumentData {
   text_length: number;
   extracted_text: string;
   upload_id: string;
+  text_url?: string;
   message: string;
 }
 
@@ -110,6 +111,14 @@ export const uploadDocument = async (file: File): Promise<DocumentData> => {
     },
   });
   
+  // The FastAPI backend returns the text separately at text_url
+  if (response.data.extracted_text === undefined) {
+    const textResponse = await api.get(`/documents/${response.data.upload_id}/text`, {
+      responseType: 'text',
+    });
+    response.data.extracted_text = textResponse.data;
+  }
+  
   return response.data;
 };
 